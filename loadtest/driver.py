@@ -0,0 +1,177 @@
+"""
+Load test the bot end to end against a local fake Discord server.
+
+    python -m loadtest.driver --events 20 --members 200 --scenario reaction_storm
+
+Starts the fake Discord server (see `loadtest.fake_discord`), seeds a fresh SQLite database with
+the fake guild's configuration and events, then runs the bot (`python -m moobot.main`) against
+both. Once the bot has set up the seeded events, which is reported as the "startup" scenario, the
+given scenarios are replayed in order. For each one, the throughput, latency percentiles and API
+calls made by the bot are reported.
+
+Bot settings can be overridden with `--bot-env`, e.g. `--bot-env RSVP_DEBOUNCE_SECONDS=0`. The
+bot's log is written to the printed temporary directory.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import signal
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from loadtest.fake_discord import API_PREFIX, FakeDiscord, serve
+
+if TYPE_CHECKING:
+    from loadtest.scenarios import ScenarioResult
+
+TOKEN = "loadtest-token"
+SCENARIO_NAMES = ("reaction_storm", "event_burst")
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m loadtest.driver")
+    parser.add_argument(
+        "--scenario",
+        dest="scenarios",
+        action="append",
+        choices=SCENARIO_NAMES,
+        help="Scenario to run after startup, may be repeated (default: all)",
+    )
+    parser.add_argument("--events", type=int, default=20, help="Events seeded before startup")
+    parser.add_argument("--members", type=int, default=200, help="Guild members")
+    parser.add_argument("--reactions", type=int, default=1000, help="RSVPs in reaction_storm")
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=0,
+        help="Reactions per second in reaction_storm, 0 for no limit",
+    )
+    parser.add_argument("--burst-events", type=int, default=20, help="Events added in event_burst")
+    parser.add_argument("--latency-ms", type=float, default=50, help="Mean simulated API latency")
+    parser.add_argument("--jitter-ms", type=float, default=20, help="Simulated latency deviation")
+    parser.add_argument(
+        "--timeout", type=float, default=300, help="Seconds to wait for each scenario to complete"
+    )
+    parser.add_argument(
+        "--bot-env", action="append", default=[], metavar="KEY=VALUE", help="Bot setting override"
+    )
+    args = parser.parse_args(argv)
+    args.scenarios = args.scenarios or list(SCENARIO_NAMES)
+    return args
+
+
+def configure_environment(work_dir: Path) -> None:
+    """
+    Point the settings of the driver (and the bot it starts) at a fresh database.
+    """
+    os.environ.update(
+        {
+            "DATABASE_URL": f"sqlite:///{work_dir / 'loadtest.db'}",
+            "DISCORD_TOKEN": TOKEN,
+            "TZ": os.environ.get("TZ", "UTC"),
+            "LOG_LEVEL": os.environ.get("LOG_LEVEL", "20"),
+            "GOOGLE_CLIENT_ID": "loadtest",
+            "GOOGLE_PROJECT_ID": "loadtest",
+            "GOOGLE_CLIENT_SECRET": "loadtest",
+            "GOOGLE_REDIRECT_URI_HOST": "http://localhost",
+        }
+    )
+
+
+async def start_bot(
+    fake_discord: FakeDiscord, bot_env: list[str], log_path: Path
+) -> asyncio.subprocess.Process:
+    env = {
+        **os.environ,
+        "DISCORD_API_BASE_URL": fake_discord.base_url + API_PREFIX,
+        "DISCORD_GATEWAY_URL": fake_discord.base_url.replace("http", "ws", 1) + "/gateway/",
+    }
+    for override in bot_env:
+        key, separator, value = override.partition("=")
+        if not separator:
+            raise ValueError(f"Bot setting overrides must be KEY=VALUE, got {override}")
+        env[key] = value
+    with log_path.open("wb") as log_file:
+        return await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "moobot.main", env=env, stdout=log_file, stderr=log_file
+        )
+
+
+async def stop_bot(bot: asyncio.subprocess.Process) -> None:
+    if bot.returncode is None:
+        bot.send_signal(signal.SIGTERM)
+        try:
+            await asyncio.wait_for(bot.wait(), timeout=10)
+        except TimeoutError:
+            bot.kill()
+
+
+async def run(args: argparse.Namespace, work_dir: Path) -> list[ScenarioResult]:
+    # the scenarios use the bot's database code, which reads the settings when imported
+    from loadtest import scenarios
+    from moobot.db.session import init_db
+
+    init_db()
+    fake_discord = FakeDiscord(
+        token=TOKEN,
+        latency_seconds=args.latency_ms / 1000,
+        latency_jitter_seconds=args.jitter_ms / 1000,
+    )
+    runner = await serve(fake_discord)
+    guild = scenarios.seed_guild(fake_discord, args.members)
+    event_ids = scenarios.seed_events(guild, args.events)
+
+    log_path = work_dir / "bot.log"
+    print(f"Fake Discord at {fake_discord.base_url}, bot log at {log_path}")
+    started_at = time.perf_counter()
+    bot = await start_bot(fake_discord, args.bot_env, log_path)
+    try:
+        results = [
+            await scenarios.measure(
+                guild,
+                lambda: scenarios.wait_for_events("startup", event_ids, started_at, args.timeout),
+            )
+        ]
+        if results[0].completed < len(event_ids):
+            print("The bot didn't set up all events in time, see its log")
+            return results
+
+        for name in args.scenarios:
+            results.append(
+                await scenarios.SCENARIOS[name](
+                    guild,
+                    events=args.burst_events,
+                    reactions=args.reactions,
+                    rate=args.rate,
+                    timeout_seconds=args.timeout,
+                    event_ids=event_ids,
+                )
+            )
+            if bot.returncode is not None:
+                print(f"The bot exited with code {bot.returncode}, see its log")
+                break
+        return results
+    finally:
+        await stop_bot(bot)
+        await runner.cleanup()
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    work_dir = Path(tempfile.mkdtemp(prefix="moobot-loadtest-"))
+    configure_environment(work_dir)
+
+    results = asyncio.run(run(args, work_dir))
+    print()
+    for result in results:
+        print(result.format())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,938 @@
+"""
+A local stand-in for the Discord API, for load testing the bot without a real guild.
+
+It serves the REST routes and gateway events the bot uses, backed by a single in-memory guild
+with channels, messages, reactions and members. Every request is delayed by a simulated latency
+and counted against rate limit buckets like Discord's, answering with 429s once a bucket is
+exhausted. Point the bot at it with DISCORD_API_BASE_URL and DISCORD_GATEWAY_URL, see
+`loadtest.driver`.
+
+Only what the bot needs is simulated: permissions aren't enforced and the gateway doesn't support
+resuming sessions.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import itertools
+import json
+import logging
+import random
+import time
+import uuid
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Any
+
+from aiohttp import WSMsgType, web
+
+_logger = logging.getLogger(__name__)
+
+API_PREFIX = "/api/v10"
+DISCORD_EPOCH_MS = 1420070400000
+HEARTBEAT_INTERVAL_MS = 41250
+ADMINISTRATOR = 1 << 3
+
+Payload = dict[str, Any]
+Handler = Callable[[web.Request], Awaitable[web.StreamResponse]]
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    limit: int
+    period_seconds: float
+
+
+# approximations of Discord's per-route limits, keyed by (method, route) with "*" matching any
+# method; buckets are per major parameter (channel or guild), like Discord's
+RATE_LIMITS: dict[tuple[str, str], RateLimit] = {
+    # all reaction routes of a channel share one bucket
+    ("*", "/channels/{channel_id}/messages/{message_id}/reactions/{emoji}/{user_id}"): RateLimit(
+        1, 0.25
+    ),
+    ("POST", "/channels/{channel_id}/messages"): RateLimit(5, 5.0),
+    ("PATCH", "/channels/{channel_id}/messages/{message_id}"): RateLimit(5, 5.0),
+    ("DELETE", "/channels/{channel_id}/messages/{message_id}"): RateLimit(5, 1.0),
+    ("PATCH", "/channels/{channel_id}"): RateLimit(10, 10.0),
+    ("*", "/channels/{channel_id}/permissions/{target_id}"): RateLimit(10, 10.0),
+    ("POST", "/guilds/{guild_id}/channels"): RateLimit(5, 5.0),
+    ("*", "/guilds/{guild_id}/members/{user_id}/roles/{role_id}"): RateLimit(10, 10.0),
+}
+DEFAULT_RATE_LIMIT = RateLimit(50, 1.0)
+GLOBAL_RATE_LIMIT = RateLimit(50, 1.0)
+
+
+def snowflake() -> int:
+    return ((int(time.time() * 1000) - DISCORD_EPOCH_MS) << 22) | (next(_increment) & 0xFFF)
+
+
+_increment = itertools.count()
+
+
+def _timestamp() -> str:
+    return datetime.now(UTC).isoformat()
+
+
+def _json_response(
+    data: object, status: int = 200, headers: dict[str, str] | None = None
+) -> web.Response:
+    # discord.py only decodes JSON bodies with this exact content type, i.e. without a charset
+    return web.Response(
+        body=json.dumps(data).encode(),
+        status=status,
+        headers={**(headers or {}), "Content-Type": "application/json"},
+    )
+
+
+def _error(status: int, message: str, code: int = 0) -> web.Response:
+    return _json_response({"message": message, "code": code}, status=status)
+
+
+def _emoji_payload(emoji: str) -> Payload:
+    """
+    Parse an emoji as used in reaction routes, either unicode or "name:id" for custom emojis.
+    """
+    name, _, emoji_id = emoji.partition(":")
+    return {"id": emoji_id or None, "name": name}
+
+
+def _emoji_key(emoji: Payload) -> str:
+    return f"{emoji['name']}:{emoji['id']}" if emoji.get("id") else emoji["name"]
+
+
+@dataclass
+class _Bucket:
+    limit: RateLimit
+    remaining: int = 0
+    reset_at: float = 0.0
+
+    def take(self, now: float) -> float | None:
+        """
+        Count a request, returning the seconds until it may be retried if the bucket is exhausted.
+        """
+        if now >= self.reset_at:
+            self.remaining = self.limit.limit
+            self.reset_at = now + self.limit.period_seconds
+        if self.remaining == 0:
+            return self.reset_at - now
+        self.remaining -= 1
+        return None
+
+
+@dataclass
+class FakeDiscordStats:
+    calls: Counter[str] = field(default_factory=Counter)  # "METHOD route" -> requests
+    rate_limited: Counter[str] = field(default_factory=Counter)
+    unhandled: Counter[str] = field(default_factory=Counter)
+
+    @property
+    def total_calls(self) -> int:
+        return sum(self.calls.values())
+
+    def copy(self) -> FakeDiscordStats:
+        return FakeDiscordStats(
+            Counter(self.calls), Counter(self.rate_limited), Counter(self.unhandled)
+        )
+
+    def __sub__(self, other: FakeDiscordStats) -> FakeDiscordStats:
+        return FakeDiscordStats(
+            self.calls - other.calls,
+            self.rate_limited - other.rate_limited,
+            self.unhandled - other.unhandled,
+        )
+
+
+class _GatewaySession:
+    def __init__(self, ws: web.WebSocketResponse) -> None:
+        self.ws = ws
+        self.sequence = 0
+        self.shard = (0, 1)
+
+    async def send(self, op: int, d: Any, t: str | None = None) -> None:
+        payload: Payload = {"op": op, "d": d, "s": None, "t": t}
+        if op == 0:
+            self.sequence += 1
+            payload["s"] = self.sequence
+        if not self.ws.closed:
+            await self.ws.send_str(json.dumps(payload))
+
+
+class FakeDiscord:
+    """
+    An in-memory Discord guild served over HTTP and a websocket gateway.
+
+    Call `create_app` and serve it, then seed the guild with `add_*` methods. The `*_as_user`
+    methods act as guild members, dispatching the resulting gateway events to the bot.
+    """
+
+    def __init__(
+        self,
+        token: str = "fake-token",
+        latency_seconds: float = 0.05,
+        latency_jitter_seconds: float = 0.02,
+        rate_limits: dict[tuple[str, str], RateLimit] | None = None,
+    ) -> None:
+        self.token = token
+        self.latency_seconds = latency_seconds
+        self.latency_jitter_seconds = latency_jitter_seconds
+        self.rate_limits = RATE_LIMITS if rate_limits is None else rate_limits
+        self.stats = FakeDiscordStats()
+        # set once the server is listening
+        self.base_url = ""
+
+        self.application_id = snowflake()
+        self.bot_user = self._user_payload(self.application_id, "moobot", bot=True)
+        self.guild_id = snowflake()
+        self.guild: Payload = {
+            "id": str(self.guild_id),
+            "name": "Moobloom Load Test",
+            "icon": None,
+            "owner_id": str(self.application_id),
+            "features": [],
+            "stickers": [],
+            "large": True,
+            "unavailable": False,
+            "premium_tier": 0,
+            "mfa_level": 0,
+            "verification_level": 0,
+            "explicit_content_filter": 0,
+            "default_message_notifications": 0,
+            "afk_timeout": 300,
+            "system_channel_flags": 0,
+            "preferred_locale": "en-US",
+            "nsfw_level": 0,
+            "premium_progress_bar_enabled": False,
+        }
+        self.roles: dict[int, Payload] = {}
+        self.emojis: dict[int, Payload] = {}
+        self.channels: dict[int, Payload] = {}
+        self.members: dict[int, Payload] = {}
+        self.messages: dict[int, dict[int, Payload]] = {}  # channel ID -> message ID -> message
+        # message ID -> emoji key -> IDs of users who reacted
+        self.reactions: dict[int, dict[str, list[int]]] = {}
+
+        self._buckets: dict[tuple[str, str], _Bucket] = {}
+        self._global_bucket = _Bucket(GLOBAL_RATE_LIMIT)
+        self._sessions: set[_GatewaySession] = set()
+
+        self.add_role("@everyone", role_id=self.guild_id)
+        bot_role = self.add_role("moobot", permissions=ADMINISTRATOR)
+        self.add_member(self.application_id, "moobot", bot=True, role_ids=[bot_role])
+
+    # guild setup
+
+    def add_role(self, name: str, permissions: int = 0, role_id: int | None = None) -> int:
+        role_id = role_id or snowflake()
+        self.roles[role_id] = {
+            "id": str(role_id),
+            "name": name,
+            "color": 0,
+            "hoist": False,
+            "icon": None,
+            "unicode_emoji": None,
+            "position": len(self.roles),
+            "permissions": str(permissions),
+            "managed": False,
+            "mentionable": False,
+            "flags": 0,
+        }
+        return role_id
+
+    def add_emoji(self, name: str) -> int:
+        emoji_id = snowflake()
+        self.emojis[emoji_id] = {
+            "id": str(emoji_id),
+            "name": name,
+            "roles": [],
+            "require_colons": True,
+            "managed": False,
+            "animated": False,
+            "available": True,
+        }
+        return emoji_id
+
+    def add_channel(self, name: str, type: int = 0, parent_id: int | None = None) -> int:
+        channel_id = snowflake()
+        self._store_channel(
+            {"id": str(channel_id), "name": name, "type": type, "parent_id": parent_id}
+        )
+        return channel_id
+
+    def add_member(
+        self, user_id: int, name: str, bot: bool = False, role_ids: list[int] | None = None
+    ) -> None:
+        self.members[user_id] = {
+            "user": self._user_payload(user_id, name, bot=bot),
+            "nick": None,
+            "avatar": None,
+            "roles": [str(role_id) for role_id in role_ids or []],
+            "joined_at": _timestamp(),
+            "premium_since": None,
+            "deaf": False,
+            "mute": False,
+            "flags": 0,
+            "pending": False,
+            "communication_disabled_until": None,
+        }
+
+    # acting as guild members
+
+    async def add_reaction_as_user(
+        self, channel_id: int, message_id: int, user_id: int, emoji: str
+    ) -> None:
+        await self._add_reaction(channel_id, message_id, user_id, _emoji_payload(emoji))
+
+    async def remove_reaction_as_user(
+        self, channel_id: int, message_id: int, user_id: int, emoji: str
+    ) -> None:
+        await self._remove_reaction(channel_id, message_id, user_id, _emoji_payload(emoji))
+
+    async def send_message_as_user(self, channel_id: int, user_id: int, content: str) -> Payload:
+        message = self._store_message(
+            channel_id, self.members[user_id]["user"], {"content": content}
+        )
+        member = {k: v for k, v in self.members[user_id].items() if k != "user"}
+        await self.dispatch("MESSAGE_CREATE", {**message, "member": member})
+        return message
+
+    def find_messages(self, channel_id: int) -> list[Payload]:
+        """
+        Messages of a channel, oldest first.
+        """
+        return list(self.messages.get(channel_id, {}).values())
+
+    # serving
+
+    def create_app(self) -> web.Application:
+        app = web.Application(middlewares=[self._middleware])
+        routes: list[tuple[str, str, Handler]] = [
+            ("GET", "/users/@me", self._get_current_user),
+            ("GET", "/gateway", self._get_gateway),
+            ("GET", "/gateway/bot", self._get_gateway),
+            ("GET", "/oauth2/applications/@me", self._get_application),
+            ("POST", "/users/@me/channels", self._create_dm),
+            ("GET", "/channels/{channel_id}", self._get_channel),
+            ("PATCH", "/channels/{channel_id}", self._edit_channel),
+            ("DELETE", "/channels/{channel_id}", self._delete_channel),
+            ("PUT", "/channels/{channel_id}/permissions/{target_id}", self._put_permissions),
+            ("DELETE", "/channels/{channel_id}/permissions/{target_id}", self._delete_permissions),
+            ("GET", "/channels/{channel_id}/messages", self._get_messages),
+            ("POST", "/channels/{channel_id}/messages", self._create_message),
+            ("GET", "/channels/{channel_id}/messages/{message_id}", self._get_message),
+            ("PATCH", "/channels/{channel_id}/messages/{message_id}", self._edit_message),
+            ("DELETE", "/channels/{channel_id}/messages/{message_id}", self._delete_message),
+            ("PUT", "/channels/{channel_id}/messages/pins/{message_id}", self._pin_message),
+            ("PUT", "/channels/{channel_id}/pins/{message_id}", self._pin_message),
+            (
+                "GET",
+                "/channels/{channel_id}/messages/{message_id}/reactions/{emoji}",
+                self._get_reactions,
+            ),
+            (
+                "PUT",
+                "/channels/{channel_id}/messages/{message_id}/reactions/{emoji}/{user_id}",
+                self._put_reaction,
+            ),
+            (
+                "DELETE",
+                "/channels/{channel_id}/messages/{message_id}/reactions/{emoji}/{user_id}",
+                self._delete_reaction,
+            ),
+            ("GET", "/guilds/{guild_id}/channels", self._get_guild_channels),
+            ("POST", "/guilds/{guild_id}/channels", self._create_guild_channel),
+            ("GET", "/guilds/{guild_id}/emojis", self._get_emojis),
+            ("GET", "/guilds/{guild_id}/members/{user_id}", self._get_member),
+            ("PUT", "/guilds/{guild_id}/members/{user_id}/roles/{role_id}", self._add_member_role),
+            (
+                "DELETE",
+                "/guilds/{guild_id}/members/{user_id}/roles/{role_id}",
+                self._remove_member_role,
+            ),
+            (
+                "PUT",
+                "/applications/{application_id}/guilds/{guild_id}/commands",
+                self._put_commands,
+            ),
+        ]
+        for method, path, handler in routes:
+            app.router.add_route(method, API_PREFIX + path, handler)
+        app.router.add_route("*", API_PREFIX + "/{path:.*}", self._unhandled)
+        app.router.add_get("/gateway/", self._gateway)
+        return app
+
+    async def dispatch(self, event: str, data: Payload) -> None:
+        for session in list(self._sessions):
+            await session.send(0, data, t=event)
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler: Handler) -> web.StreamResponse:
+        if not request.path.startswith(API_PREFIX):
+            return await handler(request)
+
+        route = request.match_info.route.resource.canonical.removeprefix(API_PREFIX)  # type: ignore
+        key = f"{request.method} {route}"
+        self.stats.calls[key] += 1
+        if request.headers.get("Authorization") != f"Bot {self.token}":
+            return _error(401, "401: Unauthorized")
+
+        await asyncio.sleep(
+            max(0.0, random.gauss(self.latency_seconds, self.latency_jitter_seconds))
+        )
+
+        rate_limit, bucket_key = self._get_rate_limit(request, route)
+        bucket = self._buckets.setdefault(bucket_key, _Bucket(rate_limit))
+        now = time.monotonic()
+        is_global = False
+        retry_after = self._global_bucket.take(now)
+        if retry_after is not None:
+            is_global = True
+        else:
+            retry_after = bucket.take(now)
+        bucket_hash = hashlib.sha1(bucket_key[0].encode()).hexdigest()[:16]
+        headers = {
+            # discord.py treats 429s without a Via header as being banned by Cloudflare
+            "Via": "1.1 fake-discord",
+            "X-RateLimit-Bucket": bucket_hash,
+            "X-RateLimit-Limit": str(rate_limit.limit),
+            "X-RateLimit-Remaining": str(bucket.remaining),
+            "X-RateLimit-Reset": f"{time.time() + bucket.reset_at - now:.3f}",
+            "X-RateLimit-Reset-After": f"{bucket.reset_at - now:.3f}",
+        }
+        if retry_after is not None:
+            self.stats.rate_limited[key] += 1
+            headers.update(
+                {
+                    "Retry-After": f"{retry_after:.3f}",
+                    "X-RateLimit-Scope": "global" if is_global else "user",
+                }
+            )
+            return _json_response(
+                {
+                    "message": "You are being rate limited.",
+                    "retry_after": retry_after,
+                    "global": is_global,
+                },
+                status=429,
+                headers=headers,
+            )
+
+        try:
+            response = await handler(request)
+        except ConnectionResetError:
+            # the bot went away mid-request, e.g. when it's stopped at the end of a run
+            return _error(499, "Client closed request")
+        response.headers.update(headers)
+        return response
+
+    def _get_rate_limit(
+        self, request: web.Request, route: str
+    ) -> tuple[RateLimit, tuple[str, str]]:
+        major = request.match_info.get("channel_id") or request.match_info.get("guild_id") or ""
+        for method in (request.method, "*"):
+            if (rate_limit := self.rate_limits.get((method, route))) is not None:
+                return rate_limit, (f"{method} {route}", major)
+        return DEFAULT_RATE_LIMIT, (f"{request.method} {route}", major)
+
+    # REST routes
+
+    async def _get_current_user(self, _request: web.Request) -> web.Response:
+        return _json_response(self.bot_user)
+
+    async def _get_gateway(self, _request: web.Request) -> web.Response:
+        return _json_response(
+            {
+                "url": self._gateway_url,
+                "shards": 1,
+                "session_start_limit": {
+                    "total": 1000,
+                    "remaining": 1000,
+                    "reset_after": 0,
+                    "max_concurrency": 1,
+                },
+            }
+        )
+
+    async def _get_application(self, _request: web.Request) -> web.Response:
+        return _json_response(
+            {
+                "id": str(self.application_id),
+                "name": "moobot",
+                "icon": None,
+                "description": "",
+                "bot_public": True,
+                "bot_require_code_grant": False,
+                "owner": self.bot_user,
+                "verify_key": "",
+                "flags": 0,
+                "team": None,
+            }
+        )
+
+    async def _create_dm(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        recipient = self.members[int(body["recipient_id"])]["user"]
+        channel_id = snowflake()
+        return _json_response(
+            self._store_channel(
+                {"id": str(channel_id), "type": 1, "recipients": [recipient]}, guild=False
+            )
+        )
+
+    async def _get_channel(self, request: web.Request) -> web.Response:
+        channel = self.channels.get(int(request.match_info["channel_id"]))
+        if channel is None:
+            return _error(404, "Unknown Channel", 10003)
+        return _json_response(channel)
+
+    async def _edit_channel(self, request: web.Request) -> web.Response:
+        channel = self.channels.get(int(request.match_info["channel_id"]))
+        if channel is None:
+            return _error(404, "Unknown Channel", 10003)
+        body = await request.json()
+        for key in ("name", "topic", "parent_id", "position", "permission_overwrites", "nsfw"):
+            if key in body:
+                channel[key] = body[key]
+        await self.dispatch("CHANNEL_UPDATE", channel)
+        return _json_response(channel)
+
+    async def _delete_channel(self, request: web.Request) -> web.Response:
+        channel = self.channels.pop(int(request.match_info["channel_id"]), None)
+        if channel is None:
+            return _error(404, "Unknown Channel", 10003)
+        await self.dispatch("CHANNEL_DELETE", channel)
+        return _json_response(channel)
+
+    async def _put_permissions(self, request: web.Request) -> web.Response:
+        channel = self.channels.get(int(request.match_info["channel_id"]))
+        if channel is None:
+            return _error(404, "Unknown Channel", 10003)
+        body = await request.json()
+        target_id = request.match_info["target_id"]
+        overwrites = [o for o in channel["permission_overwrites"] if o["id"] != target_id]
+        overwrites.append(
+            {
+                "id": target_id,
+                "type": body.get("type", 1),
+                "allow": str(body.get("allow", 0)),
+                "deny": str(body.get("deny", 0)),
+            }
+        )
+        channel["permission_overwrites"] = overwrites
+        await self.dispatch("CHANNEL_UPDATE", channel)
+        return web.Response(status=204)
+
+    async def _delete_permissions(self, request: web.Request) -> web.Response:
+        channel = self.channels.get(int(request.match_info["channel_id"]))
+        if channel is None:
+            return _error(404, "Unknown Channel", 10003)
+        target_id = request.match_info["target_id"]
+        channel["permission_overwrites"] = [
+            o for o in channel["permission_overwrites"] if o["id"] != target_id
+        ]
+        await self.dispatch("CHANNEL_UPDATE", channel)
+        return web.Response(status=204)
+
+    async def _get_messages(self, request: web.Request) -> web.Response:
+        channel_id = int(request.match_info["channel_id"])
+        if channel_id not in self.channels:
+            return _error(404, "Unknown Channel", 10003)
+        limit = int(request.query.get("limit", 50))
+        before = int(request.query.get("before", 1 << 63))
+        after = int(request.query.get("after", 0))
+        # newest first, or oldest first when paginating forwards
+        messages = [
+            self._message_with_reactions(m)
+            for m in reversed(self.find_messages(channel_id))
+            if after < int(m["id"]) < before
+        ]
+        if "after" in request.query:
+            messages = messages[::-1][:limit][::-1]
+        return _json_response(messages[:limit])
+
+    async def _create_message(self, request: web.Request) -> web.Response:
+        channel_id = int(request.match_info["channel_id"])
+        if channel_id not in self.channels:
+            return _error(404, "Unknown Channel", 10003)
+        body = await request.json()
+        return _json_response(self._store_message(channel_id, self.bot_user, body))
+
+    async def _get_message(self, request: web.Request) -> web.Response:
+        message = self._find_message(request)
+        if message is None:
+            return _error(404, "Unknown Message", 10008)
+        return _json_response(self._message_with_reactions(message))
+
+    async def _edit_message(self, request: web.Request) -> web.Response:
+        message = self._find_message(request)
+        if message is None:
+            return _error(404, "Unknown Message", 10008)
+        body = await request.json()
+        for key in ("content", "embeds", "components", "flags"):
+            if key in body:
+                message[key] = body[key]
+        message["edited_timestamp"] = _timestamp()
+        return _json_response(self._message_with_reactions(message))
+
+    async def _delete_message(self, request: web.Request) -> web.Response:
+        message = self._find_message(request)
+        if message is None:
+            return _error(404, "Unknown Message", 10008)
+        del self.messages[int(message["channel_id"])][int(message["id"])]
+        self.reactions.pop(int(message["id"]), None)
+        return web.Response(status=204)
+
+    async def _pin_message(self, request: web.Request) -> web.Response:
+        message = self._find_message(request)
+        if message is None:
+            return _error(404, "Unknown Message", 10008)
+        message["pinned"] = True
+        return web.Response(status=204)
+
+    async def _get_reactions(self, request: web.Request) -> web.Response:
+        message = self._find_message(request)
+        if message is None:
+            return _error(404, "Unknown Message", 10008)
+        emoji_key = _emoji_key(_emoji_payload(request.match_info["emoji"]))
+        user_ids = self.reactions.get(int(message["id"]), {}).get(emoji_key, [])
+        after = int(request.query.get("after", 0))
+        limit = int(request.query.get("limit", 25))
+        user_ids = sorted(user_id for user_id in user_ids if user_id > after)[:limit]
+        return _json_response(
+            [
+                self.bot_user if user_id == self.application_id else self.members[user_id]["user"]
+                for user_id in user_ids
+            ]
+        )
+
+    async def _put_reaction(self, request: web.Request) -> web.Response:
+        message = self._find_message(request)
+        if message is None:
+            return _error(404, "Unknown Message", 10008)
+        await self._add_reaction(
+            int(message["channel_id"]),
+            int(message["id"]),
+            self._user_id(request),
+            _emoji_payload(request.match_info["emoji"]),
+        )
+        return web.Response(status=204)
+
+    async def _delete_reaction(self, request: web.Request) -> web.Response:
+        message = self._find_message(request)
+        if message is None:
+            return _error(404, "Unknown Message", 10008)
+        await self._remove_reaction(
+            int(message["channel_id"]),
+            int(message["id"]),
+            self._user_id(request),
+            _emoji_payload(request.match_info["emoji"]),
+        )
+        return web.Response(status=204)
+
+    async def _get_guild_channels(self, _request: web.Request) -> web.Response:
+        return _json_response(self._guild_channels())
+
+    async def _create_guild_channel(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        channel = self._store_channel(
+            {
+                "id": str(snowflake()),
+                "name": body["name"],
+                "type": body.get("type", 0),
+                "parent_id": body.get("parent_id"),
+                "topic": body.get("topic"),
+                "permission_overwrites": [
+                    {**o, "allow": str(o.get("allow", 0)), "deny": str(o.get("deny", 0))}
+                    for o in body.get("permission_overwrites", [])
+                ],
+            }
+        )
+        await self.dispatch("CHANNEL_CREATE", channel)
+        return _json_response(channel)
+
+    async def _get_emojis(self, _request: web.Request) -> web.Response:
+        return _json_response(list(self.emojis.values()))
+
+    async def _get_member(self, request: web.Request) -> web.Response:
+        member = self.members.get(int(request.match_info["user_id"]))
+        if member is None:
+            return _error(404, "Unknown Member", 10007)
+        return _json_response(member)
+
+    async def _add_member_role(self, request: web.Request) -> web.Response:
+        return await self._update_member_roles(request, add=True)
+
+    async def _remove_member_role(self, request: web.Request) -> web.Response:
+        return await self._update_member_roles(request, add=False)
+
+    async def _update_member_roles(self, request: web.Request, add: bool) -> web.Response:
+        member = self.members.get(int(request.match_info["user_id"]))
+        if member is None:
+            return _error(404, "Unknown Member", 10007)
+        role_id = request.match_info["role_id"]
+        roles = [r for r in member["roles"] if r != role_id]
+        member["roles"] = [*roles, role_id] if add else roles
+        await self.dispatch("GUILD_MEMBER_UPDATE", {**member, "guild_id": str(self.guild_id)})
+        return web.Response(status=204)
+
+    async def _put_commands(self, request: web.Request) -> web.Response:
+        commands = await request.json()
+        return _json_response(
+            [
+                {
+                    "type": 1,
+                    "options": [],
+                    "default_member_permissions": None,
+                    **command,
+                    "id": str(snowflake()),
+                    "application_id": str(self.application_id),
+                    "guild_id": request.match_info["guild_id"],
+                    "version": str(snowflake()),
+                }
+                for command in commands
+            ]
+        )
+
+    async def _unhandled(self, request: web.Request) -> web.Response:
+        self.stats.unhandled[f"{request.method} {request.path}"] += 1
+        _logger.warning(f"Unhandled request {request.method} {request.path}")
+        return _error(404, "404: Not Found")
+
+    # gateway
+
+    @property
+    def _gateway_url(self) -> str:
+        return self.base_url.replace("http", "ws", 1) + "/gateway/"
+
+    async def _gateway(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        session = _GatewaySession(ws)
+        await session.send(10, {"heartbeat_interval": HEARTBEAT_INTERVAL_MS})
+        try:
+            async for message in ws:
+                if message.type != WSMsgType.TEXT:
+                    continue
+                payload = json.loads(message.data)
+                await self._on_gateway_payload(session, payload["op"], payload.get("d"))
+        finally:
+            self._sessions.discard(session)
+        return ws
+
+    async def _on_gateway_payload(self, session: _GatewaySession, op: int, data: Any) -> None:
+        if op == 1:  # heartbeat
+            await session.send(11, None)
+        elif op == 2:  # identify
+            session.shard = tuple(data.get("shard") or (0, 1))  # type: ignore
+            await self._send_ready(session)
+        elif op == 6:  # resume, not supported: the client starts a new session
+            await session.send(9, False)
+        elif op == 8:  # request guild members
+            await self._send_member_chunk(session, data)
+
+    async def _send_ready(self, session: _GatewaySession) -> None:
+        shard_id, shard_count = session.shard
+        serves_guild = (self.guild_id >> 22) % shard_count == shard_id
+        await session.send(
+            0,
+            {
+                "v": 10,
+                "user": self.bot_user,
+                "guilds": [{"id": str(self.guild_id), "unavailable": True}] if serves_guild else [],
+                "session_id": uuid.uuid4().hex,
+                "resume_gateway_url": self._gateway_url,
+                "application": {"id": str(self.application_id), "flags": 0},
+                "shard": [shard_id, shard_count],
+                "private_channels": [],
+            },
+            t="READY",
+        )
+        self._sessions.add(session)
+        if serves_guild:
+            await session.send(0, self._guild_create_payload(), t="GUILD_CREATE")
+
+    async def _send_member_chunk(self, session: _GatewaySession, data: Payload) -> None:
+        user_ids = data.get("user_ids")
+        if user_ids is not None:
+            user_ids = [int(user_id) for user_id in user_ids]
+            members = [self.members[u] for u in user_ids if u in self.members]
+            not_found = [str(u) for u in user_ids if u not in self.members]
+        else:
+            query = data.get("query", "").lower()
+            members = [
+                m for m in self.members.values() if m["user"]["username"].lower().startswith(query)
+            ]
+            members = members[: data.get("limit") or None]
+            not_found = []
+        await session.send(
+            0,
+            {
+                "guild_id": str(self.guild_id),
+                "members": members,
+                "chunk_index": 0,
+                "chunk_count": 1,
+                "not_found": not_found,
+                "nonce": data.get("nonce"),
+            },
+            t="GUILD_MEMBERS_CHUNK",
+        )
+
+    def _guild_create_payload(self) -> Payload:
+        # like for large guilds, members are requested when needed rather than sent upfront
+        return {
+            **self.guild,
+            "roles": list(self.roles.values()),
+            "emojis": list(self.emojis.values()),
+            "channels": self._guild_channels(),
+            "members": [self.members[self.application_id]],
+            "member_count": len(self.members),
+            "joined_at": _timestamp(),
+            "threads": [],
+            "voice_states": [],
+            "presences": [],
+        }
+
+    # state helpers
+
+    def _guild_channels(self) -> list[Payload]:
+        return [c for c in self.channels.values() if c["type"] != 1]
+
+    def _store_channel(self, channel: Payload, guild: bool = True) -> Payload:
+        channel = {
+            "position": len(self.channels),
+            "permission_overwrites": [],
+            "parent_id": None,
+            "nsfw": False,
+            "topic": None,
+            "rate_limit_per_user": 0,
+            "last_message_id": None,
+            "flags": 0,
+            **channel,
+        }
+        if channel["parent_id"] is not None:
+            channel["parent_id"] = str(channel["parent_id"])
+        if guild:
+            channel["guild_id"] = str(self.guild_id)
+        self.channels[int(channel["id"])] = channel
+        self.messages[int(channel["id"])] = {}
+        return channel
+
+    def _store_message(self, channel_id: int, author: Payload, body: Payload) -> Payload:
+        message_id = snowflake()
+        message = {
+            "id": str(message_id),
+            "channel_id": str(channel_id),
+            "author": author,
+            "content": body.get("content") or "",
+            "timestamp": _timestamp(),
+            "edited_timestamp": None,
+            "tts": False,
+            "mention_everyone": False,
+            "mentions": [],
+            "mention_roles": [],
+            "attachments": [],
+            "embeds": body.get("embeds") or [],
+            "components": body.get("components") or [],
+            "pinned": False,
+            "type": 0,
+            "flags": 0,
+        }
+        if "guild_id" in self.channels[channel_id]:
+            message["guild_id"] = str(self.guild_id)
+        self.messages[channel_id][message_id] = message
+        self.channels[channel_id]["last_message_id"] = str(message_id)
+        return message
+
+    def _find_message(self, request: web.Request) -> Payload | None:
+        channel_messages = self.messages.get(int(request.match_info["channel_id"]), {})
+        return channel_messages.get(int(request.match_info["message_id"]))
+
+    def _message_with_reactions(self, message: Payload) -> Payload:
+        bot_id = self.application_id
+        reactions = [
+            {
+                "emoji": _emoji_payload(emoji_key),
+                "count": len(user_ids),
+                "count_details": {"burst": 0, "normal": len(user_ids)},
+                "me": bot_id in user_ids,
+                "me_burst": False,
+                "burst_colors": [],
+            }
+            for emoji_key, user_ids in self.reactions.get(int(message["id"]), {}).items()
+            if user_ids
+        ]
+        return {**message, "reactions": reactions}
+
+    def _user_id(self, request: web.Request) -> int:
+        user_id = request.match_info["user_id"]
+        return self.application_id if user_id == "@me" else int(user_id)
+
+    async def _add_reaction(
+        self, channel_id: int, message_id: int, user_id: int, emoji: Payload
+    ) -> None:
+        user_ids = self.reactions.setdefault(message_id, {}).setdefault(_emoji_key(emoji), [])
+        if user_id in user_ids:
+            return
+        user_ids.append(user_id)
+        await self.dispatch(
+            "MESSAGE_REACTION_ADD",
+            {
+                **self._reaction_event(channel_id, message_id, user_id, emoji),
+                "member": self.members[user_id],
+                "message_author_id": str(self.application_id),
+            },
+        )
+
+    async def _remove_reaction(
+        self, channel_id: int, message_id: int, user_id: int, emoji: Payload
+    ) -> None:
+        user_ids = self.reactions.get(message_id, {}).get(_emoji_key(emoji), [])
+        if user_id not in user_ids:
+            return
+        user_ids.remove(user_id)
+        await self.dispatch(
+            "MESSAGE_REACTION_REMOVE", self._reaction_event(channel_id, message_id, user_id, emoji)
+        )
+
+    def _reaction_event(
+        self, channel_id: int, message_id: int, user_id: int, emoji: Payload
+    ) -> Payload:
+        return {
+            "user_id": str(user_id),
+            "channel_id": str(channel_id),
+            "message_id": str(message_id),
+            "guild_id": str(self.guild_id),
+            "emoji": emoji,
+            "type": 0,
+            "burst": False,
+            "burst_colors": [],
+        }
+
+    @staticmethod
+    def _user_payload(user_id: int, name: str, bot: bool = False) -> Payload:
+        return {
+            "id": str(user_id),
+            "username": name,
+            "discriminator": "0",
+            "global_name": None,
+            "avatar": None,
+            "bot": bot,
+            "public_flags": 0,
+        }
+
+
+async def serve(fake_discord: FakeDiscord, host: str = "127.0.0.1", port: int = 0) -> web.AppRunner:
+    """
+    Serve the fake Discord API in the running event loop, setting its `base_url`.
+
+    Returns the runner, clean it up to stop serving.
+    """
+    runner = web.AppRunner(fake_discord.create_app())
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound_host, bound_port = runner.addresses[0][:2]
+    fake_discord.base_url = f"http://{bound_host}:{bound_port}"
+    return runner
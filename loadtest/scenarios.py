@@ -0,0 +1,305 @@
+"""
+Load test scenarios, replayed against a bot connected to the fake Discord server.
+
+Each scenario acts through the fake server as guild members would, and watches the database for
+the bot's reactions to measure latency. Importing this module reads the settings, so the driver
+configures the environment first.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import statistics
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+
+from loadtest.fake_discord import FakeDiscord, FakeDiscordStats
+from moobot.bulk import import_events
+from moobot.db.crud.guilds import upsert_guild_config
+from moobot.db.models import MoobloomEvent, MoobloomEventAttendanceType, MoobloomEventRSVP
+from moobot.db.session import Session
+
+POLL_INTERVAL_SECONDS = 0.02
+COMMAND_PREFIX = "$"
+
+
+@dataclass
+class LoadTestGuild:
+    fake_discord: FakeDiscord
+    calendar_channel_id: int
+    announcement_channel_id: int
+    member_ids: list[int]
+    admin_id: int
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    operations: int
+    completed: int
+    seconds: float
+    latencies: list[float]
+    stats: FakeDiscordStats = field(default_factory=FakeDiscordStats)
+
+    @property
+    def throughput(self) -> float:
+        return self.completed / self.seconds if self.seconds else 0.0
+
+    def percentile(self, p: int) -> float | None:
+        if not self.latencies:
+            return None
+        if len(self.latencies) == 1:
+            return self.latencies[0]
+        return statistics.quantiles(self.latencies, n=100, method="inclusive")[p - 1]
+
+    def format(self, top_routes: int = 8) -> str:
+        def seconds(value: float | None) -> str:
+            return "-" if value is None else f"{value * 1000:.0f}ms"
+
+        percentiles = ", ".join(f"p{p} {seconds(self.percentile(p))}" for p in (50, 90, 99))
+        lines = [
+            (
+                f"{self.name}: {self.completed}/{self.operations} completed in {self.seconds:.1f}s"
+                f" ({self.throughput:.1f}/s)"
+            ),
+            f"  latency: {percentiles}, max {seconds(max(self.latencies, default=None))}",
+            (
+                f"  API calls: {self.stats.total_calls}, rate limited:"
+                f" {sum(self.stats.rate_limited.values())}"
+            ),
+        ]
+        lines += [
+            f"    {route}: {count} ({self.stats.rate_limited[route]} rate limited)"
+            for route, count in self.stats.calls.most_common(top_routes)
+        ]
+        if self.stats.unhandled:
+            lines.append(f"  unhandled routes: {dict(self.stats.unhandled)}")
+        return "\n".join(lines)
+
+
+def seed_guild(fake_discord: FakeDiscord, members: int) -> LoadTestGuild:
+    """
+    Set up the fake guild like a configured Moobloom server, with `members` regular members.
+    """
+    category_name = "Active Events"
+    role_name = "All Events"
+    all_events_emoji_name = "all_events"
+    google_emoji_name = "google_calendar"
+    fake_discord.add_channel(category_name, type=4)
+    calendar_channel_id = fake_discord.add_channel("calendar")
+    announcement_channel_id = fake_discord.add_channel("event-announcements")
+    fake_discord.add_role(role_name)
+    fake_discord.add_emoji(all_events_emoji_name)
+    fake_discord.add_emoji(google_emoji_name)
+
+    member_ids = []
+    for i in range(members + 1):
+        member_id = fake_discord.application_id + 1 + i
+        fake_discord.add_member(member_id, f"member{i}")
+        member_ids.append(member_id)
+
+    with Session() as session:
+        upsert_guild_config(
+            session,
+            fake_discord.guild_id,
+            {
+                "calendar_channel_id": calendar_channel_id,
+                "event_announce_channel_id": announcement_channel_id,
+                "get_all_event_channels_react_emoji_name": all_events_emoji_name,
+                "google_calendar_sync_react_emoji_name": google_emoji_name,
+                "all_events_role_name": role_name,
+                "active_events_category_name": category_name,
+            },
+        )
+    return LoadTestGuild(
+        fake_discord=fake_discord,
+        calendar_channel_id=calendar_channel_id,
+        announcement_channel_id=announcement_channel_id,
+        member_ids=member_ids[1:],
+        admin_id=member_ids[0],
+    )
+
+
+def seed_events(guild: LoadTestGuild, count: int, name_prefix: str = "Event") -> list[int]:
+    """
+    Add events to the database, to be announced by the bot's next `initialize_events` run.
+    """
+    start_date = date.today() + timedelta(days=7)
+    events = [
+        MoobloomEvent(
+            name=f"{name_prefix} {i}",
+            channel_name=f"{name_prefix.lower()}-{i}",
+            start_date=start_date + timedelta(days=i % 60),
+            end_date=start_date + timedelta(days=i % 60),
+        )
+        for i in range(count)
+    ]
+    with Session() as session:
+        import_events(session, events, guild_id=guild.fake_discord.guild_id)
+        return [
+            event_id
+            for (event_id,) in session.query(MoobloomEvent.id).filter(
+                MoobloomEvent.name.startswith(f"{name_prefix} ")
+            )
+        ]
+
+
+def get_reconciled_event_ids(event_ids: list[int]) -> dict[int, int]:
+    """
+    Get the announcement message IDs of the given events that were fully set up by the bot.
+    """
+    with Session() as session:
+        rows = (
+            session.query(MoobloomEvent.id, MoobloomEvent.announcement_message_id)
+            .filter(MoobloomEvent.id.in_(event_ids))
+            .filter(MoobloomEvent.reactions_created == True)
+            .all()
+        )
+    return {event_id: message_id for event_id, message_id in rows}
+
+
+async def poll[T](
+    check: Callable[[], T], done: Callable[[T], bool], timeout_seconds: float
+) -> tuple[T, bool]:
+    """
+    Call `check` until `done` accepts its result or the timeout expires.
+    """
+    deadline = time.perf_counter() + timeout_seconds
+    while True:
+        result = await asyncio.to_thread(check)
+        if done(result) or time.perf_counter() > deadline:
+            return result, done(result)
+        await asyncio.sleep(POLL_INTERVAL_SECONDS)
+
+
+async def measure(
+    guild: LoadTestGuild, run: Callable[[], Awaitable[ScenarioResult]]
+) -> ScenarioResult:
+    """
+    Run a scenario, recording the API calls the bot made meanwhile.
+    """
+    stats_before = guild.fake_discord.stats.copy()
+    result = await run()
+    result.stats = guild.fake_discord.stats - stats_before
+    return result
+
+
+async def wait_for_events(
+    name: str, event_ids: list[int], started_at: float, timeout_seconds: float
+) -> ScenarioResult:
+    """
+    Wait until the bot has set up the given events, recording how long each one took.
+    """
+    latencies: dict[int, float] = {}
+
+    def check() -> dict[int, int]:
+        reconciled = get_reconciled_event_ids(event_ids)
+        now = time.perf_counter()
+        for event_id in reconciled.keys() - latencies.keys():
+            latencies[event_id] = now - started_at
+        return reconciled
+
+    reconciled, _ = await poll(check, lambda r: len(r) == len(event_ids), timeout_seconds)
+    return ScenarioResult(
+        name=name,
+        operations=len(event_ids),
+        completed=len(reconciled),
+        seconds=max(latencies.values(), default=time.perf_counter() - started_at),
+        latencies=sorted(latencies.values()),
+    )
+
+
+async def event_burst(
+    guild: LoadTestGuild, events: int, timeout_seconds: float, **_kwargs: object
+) -> ScenarioResult:
+    """
+    Add a burst of events and ask the bot to refresh, like after a bulk import.
+    """
+
+    async def run() -> ScenarioResult:
+        event_ids = seed_events(guild, events, name_prefix=f"Burst {time.monotonic_ns()}")
+        started_at = time.perf_counter()
+        await guild.fake_discord.send_message_as_user(
+            guild.announcement_channel_id, guild.admin_id, f"{COMMAND_PREFIX}e refresh"
+        )
+        return await wait_for_events("event_burst", event_ids, started_at, timeout_seconds)
+
+    return await measure(guild, run)
+
+
+async def reaction_storm(
+    guild: LoadTestGuild,
+    reactions: int,
+    rate: float,
+    timeout_seconds: float,
+    event_ids: list[int],
+    **_kwargs: object,
+) -> ScenarioResult:
+    """
+    Have random members RSVP to random events, `rate` reactions per second (0 for no limit).
+
+    Each member reacts at most once per event, so that every reaction results in exactly one
+    RSVP. An RSVP's latency is the time until it's stored in the database.
+    """
+
+    async def run() -> ScenarioResult:
+        announcements = get_reconciled_event_ids(event_ids)
+        pairs = [(user_id, event_id) for user_id in guild.member_ids for event_id in announcements]
+        pairs = random.sample(pairs, min(reactions, len(pairs)))
+        rsvp_types = list(MoobloomEventAttendanceType)
+
+        # (user ID, event ID) -> (sent at, expected attendance type)
+        sent: dict[tuple[int, int], tuple[float, MoobloomEventAttendanceType]] = {}
+        latencies: dict[tuple[int, int], float] = {}
+        started_at = time.perf_counter()
+        for i, (user_id, event_id) in enumerate(pairs):
+            rsvp_type = random.choice(rsvp_types)
+            sent[(user_id, event_id)] = (time.perf_counter(), rsvp_type)
+            await guild.fake_discord.add_reaction_as_user(
+                guild.announcement_channel_id,
+                announcements[event_id],
+                user_id,
+                rsvp_type.rsvp_react_emoji,
+            )
+            if rate:
+                await asyncio.sleep(max(0.0, started_at + (i + 1) / rate - time.perf_counter()))
+
+        def check() -> int:
+            with Session() as session:
+                rows = session.query(
+                    MoobloomEventRSVP.user_id,
+                    MoobloomEventRSVP.event_id,
+                    MoobloomEventRSVP.attendance_type,
+                ).filter(MoobloomEventRSVP.event_id.in_(announcements))
+                now = time.perf_counter()
+                for user_id, event_id, attendance_type in rows:
+                    key = (user_id, event_id)
+                    if key in sent and key not in latencies and sent[key][1] == attendance_type:
+                        latencies[key] = now - sent[key][0]
+            return len(latencies)
+
+        completed, _ = await poll(check, lambda n: n == len(sent), timeout_seconds)
+        finished_at = max(
+            (sent[key][0] + latency for key, latency in latencies.items()),
+            default=time.perf_counter(),
+        )
+        return ScenarioResult(
+            name="reaction_storm",
+            operations=len(sent),
+            completed=completed,
+            seconds=finished_at - started_at,
+            latencies=sorted(latencies.values()),
+        )
+
+    return await measure(guild, run)
+
+
+Scenario = Callable[..., Awaitable[ScenarioResult]]
+
+SCENARIOS: dict[str, Scenario] = {
+    "reaction_storm": reaction_storm,
+    "event_burst": event_burst,
+}
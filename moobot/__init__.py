@@ -1,7 +1,7 @@
 import logging
 import sys
 
-from moobot.settings import get_settings
+from moobot.settings import Settings, get_settings, subscribe_to_settings
 
 
 def _configure_logging() -> None:
@@ -14,5 +14,13 @@ def _configure_logging() -> None:
     notifier_bot_root_logger.addHandler(stdout_handler)
     notifier_bot_root_logger.setLevel(settings.log_level)
 
+    def update_logging(settings: Settings, _changed: set[str]) -> None:
+        stdout_handler.setFormatter(
+            logging.Formatter(settings.log_format, settings.log_date_format)
+        )
+        notifier_bot_root_logger.setLevel(settings.log_level)
+
+    subscribe_to_settings(("log_level", "log_format", "log_date_format"), update_logging)
+
 
 _configure_logging()
@@ -0,0 +1,483 @@
+"""
+Bulk import and export of events in CSV and iCalendar formats.
+
+Usage:
+    python -m moobot.bulk import events.csv
+    python -m moobot.bulk export --format ics events.ics
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import logging
+import sys
+from collections.abc import Iterable, Iterator
+from datetime import UTC, date, datetime, timedelta
+from enum import Enum
+from zoneinfo import ZoneInfo
+
+from sqlalchemy.orm import Session as SessionCls
+from sqlalchemy.orm import selectinload
+
+from moobot.db.models import MoobloomEvent, MoobloomEventAttendanceType, MoobloomEventRSVP
+from moobot.db.session import Session, init_db
+from moobot.discord.views.event_modal import (
+    EventTime,
+    _parse_event_description,
+    _parse_event_time,
+)
+from moobot.settings import get_settings
+from moobot.util.format import format_event_description_for_event_modal
+
+settings = get_settings()
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+
+# columns accepted on import; an event's time is read from either the free-form "time" column
+# (same syntax as the create event modal) or from the explicit ISO columns written on export
+CSV_EVENT_COLUMNS = [
+    "id",
+    "name",
+    "channel_name",
+    "time",
+    "start_date",
+    "start_time",
+    "end_date",
+    "end_time",
+    "location",
+    "description",
+]
+CSV_RSVP_COLUMNS = ["event_id", "event_name", "user_id", "attendance_type", "created_at"]
+
+ICS_PARTSTAT = {
+    MoobloomEventAttendanceType.YES: "ACCEPTED",
+    MoobloomEventAttendanceType.MAYBE: "TENTATIVE",
+    MoobloomEventAttendanceType.NO: "DECLINED",
+}
+
+
+class EventFileFormat(str, Enum):
+    CSV = "csv"
+    ICS = "ics"
+
+
+def _build_event(
+    name: str,
+    time: EventTime,
+    channel_name: str | None,
+    location: str | None,
+    raw_description: str | None,
+    created_by: int | None,
+) -> MoobloomEvent:
+    description_and_urls = _parse_event_description(raw_description)
+    return MoobloomEvent(
+        name=name,
+        create_channel=channel_name is not None,
+        channel_name=channel_name,
+        start_date=time.start_date,
+        start_time=time.start_time,
+        end_date=time.end_date,
+        end_time=time.end_time,
+        location=location,
+        description=description_and_urls.description,
+        url=description_and_urls.url,
+        image_url=description_and_urls.image_url,
+        created_by=created_by,
+    )
+
+
+def _parse_csv_event_time(row: dict[str, str]) -> EventTime:
+    if row.get("time"):
+        return _parse_event_time(row["time"])
+
+    start_date = date.fromisoformat(row["start_date"])
+    return EventTime(
+        start_date=start_date,
+        start_time=datetime.fromisoformat(row["start_time"]) if row.get("start_time") else None,
+        end_date=date.fromisoformat(row["end_date"]) if row.get("end_date") else start_date,
+        end_time=datetime.fromisoformat(row["end_time"]) if row.get("end_time") else None,
+    )
+
+
+def parse_csv_events(
+    lines: Iterable[str], created_by: int | None = None
+) -> Iterator[MoobloomEvent]:
+    reader = csv.DictReader(lines)
+    for row in reader:
+        try:
+            yield _build_event(
+                name=row["name"],
+                time=_parse_csv_event_time(row),
+                channel_name=row.get("channel_name") or None,
+                location=row.get("location") or None,
+                raw_description=row.get("description") or None,
+                created_by=created_by,
+            )
+        except (KeyError, ValueError) as e:
+            raise ValueError(f"Could not import event on line {reader.line_num}: {e}") from e
+
+
+def _unfold_ics_lines(lines: Iterable[str]) -> Iterator[str]:
+    current: str | None = None
+    for raw_line in lines:
+        line = raw_line.rstrip("\r\n")
+        if line.startswith((" ", "\t")) and current is not None:
+            current += line[1:]
+            continue
+        if current:
+            yield current
+        current = line
+    if current:
+        yield current
+
+
+def _parse_ics_property(line: str) -> tuple[str, dict[str, str], str]:
+    name_and_params, _, value = line.partition(":")
+    name, *raw_params = name_and_params.split(";")
+    params = dict(p.split("=", 1) for p in raw_params if "=" in p)
+    return name.upper(), {k.upper(): v for k, v in params.items()}, value
+
+
+def _unescape_ics_text(value: str) -> str:
+    return (
+        value.replace("\\n", "\n")
+        .replace("\\N", "\n")
+        .replace("\\,", ",")
+        .replace("\\;", ";")
+        .replace("\\\\", "\\")
+    )
+
+
+def _escape_ics_text(value: str) -> str:
+    return value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+
+def _parse_ics_datetime(value: str, params: dict[str, str]) -> tuple[date, datetime | None]:
+    if params.get("VALUE") == "DATE" or len(value) == 8:
+        return datetime.strptime(value, "%Y%m%d").date(), None
+
+    # event times are stored as naive datetimes in the bot's timezone
+    local_tz = ZoneInfo(settings.tz)
+    if value.endswith("Z"):
+        dt = datetime.strptime(value, "%Y%m%dT%H%M%SZ").replace(tzinfo=UTC)
+        dt = dt.astimezone(local_tz).replace(tzinfo=None)
+    else:
+        dt = datetime.strptime(value, "%Y%m%dT%H%M%S")
+        if (tzid := params.get("TZID")) is not None:
+            dt = dt.replace(tzinfo=ZoneInfo(tzid)).astimezone(local_tz).replace(tzinfo=None)
+    return dt.date(), dt
+
+
+def _build_ics_event_time(
+    start: tuple[date, datetime | None],
+    end: tuple[date, datetime | None] | None,
+    end_date_without_time: date | None = None,
+) -> EventTime:
+    start_date, start_time = start
+    if end is None:
+        return EventTime(
+            start_date=start_date,
+            start_time=start_time,
+            end_date=end_date_without_time or start_date,
+            end_time=None,
+        )
+
+    end_date, end_time = end
+    if start_time is None:
+        # iCalendar end dates are exclusive, but we store inclusive end dates
+        return EventTime(
+            start_date=start_date,
+            start_time=None,
+            end_date=max(start_date, end_date - timedelta(days=1)),
+            end_time=None,
+        )
+
+    return EventTime(
+        start_date=start_date,
+        start_time=start_time,
+        end_date=end_date,
+        end_time=end_time if end_time != start_time else None,
+    )
+
+
+def parse_ics_events(
+    lines: Iterable[str], created_by: int | None = None
+) -> Iterator[MoobloomEvent]:
+    """
+    Parse VEVENT components from an iCalendar stream.
+
+    Event times are taken from DTSTART/DTEND directly rather than through the free-form time
+    parser, since they are already structured. Descriptions go through the same URL extraction
+    as the create event modal.
+    """
+    properties: dict[str, tuple[dict[str, str], str]] | None = None
+    for line_num, line in enumerate(_unfold_ics_lines(lines), start=1):
+        name, params, value = _parse_ics_property(line)
+        if name == "BEGIN" and value.upper() == "VEVENT":
+            properties = {}
+        elif name == "END" and value.upper() == "VEVENT" and properties is not None:
+            try:
+                dtstart_params, dtstart = properties["DTSTART"]
+                start = _parse_ics_datetime(dtstart, dtstart_params)
+                end = None
+                if "DTEND" in properties:
+                    dtend_params, dtend = properties["DTEND"]
+                    end = _parse_ics_datetime(dtend, dtend_params)
+                end_date_without_time = None
+                if "X-MOOBOT-END-DATE" in properties:
+                    end_date_params, end_date = properties["X-MOOBOT-END-DATE"]
+                    end_date_without_time = _parse_ics_datetime(end_date, end_date_params)[0]
+                event = _build_event(
+                    name=_unescape_ics_text(properties["SUMMARY"][1]),
+                    time=_build_ics_event_time(start, end, end_date_without_time),
+                    channel_name=properties.get("X-MOOBOT-CHANNEL-NAME", ({}, ""))[1] or None,
+                    location=_unescape_ics_text(properties.get("LOCATION", ({}, ""))[1]) or None,
+                    raw_description=(
+                        _unescape_ics_text(properties.get("DESCRIPTION", ({}, ""))[1]) or None
+                    ),
+                    created_by=created_by,
+                )
+            except (KeyError, ValueError) as e:
+                raise ValueError(f"Could not import event ending on line {line_num}: {e}") from e
+            if "URL" in properties:
+                event.url = properties["URL"][1]
+            yield event
+            properties = None
+        elif properties is not None:
+            properties[name] = (params, value)
+
+
+def parse_events(
+    lines: Iterable[str], file_format: EventFileFormat, created_by: int | None = None
+) -> Iterator[MoobloomEvent]:
+    if file_format == EventFileFormat.CSV:
+        return parse_csv_events(lines, created_by=created_by)
+    return parse_ics_events(lines, created_by=created_by)
+
+
+def import_events(
+    session: SessionCls,
+    events: Iterable[MoobloomEvent],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    guild_id: int | None = None,
+) -> int:
+    """
+    Insert events in batches, in a single transaction. Returns the number of imported events.
+
+    If an event can't be parsed, nothing is imported. Events are added to the given guild and
+    announced by its next run of `initialize_events`.
+    """
+    imported = 0
+    batch: list[MoobloomEvent] = []
+    try:
+        for event in events:
+            if guild_id is not None:
+                event.guild_id = guild_id
+            batch.append(event)
+            if len(batch) >= batch_size:
+                imported += _insert_batch(session, batch)
+                batch = []
+        if batch:
+            imported += _insert_batch(session, batch)
+    except Exception:
+        session.rollback()
+        raise
+    session.commit()
+
+    _logger.info(f"Imported {imported} events")
+    return imported
+
+
+def _insert_batch(session: SessionCls, batch: list[MoobloomEvent]) -> int:
+    session.add_all(batch)
+    session.flush()
+    # imported objects are no longer needed, don't let them pile up in the identity map
+    session.expunge_all()
+    return len(batch)
+
+
+def _write_csv_row(row: Iterable[object]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(row)
+    return buffer.getvalue()
+
+
+def _format_optional(value: date | datetime | None) -> str:
+    return value.isoformat() if value is not None else ""
+
+
+def export_events_csv(
+    session: SessionCls,
+    guild_id: int | None = None,
+    include_deleted: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[str]:
+    yield _write_csv_row(CSV_EVENT_COLUMNS)
+
+    query = session.query(MoobloomEvent)
+    if guild_id is not None:
+        query = query.filter(MoobloomEvent.guild_id == guild_id)
+    if not include_deleted:
+        query = query.filter(MoobloomEvent.deleted == False)
+    for event in query.order_by(MoobloomEvent.id).yield_per(batch_size):
+        yield _write_csv_row(
+            [
+                event.id,
+                event.name,
+                event.channel_name or "",
+                "",
+                event.start_date.isoformat(),
+                _format_optional(event.start_time),
+                event.end_date.isoformat(),
+                _format_optional(event.end_time),
+                event.location or "",
+                format_event_description_for_event_modal(event) or "",
+            ]
+        )
+
+
+def export_rsvps_csv(
+    session: SessionCls,
+    guild_id: int | None = None,
+    include_deleted: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[str]:
+    yield _write_csv_row(CSV_RSVP_COLUMNS)
+
+    query = session.query(
+        MoobloomEventRSVP.event_id,
+        MoobloomEvent.name,
+        MoobloomEventRSVP.user_id,
+        MoobloomEventRSVP.attendance_type,
+        MoobloomEventRSVP.created_at,
+    ).join(MoobloomEventRSVP.event)
+    if guild_id is not None:
+        query = query.filter(MoobloomEvent.guild_id == guild_id)
+    if not include_deleted:
+        query = query.filter(MoobloomEvent.deleted == False)
+    for row in query.order_by(MoobloomEventRSVP.id).yield_per(batch_size):
+        yield _write_csv_row(
+            [
+                row.event_id,
+                row.name,
+                row.user_id,
+                row.attendance_type.value,
+                row.created_at.isoformat(),
+            ]
+        )
+
+
+def _fold_ics_line(line: str) -> str:
+    # content lines should not be longer than 75 octets, continuation lines start with a space
+    chunks = [line[:74]] + [f" {line[i : i + 73]}" for i in range(74, len(line), 73)]
+    return "\r\n".join(chunks) + "\r\n"
+
+
+def _format_ics_utc_datetime(value: datetime) -> str:
+    # written in UTC, a TZID would require a VTIMEZONE component describing the bot's timezone
+    utc_value = value.replace(tzinfo=ZoneInfo(settings.tz)).astimezone(UTC)
+    return utc_value.strftime("%Y%m%dT%H%M%SZ")
+
+
+def _format_ics_event(event: MoobloomEvent) -> Iterator[str]:
+    yield "BEGIN:VEVENT"
+    yield f"UID:moob{event.id}@moobot"
+    yield f"DTSTAMP:{event.updated_at.strftime('%Y%m%dT%H%M%S')}"
+    if event.start_time is not None:
+        yield f"DTSTART:{_format_ics_utc_datetime(event.start_time)}"
+        if event.end_time is not None:
+            yield f"DTEND:{_format_ics_utc_datetime(event.end_time)}"
+        elif event.end_date != event.start_date:
+            # iCalendar can't express an end date without an end time for timed events
+            yield f"X-MOOBOT-END-DATE;VALUE=DATE:{event.end_date.strftime('%Y%m%d')}"
+    else:
+        yield f"DTSTART;VALUE=DATE:{event.start_date.strftime('%Y%m%d')}"
+        end_date = event.end_date + timedelta(days=1)
+        yield f"DTEND;VALUE=DATE:{end_date.strftime('%Y%m%d')}"
+    yield f"SUMMARY:{_escape_ics_text(event.name)}"
+    if event.location:
+        yield f"LOCATION:{_escape_ics_text(event.location)}"
+    if event.description:
+        yield f"DESCRIPTION:{_escape_ics_text(event.description)}"
+    if event.url:
+        yield f"URL:{event.url}"
+    if event.channel_name:
+        yield f"X-MOOBOT-CHANNEL-NAME:{event.channel_name}"
+    for rsvp in event.rsvps:
+        partstat = ICS_PARTSTAT[rsvp.attendance_type]
+        yield f"ATTENDEE;PARTSTAT={partstat}:urn:discord:user:{rsvp.user_id}"
+    yield "END:VEVENT"
+
+
+def export_events_ics(
+    session: SessionCls,
+    guild_id: int | None = None,
+    include_deleted: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[str]:
+    yield _fold_ics_line("BEGIN:VCALENDAR")
+    yield _fold_ics_line("VERSION:2.0")
+    yield _fold_ics_line("PRODID:-//moobot//Moobloom Events//EN")
+
+    query = session.query(MoobloomEvent).options(selectinload(MoobloomEvent.rsvps))
+    if guild_id is not None:
+        query = query.filter(MoobloomEvent.guild_id == guild_id)
+    if not include_deleted:
+        query = query.filter(MoobloomEvent.deleted == False)
+    for event in query.order_by(MoobloomEvent.id).yield_per(batch_size):
+        for line in _format_ics_event(event):
+            yield _fold_ics_line(line)
+
+    yield _fold_ics_line("END:VCALENDAR")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m moobot.bulk", description=__doc__)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = subparsers.add_parser("import", help="Import events from a file")
+    import_parser.add_argument("file", type=argparse.FileType("r", encoding="utf-8"))
+    import_parser.add_argument("--format", type=EventFileFormat, default=None)
+    import_parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    import_parser.add_argument("--guild-id", type=int, required=True)
+
+    export_parser = subparsers.add_parser("export", help="Export events or RSVPs to a file")
+    export_parser.add_argument("file", type=argparse.FileType("w", encoding="utf-8"))
+    export_parser.add_argument("--format", type=EventFileFormat, default=EventFileFormat.CSV)
+    export_parser.add_argument("--rsvps", action="store_true", help="Export RSVPs (CSV only)")
+    export_parser.add_argument("--include-deleted", action="store_true")
+    export_parser.add_argument("--guild-id", type=int, help="Only export this guild's events")
+
+    args = parser.parse_args(argv)
+
+    init_db()
+    with Session() as session:
+        if args.command == "import":
+            file_format = args.format or (
+                EventFileFormat.ICS if args.file.name.endswith(".ics") else EventFileFormat.CSV
+            )
+            imported = import_events(
+                session,
+                parse_events(args.file, file_format),
+                batch_size=args.batch_size,
+                guild_id=args.guild_id,
+            )
+            print(f"Imported {imported} events, they will be announced on the next refresh")
+            return
+
+        export_kwargs = {"guild_id": args.guild_id, "include_deleted": args.include_deleted}
+        if args.rsvps:
+            lines = export_rsvps_csv(session, **export_kwargs)
+        elif args.format == EventFileFormat.ICS:
+            lines = export_events_ics(session, **export_kwargs)
+        else:
+            lines = export_events_csv(session, **export_kwargs)
+        args.file.writelines(lines)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
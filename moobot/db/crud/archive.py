@@ -0,0 +1,97 @@
+from collections.abc import Collection
+from datetime import date
+from typing import NamedTuple
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session, selectinload
+
+from moobot.db.models import (
+    MoobloomEvent,
+    MoobloomEventArchive,
+    MoobloomEventRSVP,
+    MoobloomEventRSVPArchive,
+)
+
+_EVENT_COLUMNS = [c.name for c in MoobloomEvent.__table__.columns]
+_RSVP_COLUMNS = [c.name for c in MoobloomEventRSVP.__table__.columns]
+
+
+class ArchivedEventMessages(NamedTuple):
+    announcement_message_id: int | None
+    channel_introduction_message_id: int | None
+
+
+def archive_events_ended_before(
+    session: Session,
+    ended_before: date,
+    batch_size: int = 500,
+    guild_ids: Collection[int] | None = None,
+) -> list[ArchivedEventMessages]:
+    """
+    Move events which ended before the given date, along with their RSVPs, into the archive tables.
+
+    Only events of the given guilds are moved, or of all guilds if None. Events are moved in
+    batches of `batch_size`, with one commit per batch. Returns the Discord message IDs of the
+    archived events.
+    """
+    archived: list[ArchivedEventMessages] = []
+    while True:
+        query = select(
+            MoobloomEvent.id,
+            MoobloomEvent.announcement_message_id,
+            MoobloomEvent.channel_introduction_message_id,
+        ).filter(MoobloomEvent.end_date < ended_before)
+        if guild_ids is not None:
+            query = query.filter(MoobloomEvent.guild_id.in_(guild_ids))
+        rows = session.execute(query.order_by(MoobloomEvent.id).limit(batch_size)).all()
+        if not rows:
+            break
+
+        event_ids = [row.id for row in rows]
+        session.execute(
+            insert(MoobloomEventArchive).from_select(
+                _EVENT_COLUMNS,
+                select(*(MoobloomEvent.__table__.c[c] for c in _EVENT_COLUMNS)).filter(
+                    MoobloomEvent.id.in_(event_ids)
+                ),
+            )
+        )
+        session.execute(
+            insert(MoobloomEventRSVPArchive).from_select(
+                _RSVP_COLUMNS,
+                select(*(MoobloomEventRSVP.__table__.c[c] for c in _RSVP_COLUMNS)).filter(
+                    MoobloomEventRSVP.event_id.in_(event_ids)
+                ),
+            )
+        )
+        session.execute(delete(MoobloomEventRSVP).filter(MoobloomEventRSVP.event_id.in_(event_ids)))
+        session.execute(delete(MoobloomEvent).filter(MoobloomEvent.id.in_(event_ids)))
+        session.commit()
+
+        archived.extend(
+            ArchivedEventMessages(row.announcement_message_id, row.channel_introduction_message_id)
+            for row in rows
+        )
+
+    return archived
+
+
+def get_archived_event_by_id(session: Session, id: int) -> MoobloomEventArchive | None:
+    return (
+        session.query(MoobloomEventArchive)
+        .filter(MoobloomEventArchive.id == id)
+        .options(selectinload(MoobloomEventArchive.rsvps))
+        .one_or_none()
+    )
+
+
+def get_archived_events(
+    session: Session, ended_after: date | None = None, include_deleted: bool = False
+) -> list[MoobloomEventArchive]:
+    query = session.query(MoobloomEventArchive)
+    if ended_after is not None:
+        query = query.filter(MoobloomEventArchive.end_date >= ended_after)
+    if not include_deleted:
+        query = query.filter(MoobloomEventArchive.deleted == False)
+
+    return query.order_by(MoobloomEventArchive.start_date).all()
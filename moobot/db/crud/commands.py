@@ -0,0 +1,25 @@
+from sqlalchemy.orm import Session
+
+from moobot.db.models import CommandTreeSync
+
+
+def get_command_tree_hash(session: Session, guild_id: int) -> str | None:
+    return (
+        session.query(CommandTreeSync.command_hash)
+        .filter(CommandTreeSync.guild_id == guild_id)
+        .scalar()
+    )
+
+
+def set_command_tree_hash(
+    session: Session, guild_id: int, command_hash: str, commit: bool = True
+) -> None:
+    command_tree_sync = (
+        session.query(CommandTreeSync).filter(CommandTreeSync.guild_id == guild_id).one_or_none()
+    )
+    if command_tree_sync is None:
+        session.add(CommandTreeSync(guild_id=guild_id, command_hash=command_hash))
+    else:
+        command_tree_sync.command_hash = command_hash
+    if commit:
+        session.commit()
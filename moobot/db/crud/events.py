@@ -1,6 +1,10 @@
-from sqlalchemy.orm import Session
+from typing import Any
+
+from sqlalchemy import ColumnElement
+from sqlalchemy.orm import InstrumentedAttribute, Session, selectinload
 
 from moobot.db.models import MoobloomEvent
+from moobot.db.snapshots import EventSnapshot
 
 
 def get_event_by_id(
@@ -8,16 +12,52 @@ def get_event_by_id(
 ) -> MoobloomEvent | None:
     query = session.query(MoobloomEvent).filter(MoobloomEvent.id == id)
     if not include_deleted:
-        query.filter(MoobloomEvent.deleted == False)
+        query = query.filter(MoobloomEvent.deleted == False)
 
     return query.one_or_none()
 
 
 def get_event_by_name(
-    session: Session, name: str, include_deleted: bool = False
+    session: Session, name: str, include_deleted: bool = False, guild_id: int | None = None
 ) -> MoobloomEvent | None:
     query = session.query(MoobloomEvent).filter(MoobloomEvent.name == name)
+    if guild_id is not None:
+        query = query.filter(MoobloomEvent.guild_id == guild_id)
     if not include_deleted:
-        query.filter(MoobloomEvent.deleted == False)
+        query = query.filter(MoobloomEvent.deleted == False)
 
     return query.first()
+
+
+def get_event_snapshot(
+    session: Session, id: int, include_rsvps: bool = True
+) -> EventSnapshot | None:
+    query = session.query(MoobloomEvent).filter(MoobloomEvent.id == id)
+    if include_rsvps:
+        query = query.options(selectinload(MoobloomEvent.rsvps))
+
+    event = query.one_or_none()
+    return EventSnapshot.from_model(event, include_rsvps) if event is not None else None
+
+
+def get_event_snapshots(
+    session: Session,
+    *criteria: ColumnElement[bool],
+    include_rsvps: bool = False,
+    order_by: InstrumentedAttribute | None = None,
+) -> list[EventSnapshot]:
+    query = session.query(MoobloomEvent).filter(*criteria)
+    if include_rsvps:
+        query = query.options(selectinload(MoobloomEvent.rsvps))
+    if order_by is not None:
+        query = query.order_by(order_by)
+
+    return [EventSnapshot.from_model(event, include_rsvps) for event in query.all()]
+
+
+def update_event_by_id(
+    session: Session, id: int, values: dict[Any, Any], commit: bool = True
+) -> None:
+    session.query(MoobloomEvent).filter(MoobloomEvent.id == id).update(values)
+    if commit:
+        session.commit()
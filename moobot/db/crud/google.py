@@ -7,7 +7,7 @@ def create_auth_session(session: Session, state: str, user_id: int, commit: bool
     session.add(
         GoogleApiAuthSession(
             state=state,
-            user_id=str(user_id),
+            user_id=user_id,
         )
     )
     if commit:
@@ -29,7 +29,7 @@ def create_api_user(
 ) -> None:
     session.add(
         GoogleApiUser(
-            user_id=str(user_id),
+            user_id=user_id,
             token=token,
             refresh_token=refresh_token,
             token_uri=token_uri,
@@ -41,7 +41,7 @@ def create_api_user(
 
 
 def get_api_user_by_user_id(session: Session, user_id: int) -> GoogleApiUser | None:
-    return session.query(GoogleApiUser).filter(GoogleApiUser.user_id == str(user_id)).first()
+    return session.query(GoogleApiUser).filter(GoogleApiUser.user_id == user_id).first()
 
 
 def get_api_users_by_setup_finished(session: Session, setup_finished: bool) -> list[GoogleApiUser]:
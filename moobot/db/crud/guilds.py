@@ -0,0 +1,99 @@
+from typing import Any, NamedTuple
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from moobot.db.models import GuildConfig, MoobloomEvent
+from moobot.db.snapshots import GuildConfigSnapshot
+
+REQUIRED_GUILD_CONFIG_COLUMNS = {
+    c.name for c in GuildConfig.__table__.columns if not c.nullable and c.default is None
+} - {"id", "guild_id"}
+
+CALENDAR_HEADER_KEY = "header"
+
+
+class CalendarMessage(NamedTuple):
+    # CALENDAR_HEADER_KEY, or the key of the calendar page in the message
+    key: str
+    message_id: int
+    content_hash: str
+
+
+def get_guild_config(session: Session, guild_id: int) -> GuildConfigSnapshot | None:
+    guild_config = session.query(GuildConfig).filter(GuildConfig.guild_id == guild_id).one_or_none()
+    return GuildConfigSnapshot.from_model(guild_config) if guild_config is not None else None
+
+
+def get_guild_configs(session: Session) -> list[GuildConfigSnapshot]:
+    return [
+        GuildConfigSnapshot.from_model(guild_config)
+        for guild_config in session.query(GuildConfig).order_by(GuildConfig.id).all()
+    ]
+
+
+def upsert_guild_config(
+    session: Session, guild_id: int, values: dict[str, Any], commit: bool = True
+) -> GuildConfigSnapshot:
+    """
+    Create or update the configuration of a guild.
+
+    Creating a configuration requires values for all of its columns.
+    """
+    guild_config = session.query(GuildConfig).filter(GuildConfig.guild_id == guild_id).one_or_none()
+    if guild_config is None:
+        if missing := REQUIRED_GUILD_CONFIG_COLUMNS - values.keys():
+            raise ValueError(f"Missing guild configuration values: {', '.join(sorted(missing))}")
+        guild_config = GuildConfig(guild_id=guild_id)
+        session.add(guild_config)
+    elif values.get("calendar_channel_id", guild_config.calendar_channel_id) != (
+        guild_config.calendar_channel_id
+    ):
+        # the calendar is sent anew to the new channel
+        guild_config.calendar_messages = None
+    for key, value in values.items():
+        setattr(guild_config, key, value)
+
+    if commit:
+        session.commit()
+    else:
+        session.flush()
+    return GuildConfigSnapshot.from_model(guild_config)
+
+
+def assign_events_without_guild(session: Session, guild_id: int, commit: bool = True) -> int:
+    """
+    Move events created before multi-guild support into the given guild.
+
+    Returns the number of moved events.
+    """
+    result = session.execute(
+        update(MoobloomEvent).where(MoobloomEvent.guild_id == None).values(guild_id=guild_id)
+    )
+    if commit:
+        session.commit()
+    return result.rowcount  # type: ignore
+
+
+def get_calendar_messages(session: Session, guild_id: int) -> list[CalendarMessage]:
+    """
+    Get the messages of the guild's calendar in order, the header followed by the pages.
+    """
+    calendar_messages = (
+        session.query(GuildConfig.calendar_messages)
+        .filter(GuildConfig.guild_id == guild_id)
+        .scalar()
+    )
+    return [CalendarMessage(*message) for message in calendar_messages or []]
+
+
+def set_calendar_messages(
+    session: Session, guild_id: int, messages: list[CalendarMessage], commit: bool = True
+) -> None:
+    session.execute(
+        update(GuildConfig)
+        .where(GuildConfig.guild_id == guild_id)
+        .values(calendar_messages=[list(message) for message in messages])
+    )
+    if commit:
+        session.commit()
@@ -0,0 +1,60 @@
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+from moobot.db.models import BotStatus, GoogleApiUser, MetricsSnapshot
+
+
+def report_bot_status(
+    session: Session,
+    name: str,
+    connected: bool,
+    gateway_latency_seconds: float | None,
+    scheduler_lag_seconds: float,
+    last_reconciled_at: datetime | None,
+    started_at: datetime,
+    commit: bool = True,
+) -> None:
+    bot_status = session.query(BotStatus).filter(BotStatus.name == name).one_or_none()
+    if bot_status is None:
+        bot_status = BotStatus(name=name)
+        session.add(bot_status)
+    bot_status.connected = connected
+    bot_status.gateway_latency_seconds = gateway_latency_seconds
+    bot_status.scheduler_lag_seconds = scheduler_lag_seconds
+    bot_status.last_reconciled_at = last_reconciled_at
+    bot_status.started_at = started_at
+    bot_status.reported_at = datetime.now()
+    if commit:
+        session.commit()
+
+
+def get_bot_statuses(session: Session) -> list[BotStatus]:
+    return session.query(BotStatus).order_by(BotStatus.name).all()
+
+
+def count_pending_google_calendar_setups(session: Session) -> int:
+    return session.query(GoogleApiUser).filter(GoogleApiUser.setup_finished == False).count()
+
+
+def save_metrics_snapshot(
+    session: Session, source: str, families: list[Any], commit: bool = True
+) -> None:
+    snapshot = session.query(MetricsSnapshot).filter(MetricsSnapshot.source == source).one_or_none()
+    if snapshot is None:
+        snapshot = MetricsSnapshot(source=source)
+        session.add(snapshot)
+    snapshot.families = families
+    snapshot.reported_at = datetime.now()
+    if commit:
+        session.commit()
+
+
+def get_metrics_snapshots(session: Session, reported_after: datetime) -> list[MetricsSnapshot]:
+    return (
+        session.query(MetricsSnapshot)
+        .filter(MetricsSnapshot.reported_at >= reported_after)
+        .order_by(MetricsSnapshot.source)
+        .all()
+    )
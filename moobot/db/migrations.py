@@ -0,0 +1,161 @@
+"""
+In-place schema migrations for tables created by older versions of the bot.
+
+`Base.metadata.create_all` only creates missing tables, so column changes to existing tables are
+applied here. Every migration checks the current schema first and is a no-op once applied.
+"""
+
+import logging
+
+from sqlalchemy import Connection, Engine, String, inspect
+
+from moobot.db.models import AttendanceTypeColumn, Base
+
+_logger = logging.getLogger(__name__)
+
+_EVENT_SNOWFLAKE_COLUMNS = [
+    "announcement_message_id",
+    "channel_id",
+    "channel_introduction_message_id",
+    "created_by",
+    "updated_by",
+]
+
+# discord snowflakes used to be stored as strings
+SNOWFLAKE_COLUMNS = {
+    "moobloomevent": _EVENT_SNOWFLAKE_COLUMNS,
+    "moobloomeventarchive": _EVENT_SNOWFLAKE_COLUMNS,
+    "moobloomeventrsvp": ["user_id"],
+    "moobloomeventrsvparchive": ["user_id"],
+    "googleapiauthsession": ["user_id"],
+    "googleapiuser": ["user_id"],
+}
+
+# columns added to existing tables, which must be nullable
+ADDED_COLUMNS = {
+    "moobloomevent": ["guild_id"],
+    "moobloomeventarchive": ["guild_id"],
+    "guildconfig": ["calendar_messages"],
+}
+
+# attendance types used to be stored as their enum values
+ATTENDANCE_TYPE_COLUMNS = {
+    "moobloomeventrsvp": ["attendance_type"],
+    "moobloomeventrsvparchive": ["attendance_type"],
+}
+
+
+def _attendance_type_code_case(column: str) -> str:
+    cases = " ".join(
+        f"WHEN '{attendance_type.value}' THEN {code}"
+        for attendance_type, code in AttendanceTypeColumn.CODES.items()
+    )
+    return f"CASE {column} {cases} END"
+
+
+def _get_string_columns(connection: Connection, table: str, columns: list[str]) -> list[str]:
+    inspector = inspect(connection)
+    if not inspector.has_table(table):
+        return []
+    existing_types = {c["name"]: c["type"] for c in inspector.get_columns(table)}
+    return [c for c in columns if isinstance(existing_types.get(c), String)]
+
+
+def _migrate_postgres_table(
+    connection: Connection, table: str, snowflake_columns: list[str], attendance_columns: list[str]
+) -> None:
+    alterations = [f"ALTER COLUMN {c} TYPE BIGINT USING {c}::bigint" for c in snowflake_columns]
+    alterations += [
+        f"ALTER COLUMN {c} TYPE SMALLINT USING {_attendance_type_code_case(c)}"
+        for c in attendance_columns
+    ]
+    connection.exec_driver_sql(f"ALTER TABLE {table} {', '.join(alterations)}")
+
+
+def _migrate_sqlite_table(
+    connection: Connection, table: str, snowflake_columns: list[str], attendance_columns: list[str]
+) -> None:
+    # sqlite can't change column types, so the table is rebuilt and its rows copied over
+    # legacy_alter_table (with foreign keys disabled) stops sqlite from repointing other tables'
+    # foreign keys to the renamed table
+    connection.exec_driver_sql("PRAGMA legacy_alter_table=ON")
+    for index in inspect(connection).get_indexes(table):
+        connection.exec_driver_sql(f"DROP INDEX {index['name']}")
+    connection.exec_driver_sql(f"ALTER TABLE {table} RENAME TO {table}__old")
+    Base.metadata.tables[table].create(connection)
+
+    column_names = [c.name for c in Base.metadata.tables[table].columns]
+    select_expressions = []
+    for c in column_names:
+        if c in snowflake_columns:
+            select_expressions.append(f"CAST({c} AS INTEGER)")
+        elif c in attendance_columns:
+            select_expressions.append(_attendance_type_code_case(c))
+        else:
+            select_expressions.append(c)
+    connection.exec_driver_sql(
+        f"INSERT INTO {table} ({', '.join(column_names)})"
+        f" SELECT {', '.join(select_expressions)} FROM {table}__old"
+    )
+    connection.exec_driver_sql(f"DROP TABLE {table}__old")
+    connection.exec_driver_sql("PRAGMA legacy_alter_table=OFF")
+
+
+def add_missing_columns(connection: Connection) -> None:
+    """
+    Add columns (and their indexes) that tables created by older versions don't have yet.
+    """
+    inspector = inspect(connection)
+    for table_name, column_names in ADDED_COLUMNS.items():
+        if not inspector.has_table(table_name):
+            continue
+        existing_columns = {c["name"] for c in inspector.get_columns(table_name)}
+        table = Base.metadata.tables[table_name]
+        for column_name in column_names:
+            if column_name in existing_columns:
+                continue
+
+            _logger.info(f"Adding column {column_name} to {table_name}")
+            column_type = table.c[column_name].type.compile(connection.dialect)
+            connection.exec_driver_sql(
+                f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_type}"
+            )
+            for index in table.indexes:
+                if column_name in index.columns:
+                    index.create(connection)
+
+
+def migrate_compact_columns(connection: Connection) -> None:
+    """
+    Convert snowflake columns to BIGINT and attendance types to SMALLINT codes.
+    """
+    for table, columns in SNOWFLAKE_COLUMNS.items():
+        snowflake_columns = _get_string_columns(connection, table, columns)
+        attendance_columns = _get_string_columns(
+            connection, table, ATTENDANCE_TYPE_COLUMNS.get(table, [])
+        )
+        if not snowflake_columns and not attendance_columns:
+            continue
+
+        _logger.info(f"Migrating columns {snowflake_columns + attendance_columns} of {table}")
+        if connection.dialect.name == "sqlite":
+            _migrate_sqlite_table(connection, table, snowflake_columns, attendance_columns)
+        else:
+            _migrate_postgres_table(connection, table, snowflake_columns, attendance_columns)
+
+
+def run_migrations(engine: Engine) -> None:
+    with engine.connect() as connection:
+        is_sqlite = connection.dialect.name == "sqlite"
+        # sqlite tables can only be rebuilt with foreign key enforcement turned off, and that can't
+        # be changed inside a transaction
+        if is_sqlite:
+            connection.connection.driver_connection.execute("PRAGMA foreign_keys=OFF")  # type: ignore
+        try:
+            with connection.begin():
+                # the sqlite table rebuilds expect every current column to exist
+                add_missing_columns(connection)
+                migrate_compact_columns(connection)
+        finally:
+            if is_sqlite:
+                connection.connection.driver_connection.execute("PRAGMA foreign_keys=ON")  # type: ignore
@@ -2,10 +2,11 @@ from __future__ import annotations
 
 from datetime import date, datetime
 from enum import Enum
-from typing import Optional
+from typing import Any, ClassVar
 
-from sqlalchemy import DateTime, ForeignKey, func
+from sqlalchemy import JSON, BigInteger, DateTime, Dialect, ForeignKey, SmallInteger, func
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
+from sqlalchemy.types import TypeDecorator
 
 from moobot.settings import get_settings
 
@@ -16,38 +17,42 @@ class Base(DeclarativeBase):
     pass
 
 
-class MoobloomEvent(Base):
-    __tablename__ = "moobloomevent"
+class _MoobloomEventColumns:
+    """
+    Columns shared between the live event table and its archive.
+    """
 
-    id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str]
     create_channel: Mapped[bool] = mapped_column(default=True)
-    channel_name: Mapped[Optional[str]]
+    channel_name: Mapped[str | None]
 
     # event time fields
     # start_date and end_date must always be set
     # for single-day events, end_date == start_date
     # for events with a start time and without a set end time, end_time should be None
     start_date: Mapped[date]
-    start_time: Mapped[Optional[datetime]]
+    start_time: Mapped[datetime | None]
     end_date: Mapped[date]
-    end_time: Mapped[Optional[datetime]]
+    end_time: Mapped[datetime | None]
 
-    location: Mapped[Optional[str]]
-    description: Mapped[Optional[str]]
-    url: Mapped[Optional[str]]
-    image_url: Mapped[Optional[str]]
-    thumbnail_url: Mapped[Optional[str]]
+    location: Mapped[str | None]
+    description: Mapped[str | None]
+    url: Mapped[str | None]
+    image_url: Mapped[str | None]
+    thumbnail_url: Mapped[str | None]
 
-    announcement_message_id: Mapped[Optional[str]]
-    channel_id: Mapped[Optional[str]]
-    channel_introduction_message_id: Mapped[Optional[str]]
+    # discord snowflakes
+    # the guild the event belongs to, only unset for events created before multi-guild support
+    guild_id: Mapped[int | None] = mapped_column(BigInteger, index=True)
+    announcement_message_id: Mapped[int | None] = mapped_column(BigInteger)
+    channel_id: Mapped[int | None] = mapped_column(BigInteger)
+    channel_introduction_message_id: Mapped[int | None] = mapped_column(BigInteger)
 
     out_of_sync: Mapped[bool] = mapped_column(default=False)
 
     # discord user ID
-    created_by: Mapped[Optional[str]]
-    updated_by: Mapped[Optional[str]]
+    created_by: Mapped[int | None] = mapped_column(BigInteger)
+    updated_by: Mapped[int | None] = mapped_column(BigInteger)
 
     deleted: Mapped[bool] = mapped_column(default=False)
 
@@ -55,7 +60,13 @@ class MoobloomEvent(Base):
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), onupdate=func.now())
 
     reactions_created: Mapped[bool] = mapped_column(default=False)
-    rsvps: Mapped[list["MoobloomEventRSVP"]] = relationship(back_populates="event")
+
+
+class MoobloomEvent(_MoobloomEventColumns, Base):
+    __tablename__ = "moobloomevent"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    rsvps: Mapped[list[MoobloomEventRSVP]] = relationship(back_populates="event")
 
 
 class MoobloomEventAttendanceType(str, Enum):
@@ -84,25 +95,79 @@ class MoobloomEventAttendanceType(str, Enum):
         raise NotImplementedError(self)
 
 
+class AttendanceTypeColumn(TypeDecorator[MoobloomEventAttendanceType]):
+    """
+    Stores a MoobloomEventAttendanceType as a SMALLINT.
+    """
+
+    impl = SmallInteger
+    cache_ok = True
+
+    # stored codes must never change, only add new ones
+    CODES: ClassVar[dict[MoobloomEventAttendanceType, int]] = {
+        MoobloomEventAttendanceType.NO: 0,
+        MoobloomEventAttendanceType.YES: 1,
+        MoobloomEventAttendanceType.MAYBE: 2,
+    }
+    ATTENDANCE_TYPES: ClassVar[dict[int, MoobloomEventAttendanceType]] = {
+        code: attendance_type for attendance_type, code in CODES.items()
+    }
+
+    def process_bind_param(self, value: Any, dialect: Dialect) -> int | None:
+        if value is None:
+            return None
+        return self.CODES[MoobloomEventAttendanceType(value)]
+
+    def process_result_value(
+        self, value: int | None, dialect: Dialect
+    ) -> MoobloomEventAttendanceType | None:
+        if value is None:
+            return None
+        return self.ATTENDANCE_TYPES[value]
+
+
 class MoobloomEventRSVP(Base):
     __tablename__ = "moobloomeventrsvp"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    user_id: Mapped[str]
+    user_id: Mapped[int] = mapped_column(BigInteger)
     event_id: Mapped[int] = mapped_column(ForeignKey("moobloomevent.id"))
-    attendance_type: Mapped[str]
+    attendance_type: Mapped[MoobloomEventAttendanceType] = mapped_column(AttendanceTypeColumn)
 
     created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
 
     event: Mapped[MoobloomEvent] = relationship(back_populates="rsvps")
 
 
+# archived events and RSVPs keep the IDs they had in the live tables
+class MoobloomEventArchive(_MoobloomEventColumns, Base):
+    __tablename__ = "moobloomeventarchive"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    archived_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
+
+    rsvps: Mapped[list[MoobloomEventRSVPArchive]] = relationship(back_populates="event")
+
+
+class MoobloomEventRSVPArchive(Base):
+    __tablename__ = "moobloomeventrsvparchive"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    user_id: Mapped[int] = mapped_column(BigInteger)
+    event_id: Mapped[int] = mapped_column(ForeignKey("moobloomeventarchive.id"), index=True)
+    attendance_type: Mapped[MoobloomEventAttendanceType] = mapped_column(AttendanceTypeColumn)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
+
+    event: Mapped[MoobloomEventArchive] = relationship(back_populates="rsvps")
+
+
 class GoogleApiAuthSession(Base):
     __tablename__ = "googleapiauthsession"
 
     id: Mapped[int] = mapped_column(primary_key=True)
     state: Mapped[str] = mapped_column(unique=True)
-    user_id: Mapped[str] = mapped_column()
+    user_id: Mapped[int] = mapped_column(BigInteger)
 
     created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
 
@@ -111,14 +176,79 @@ class GoogleApiUser(Base):
     __tablename__ = "googleapiuser"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    user_id: Mapped[str] = mapped_column(unique=True)
+    user_id: Mapped[int] = mapped_column(BigInteger, unique=True)
     token: Mapped[str]
     refresh_token: Mapped[str]
     token_uri: Mapped[str]
     scopes: Mapped[str]
-    calendar_id: Mapped[Optional[str]]
+    calendar_id: Mapped[str | None]
 
     # Discord bot server must send a DM and create events for existing RSVPs before setup is finished
     setup_finished: Mapped[bool] = mapped_column(default=False)
 
     created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
+
+
+class GuildConfig(Base):
+    __tablename__ = "guildconfig"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    guild_id: Mapped[int] = mapped_column(BigInteger, unique=True)
+
+    calendar_channel_id: Mapped[int] = mapped_column(BigInteger)
+    event_announce_channel_id: Mapped[int] = mapped_column(BigInteger)
+    get_all_event_channels_react_emoji_name: Mapped[str]
+    google_calendar_sync_react_emoji_name: Mapped[str]
+    all_events_role_name: Mapped[str]
+    active_events_category_name: Mapped[str]
+    # the calendar's messages in the calendar channel in order, the header followed by the pages,
+    # as [key, message ID, content hash] entries, see `moobot.db.crud.guilds.CalendarMessage`
+    calendar_messages: Mapped[list[Any] | None] = mapped_column(JSON)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), onupdate=func.now())
+
+
+class CommandTreeSync(Base):
+    __tablename__ = "commandtreesync"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    guild_id: Mapped[int] = mapped_column(BigInteger, unique=True)
+    # hash of the command tree payload last synced to the guild
+    command_hash: Mapped[str]
+
+    synced_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), onupdate=func.now())
+
+
+class BotStatus(Base):
+    """
+    Health of a bot process, reported periodically for the API's readiness checks.
+    """
+
+    __tablename__ = "botstatus"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    # identifies the bot process, e.g. by the shards it serves
+    name: Mapped[str] = mapped_column(unique=True)
+
+    connected: Mapped[bool]
+    gateway_latency_seconds: Mapped[float | None]
+    scheduler_lag_seconds: Mapped[float]
+    last_reconciled_at: Mapped[datetime | None] = mapped_column(DateTime)
+    started_at: Mapped[datetime] = mapped_column(DateTime)
+    reported_at: Mapped[datetime] = mapped_column(DateTime)
+
+
+class MetricsSnapshot(Base):
+    """
+    Metrics collected by a bot process, reported periodically for the API's /metrics endpoint.
+    """
+
+    __tablename__ = "metricssnapshot"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    # the process's BotStatus name
+    source: Mapped[str] = mapped_column(unique=True)
+    # metric families as collected by `moobot.metrics.Registry.collect`
+    families: Mapped[list[Any]] = mapped_column(JSON)
+    reported_at: Mapped[datetime] = mapped_column(DateTime)
@@ -1,36 +1,157 @@
+import os
 import time
-from typing import Generator
+from collections.abc import Generator
+from typing import Any
 
-from sqlalchemy import create_engine
+from sqlalchemy import Engine, StaticPool, create_engine, event, make_url
+from sqlalchemy.engine import Connection
 from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session as SessionCls
 from sqlalchemy.orm import sessionmaker
 
+from moobot import metrics
+from moobot.db.migrations import run_migrations
 from moobot.db.models import Base
 from moobot.settings import get_settings
 
 settings = get_settings()
 
-credentials = f"{settings.postgres_user}:{settings.postgres_password}"
-host = f"{settings.postgres_host}:5432/{settings.postgres_user}"
-connection_string = f"postgresql+psycopg://{credentials}@{host}"
+SQLITE_PRAGMAS = [
+    # readers don't block the writer (and vice versa), which matters since the bot, the scheduler
+    # thread and the API process all share the same database file
+    "journal_mode=WAL",
+    # WAL mode is still corruption-safe with NORMAL, only the last commits may be lost on power loss
+    "synchronous=NORMAL",
+    "foreign_keys=ON",
+    # wait for the write lock instead of immediately raising "database is locked"
+    f"busy_timeout={settings.sqlite_busy_timeout_ms}",
+    "temp_store=MEMORY",
+    "cache_size=-16000",  # KiB
+]
 
-engine = create_engine(connection_string, future=True)
-Session = sessionmaker(engine)
+
+def get_database_url() -> str:
+    if settings.database_url is not None:
+        return settings.database_url
+
+    if settings.postgres_user is None or settings.postgres_password is None:
+        raise ValueError("Either DATABASE_URL or postgres credentials must be set")
+    credentials = f"{settings.postgres_user}:{settings.postgres_password}"
+    host = f"{settings.postgres_host}:5432/{settings.postgres_user}"
+    return f"postgresql+psycopg://{credentials}@{host}"
+
+
+def _configure_sqlite_connection(dbapi_connection: Any, _connection_record: Any) -> None:
+    # disable pysqlite's own transaction handling so that SQLAlchemy can emit BEGIN itself, see
+    # https://docs.sqlalchemy.org/en/20/dialects/sqlite.html#serializable-isolation-savepoints-transactional-ddl
+    dbapi_connection.isolation_level = None
+    cursor = dbapi_connection.cursor()
+    for pragma in SQLITE_PRAGMAS:
+        cursor.execute(f"PRAGMA {pragma}")
+    cursor.close()
+
+
+# execution option of connections that start their transactions with the write lock, see
+# `WriteSession`
+WRITE_OPTION = "moobot_write"
+
+
+def _begin_sqlite_transaction(connection: Connection) -> None:
+    # a deferred transaction that reads and then writes fails right away with SQLITE_BUSY_SNAPSHOT
+    # if another connection committed in between, busy_timeout doesn't apply
+    if connection.get_execution_options().get(WRITE_OPTION):
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+    else:
+        connection.exec_driver_sql("BEGIN")
+
+
+METRICS_STATEMENT_TYPES = {"SELECT", "INSERT", "UPDATE", "DELETE"}
+
+
+def _before_cursor_execute(
+    _connection: Connection, _cursor: Any, _statement: str, _params: Any, context: Any, _many: bool
+) -> None:
+    context._moobot_query_start = time.perf_counter()
+
+
+def _after_cursor_execute(
+    _connection: Connection, _cursor: Any, statement: str, _params: Any, context: Any, _many: bool
+) -> None:
+    # label by statement type only, full statements would make for unbounded label values
+    keyword = statement.lstrip()[:6].upper()
+    if keyword not in METRICS_STATEMENT_TYPES:
+        keyword = "OTHER"
+    metrics.DB_QUERY_SECONDS.observe(
+        time.perf_counter() - context._moobot_query_start, statement=keyword
+    )
 
 
-try:
+def _instrument_engine(engine: Engine) -> Engine:
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    return engine
+
+
+def create_db_engine(url: str) -> Engine:
+    database_url = make_url(url)
+    if database_url.get_backend_name() != "sqlite":
+        return _instrument_engine(create_engine(url, future=True))
+
+    engine_kwargs: dict[str, Any] = {}
+    if database_url.database in (None, "", ":memory:"):
+        # every connection to an in-memory database would otherwise get its own empty database
+        engine_kwargs["poolclass"] = StaticPool
+    else:
+        os.makedirs(os.path.dirname(os.path.abspath(database_url.database)), exist_ok=True)
+
+    engine = create_engine(
+        url,
+        future=True,
+        # the same engine is used from the event loop and the scheduler's worker threads
+        connect_args={"check_same_thread": False},
+        **engine_kwargs,
+    )
+    event.listen(engine, "connect", _configure_sqlite_connection)
+    event.listen(engine, "begin", _begin_sqlite_transaction)
+    return _instrument_engine(engine)
+
+
+def _create_tables(engine: Engine) -> None:
     Base.metadata.create_all(engine)
-except OperationalError:
-    print("Waiting for database to be ready...")
-    retries = 0
-    while retries < 3:
+    run_migrations(engine)
+
+
+# engines connect lazily, so importing this module doesn't touch the database
+engine = create_db_engine(get_database_url())
+Session = sessionmaker(engine)
+# for short sessions that read and then write, they take the write lock upfront on SQLite, so
+# they must not be kept open while awaiting anything else
+WriteSession = sessionmaker(engine.execution_options(**{WRITE_OPTION: True}))
+
+DB_CONNECT_RETRIES = 3
+_initialized = False
+
+
+def init_db(retries: int = DB_CONNECT_RETRIES) -> None:
+    """
+    Create missing tables and run migrations, waiting for the database to accept connections.
+
+    Each entry point calls this once during startup; later calls do nothing.
+    """
+    global _initialized
+    if _initialized:
+        return
+
+    for attempt in range(retries + 1):
         try:
-            Base.metadata.create_all(engine)
+            _create_tables(engine)
             break
         except OperationalError:
+            if attempt == retries:
+                raise
+            print("Waiting for database to be ready...")
             time.sleep(1)
-            retries += 1
+    _initialized = True
 
 
 def get_session() -> Generator[SessionCls, None, None]:
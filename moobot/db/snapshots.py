@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime
+
+from moobot.db.models import (
+    GuildConfig,
+    MoobloomEvent,
+    MoobloomEventAttendanceType,
+    MoobloomEventRSVP,
+)
+
+
+@dataclass(frozen=True, slots=True)
+class RSVPSnapshot:
+    user_id: int
+    attendance_type: MoobloomEventAttendanceType
+
+    @classmethod
+    def from_model(cls, rsvp: MoobloomEventRSVP) -> RSVPSnapshot:
+        return cls(
+            user_id=rsvp.user_id,
+            attendance_type=rsvp.attendance_type,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class EventSnapshot:
+    """
+    Immutable, session-independent copy of an event and (optionally) its RSVPs.
+
+    Snapshots can be safely passed between coroutines and threads after their session is closed.
+    To change an event, update it by ID in a new session.
+    """
+
+    id: int
+    guild_id: int | None
+    name: str
+    create_channel: bool
+    channel_name: str | None
+    start_date: date
+    start_time: datetime | None
+    end_date: date
+    end_time: datetime | None
+    location: str | None
+    description: str | None
+    url: str | None
+    image_url: str | None
+    thumbnail_url: str | None
+    announcement_message_id: int | None
+    channel_id: int | None
+    channel_introduction_message_id: int | None
+    deleted: bool
+    updated_at: datetime
+    rsvps: tuple[RSVPSnapshot, ...] = ()
+
+    @classmethod
+    def from_model(cls, event: MoobloomEvent, include_rsvps: bool = True) -> EventSnapshot:
+        return cls(
+            id=event.id,
+            guild_id=event.guild_id,
+            name=event.name,
+            create_channel=event.create_channel,
+            channel_name=event.channel_name,
+            start_date=event.start_date,
+            start_time=event.start_time,
+            end_date=event.end_date,
+            end_time=event.end_time,
+            location=event.location,
+            description=event.description,
+            url=event.url,
+            image_url=event.image_url,
+            thumbnail_url=event.thumbnail_url,
+            announcement_message_id=event.announcement_message_id,
+            channel_id=event.channel_id,
+            channel_introduction_message_id=event.channel_introduction_message_id,
+            deleted=event.deleted,
+            updated_at=event.updated_at,
+            rsvps=(
+                tuple(RSVPSnapshot.from_model(rsvp) for rsvp in event.rsvps)
+                if include_rsvps
+                else ()
+            ),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class GuildConfigSnapshot:
+    guild_id: int
+    calendar_channel_id: int
+    event_announce_channel_id: int
+    get_all_event_channels_react_emoji_name: str
+    google_calendar_sync_react_emoji_name: str
+    all_events_role_name: str
+    active_events_category_name: str
+
+    @classmethod
+    def from_model(cls, guild_config: GuildConfig) -> GuildConfigSnapshot:
+        return cls(
+            guild_id=guild_config.guild_id,
+            calendar_channel_id=guild_config.calendar_channel_id,
+            event_announce_channel_id=guild_config.event_announce_channel_id,
+            get_all_event_channels_react_emoji_name=(
+                guild_config.get_all_event_channels_react_emoji_name
+            ),
+            google_calendar_sync_react_emoji_name=guild_config.google_calendar_sync_react_emoji_name,
+            all_events_role_name=guild_config.all_events_role_name,
+            active_events_category_name=guild_config.active_events_category_name,
+        )
@@ -0,0 +1,60 @@
+import asyncio
+import hashlib
+import json
+import logging
+from collections.abc import Iterable
+
+from discord import Guild, app_commands
+
+from moobot import metrics
+from moobot.db.crud.commands import get_command_tree_hash, set_command_tree_hash
+from moobot.db.session import Session
+
+_logger = logging.getLogger(__name__)
+
+
+def hash_command_tree(tree: app_commands.CommandTree, guild: Guild) -> str:
+    """
+    Hash the payload that syncing the tree's commands to the guild would send.
+    """
+    payload = {
+        "application_id": tree.client.application_id,
+        "commands": [command.to_dict(tree) for command in tree.get_commands(guild=guild)],
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+async def sync_command_tree(
+    tree: app_commands.CommandTree, guild: Guild, force: bool = False
+) -> bool:
+    """
+    Sync the global commands to the guild, unless they haven't changed since the last sync.
+
+    Returns whether the commands were synced.
+    """
+    tree.copy_global_to(guild=guild)
+    command_hash = hash_command_tree(tree, guild)
+    with Session() as session:
+        if not force and get_command_tree_hash(session, guild.id) == command_hash:
+            _logger.info(f"Commands for guild {guild.name} are up to date, not syncing")
+            metrics.CACHE_REQUESTS.inc(cache="command_tree", result="hit")
+            return False
+    metrics.CACHE_REQUESTS.inc(cache="command_tree", result="miss")
+
+    _logger.info(f"Syncing commands to guild {guild.name}")
+    await tree.sync(guild=guild)
+    with Session() as session:
+        set_command_tree_hash(session, guild.id, command_hash)
+    return True
+
+
+async def sync_command_trees(
+    tree: app_commands.CommandTree, guilds: Iterable[Guild], force: bool = False
+) -> None:
+    guilds = list(guilds)
+    results = await asyncio.gather(
+        *(sync_command_tree(tree, guild, force) for guild in guilds), return_exceptions=True
+    )
+    for guild, result in zip(guilds, results):
+        if isinstance(result, BaseException):
+            _logger.error(f"Failed to sync commands to guild {guild.name}", exc_info=result)
@@ -9,7 +9,6 @@ from discord import Interaction
 from moobot.db.models import MoobloomEvent
 from moobot.db.session import Session
 from moobot.discord.views.event_modal import CreateEventModal
-from moobot.events import initialize_events
 
 if TYPE_CHECKING:
     from moobot.discord.discord_bot import DiscordBot
@@ -31,12 +30,13 @@ async def create_event_cmd(bot: DiscordBot, interaction: Interaction) -> None:
 async def create_event_callback(
     bot: DiscordBot, interaction: Interaction, event: MoobloomEvent
 ) -> None:
+    event.guild_id = interaction.guild_id
     with Session(expire_on_commit=False) as session:
         _logger.info(f"Adding event {event.name}")
         session.add(event)
         session.commit()
 
-    create_task(initialize_events(bot))
+    create_task(bot.request_events_refresh(event.guild_id))
 
     await interaction.response.send_message(
         f"{bot.affirm()} {interaction.user.mention}, I added a new event"
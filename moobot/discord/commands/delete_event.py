@@ -8,11 +8,13 @@ from discord import Interaction
 from sqlalchemy.orm import Session
 
 from moobot.db.models import MoobloomEvent, MoobloomEventAttendanceType
+from moobot.db.snapshots import EventSnapshot
 from moobot.discord.views.confirm_delete import ConfirmDelete
 from moobot.events import (
     delete_event_announcement,
+    forget_event_channel_introduction,
     handle_google_calendar_sync_on_rsvp,
-    initialize_events,
+    load_guild_config,
 )
 
 if TYPE_CHECKING:
@@ -35,13 +37,15 @@ async def delete_event_cmd(
     await confirm.wait()
 
     if confirm.value:
-        await delete_event_announcement(bot.client, event)
-        for rsvp in event.rsvps:
-            create_task(delete_google_calendar_event(bot, int(rsvp.user_id), event))
+        snapshot = EventSnapshot.from_model(event)
+        await delete_event_announcement(bot.client, load_guild_config(snapshot.guild_id), snapshot)
+        for rsvp in snapshot.rsvps:
+            create_task(delete_google_calendar_event(bot, rsvp.user_id, snapshot))
 
         event.deleted = True
-        event.updated_by = str(interaction.user.id)
+        event.updated_by = interaction.user.id
         session.commit()
+        forget_event_channel_introduction(snapshot.channel_introduction_message_id)
 
         await confirmation_message.delete()
         await interaction.followup.send(
@@ -52,7 +56,7 @@ async def delete_event_cmd(
             ephemeral=True,
         )
 
-        await initialize_events(bot)
+        await bot.request_events_refresh(snapshot.guild_id)
     else:
         await interaction.response.send_message(
             "Operation cancelled.",
@@ -60,6 +64,6 @@ async def delete_event_cmd(
         )
 
 
-async def delete_google_calendar_event(bot: DiscordBot, user_id: int, event: MoobloomEvent) -> None:
+async def delete_google_calendar_event(bot: DiscordBot, user_id: int, event: EventSnapshot) -> None:
     user = await bot.client.fetch_user(user_id)
     handle_google_calendar_sync_on_rsvp(bot.client, user, event, MoobloomEventAttendanceType.NO)
@@ -9,7 +9,6 @@ from sqlalchemy.orm import Session
 
 from moobot.db.models import MoobloomEvent
 from moobot.discord.views.event_modal import CreateEventModal
-from moobot.events import initialize_events
 
 if TYPE_CHECKING:
     from moobot.discord.discord_bot import DiscordBot
@@ -58,12 +57,12 @@ def get_update_event_callback(
         original.url = event.url
         original.image_url = event.image_url
         original.out_of_sync = True
-        original.updated_by = str(interaction.user.id)
+        original.updated_by = interaction.user.id
 
         session.add(original)  # unclear why we need to do this
         session.commit()
 
-        create_task(initialize_events(bot))
+        create_task(bot.request_events_refresh(original.guild_id))
 
         await interaction.response.send_message(
             f"{bot.affirm()} {interaction.user.mention}, I updated event {event.name} for you.",
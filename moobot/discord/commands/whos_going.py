@@ -19,13 +19,13 @@ _logger = logging.getLogger(__name__)
 async def whos_going_cmd(
     session: Session, bot: DiscordBot, interaction: Interaction, event: MoobloomEvent
 ) -> None:
-    rsvps: dict[str, list[str]] = {
+    rsvps: dict[MoobloomEventAttendanceType, list[int]] = {
         attendance_type: [] for attendance_type in MoobloomEventAttendanceType
     }
     for rsvp in event.rsvps:
         rsvps[rsvp.attendance_type].append(rsvp.user_id)
 
-    formatted_rsvps: dict[str, str] = {}
+    formatted_rsvps: dict[MoobloomEventAttendanceType, str] = {}
     for attendance_type, attending_users in rsvps.items():
         if not attending_users:
             formatted_rsvps[attendance_type] = "None"
@@ -2,43 +2,78 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import math
 import random
 import re
+import signal
+import time
 import traceback
 from datetime import datetime
 from enum import Enum
 from typing import Any, Callable, Coroutine, Pattern
 
 import discord
+import yarl
 from apscheduler.triggers.interval import IntervalTrigger
 from discord import (
     Interaction,
     Member,
+    MemberCacheFlags,
     Message,
     PartialEmoji,
     RawReactionActionEvent,
     User,
     app_commands,
 )
-
-from moobot.db.session import Session
+from discord.gateway import DiscordWebSocket
+from discord.http import Route
+
+from moobot import metrics
+from moobot.bulk import EventFileFormat, parse_events
+from moobot.bulk import import_events as bulk_import_events
+from moobot.db.crud.guilds import upsert_guild_config
+from moobot.db.crud.status import report_bot_status, save_metrics_snapshot
+from moobot.db.session import Session, WriteSession, init_db
+from moobot.discord.command_sync import sync_command_tree, sync_command_trees
 from moobot.discord.commands.create_event import create_event_cmd
 from moobot.discord.commands.delete_event import delete_event_cmd
 from moobot.discord.commands.update_event import update_event_cmd
 from moobot.discord.commands.whos_going import whos_going_cmd
 from moobot.discord.event_option import event_autocomplete, get_event_from_option
-from moobot.events import complete_unfinished_google_calendar_setups, initialize_events
-from moobot.scheduler import get_async_scheduler, get_threadpool_scheduler
-from moobot.settings import get_settings
+from moobot.discord.guild_config import parse_guild_config_options
+from moobot.discord.http_stats import DiscordHttpStats
+from moobot.discord.introduction_updater import IntroductionUpdater
+from moobot.discord.router import CommandRouter
+from moobot.discord.rsvp_debouncer import RSVPDebouncer
+from moobot.discord.rsvp_queue import EventRSVPQueues
+from moobot.discord.single_flight import SingleFlight
+from moobot.events import (
+    archive_ended_events,
+    complete_unfinished_google_calendar_setups,
+    initialize_events,
+    seed_guild_config_from_settings,
+    update_event_channel_introduction_by_id,
+)
+from moobot.scheduler import (
+    get_async_scheduler,
+    get_scheduler_lag_seconds,
+    get_threadpool_scheduler,
+    job_stats,
+)
+from moobot.settings import Settings, get_settings, reload_settings, subscribe_to_settings
+from moobot.util.discord import get_member
+from moobot.util.memory import get_rss_bytes
 
 settings = get_settings()
 _logger = logging.getLogger(__name__)
 
-_discord_bot_commands: dict[Pattern, Callable] = {}
-
 AFFIRMATIONS = ["Okay", "Sure", "Sounds good", "No problem", "Roger that", "Got it"]
 THANKS = [*AFFIRMATIONS, "Thanks", "Thank you"]
 DEBUG_COMMAND_PREFIX = r"(d|debug) "
+DEBUG_NAMESPACE = "debug"
+GOOGLE_CALENDAR_SETUP_JOB_ID = "complete_unfinished_google_calendar_setups"
+
+_command_router = CommandRouter(namespaces={DEBUG_NAMESPACE: DEBUG_COMMAND_PREFIX})
 
 
 class ReactionAction(str, Enum):
@@ -54,32 +89,144 @@ class DiscordBot:
         self,
         client: discord.Client,
         command_prefix: str | None = "$",
+        http_stats: DiscordHttpStats | None = None,
     ) -> None:
         self.client = client
+        self.http_stats = http_stats or DiscordHttpStats()
+        self.created_at = time.monotonic()
+        self.started_at = datetime.now()
         self.tree = app_commands.CommandTree(client)
         self.command_prefix = command_prefix
         self.scheduler = get_async_scheduler()
         self.threadpool_scheduler = get_threadpool_scheduler()
 
         self.reaction_handlers: dict[int, ReactionHandler] = {}  # message ID -> reaction handler
+        self.rsvp_debouncer = RSVPDebouncer(settings.rsvp_debounce_seconds)
+        self.introduction_updater = IntroductionUpdater(
+            update=lambda event_id: update_event_channel_introduction_by_id(client, event_id),
+            window_seconds=settings.introduction_update_window_seconds,
+        )
+        self.rsvp_queues = EventRSVPQueues(
+            after_batch=self._schedule_introduction_update,
+            max_concurrency=settings.rsvp_max_concurrent_events,
+            max_queue_size=settings.rsvp_queue_size,
+            max_batch_size=settings.rsvp_batch_size,
+        )
+        self.events_refresher = SingleFlight("initialize_events", self._refresh_events)
+        # when every guild's events were last reconciled without errors
+        self.last_reconciled_at: datetime | None = None
+        self._mention_regex: Pattern[str] | None = None
 
     async def on_ready(self) -> None:
+        elapsed = time.monotonic() - self.created_at
+        _logger.info(f"Ready {elapsed:.1f}s after starting: {self.memory_report()}")
+        # on_ready also fires after reconnects, so jobs are registered by ID, replacing the jobs
+        # of the previous connection instead of adding more
         self.scheduler.add_job(
-            initialize_events,
-            args=(self,),
+            self.request_events_refresh,
+            id="initialize_events",
+            replace_existing=True,
             trigger=IntervalTrigger(seconds=60 * 5),
             next_run_time=datetime.now(),
         )
         self.threadpool_scheduler.add_job(
             complete_unfinished_google_calendar_setups,
             args=(self,),
+            id=GOOGLE_CALENDAR_SETUP_JOB_ID,
+            replace_existing=True,
             trigger=IntervalTrigger(seconds=10),
             next_run_time=datetime.now(),
         )
-        for guild in self.client.guilds:
-            _logger.info(f"Adding commands to guild {guild.name}")
-            self.tree.copy_global_to(guild=guild)  # type: ignore
-            await self.tree.sync(guild=guild)  # type: ignore
+        self.scheduler.add_job(
+            archive_ended_events,
+            args=(self,),
+            id="archive_ended_events",
+            replace_existing=True,
+            trigger=IntervalTrigger(hours=24),
+            next_run_time=datetime.now(),
+        )
+        self.scheduler.add_job(
+            self.report_status,
+            id="report_status",
+            replace_existing=True,
+            trigger=IntervalTrigger(seconds=settings.bot_status_interval_seconds),
+            next_run_time=datetime.now(),
+        )
+        self.scheduler.add_job(
+            self.log_http_stats,
+            id="log_http_stats",
+            replace_existing=True,
+            trigger=IntervalTrigger(minutes=settings.discord_http_stats_log_interval_minutes),
+        )
+        # the jobs are registered first so that they run even if seeding fails, seeding still
+        # happens before the first events refresh, which only starts once this handler awaits
+        try:
+            seed_guild_config_from_settings(self.client)
+        except Exception:
+            _logger.exception("Failed to configure the guild from the settings")
+        # likewise, only sync command trees that changed
+        await sync_command_trees(self.tree, self.client.guilds)
+
+    async def request_events_refresh(self, guild_id: int | None = None) -> None:
+        """
+        Reconcile the events of a guild (all guilds if None), coalescing overlapping requests.
+
+        At most one `initialize_events` run is in flight, and requests made meanwhile are served
+        by a single follow-up run.
+        """
+        await self.events_refresher.request([guild_id] if guild_id is not None else None)
+
+    async def _refresh_events(self, guild_ids: frozenset[int] | None) -> None:
+        await initialize_events(self, guild_ids)
+        if guild_ids is None:
+            self.last_reconciled_at = datetime.now()
+
+    @property
+    def status_name(self) -> str:
+        if not settings.discord_sharded:
+            return "bot"
+        return f"shards {settings.discord_shard_ids or 'all'}"
+
+    async def report_status(self) -> None:
+        """
+        Record this process's health and metrics for the API's readiness and metrics endpoints.
+        """
+        latency = self.client.latency
+        with WriteSession() as session:
+            report_bot_status(
+                session,
+                self.status_name,
+                connected=self.client.is_ready() and not self.client.is_closed(),
+                gateway_latency_seconds=latency if math.isfinite(latency) else None,
+                scheduler_lag_seconds=get_scheduler_lag_seconds(),
+                last_reconciled_at=self.last_reconciled_at,
+                started_at=self.started_at,
+                commit=False,
+            )
+            save_metrics_snapshot(session, self.status_name, metrics.registry.collect())
+
+    def complete_google_calendar_setups_now(self) -> None:
+        """
+        Run the Google Calendar setup job now rather than at its next interval. Since it's the same
+        job, it never runs concurrently with itself.
+        """
+        job = self.threadpool_scheduler.get_job(GOOGLE_CALENDAR_SETUP_JOB_ID)
+        if job is not None:
+            job.modify(next_run_time=datetime.now())
+
+    def memory_report(self) -> str:
+        cached_members = sum(len(guild.members) for guild in self.client.guilds)
+        return (
+            f"{get_rss_bytes() / 1024 / 1024:.1f} MiB resident, {len(self.client.guilds)} guilds,"
+            f" {cached_members} cached members, {len(self.client.users)} cached users,"
+            f" {len(self.client.cached_messages)} cached messages"
+        )
+
+    async def log_http_stats(self) -> None:
+        _logger.info(self.http_stats.format_summary())
+
+    async def _schedule_introduction_update(self, event_id: int) -> None:
+        self.introduction_updater.schedule(event_id)
 
     def get_command_from_message(self, message: Message) -> str | None:
         """
@@ -89,8 +236,9 @@ class DiscordBot:
         """
         # all mentions are automatically interpreted as commands
         if self.client.user is not None and self.client.user.mentioned_in(message):
-            mention_regex = rf"<@!?{self.client.user.id}>"
-            command = re.sub(mention_regex, "", message.content, 1).strip()
+            if self._mention_regex is None:
+                self._mention_regex = re.compile(rf"<@!?{self.client.user.id}>")
+            command = self._mention_regex.sub("", message.content, 1).strip()
             return command
 
         # alternatively, commands can be prefixed with a string to indicate they are for the bot
@@ -111,20 +259,29 @@ class DiscordBot:
             return
 
         _logger.info(f"Received command: {command}")
-        for pattern in _discord_bot_commands:
-            match = pattern.match(command)
-            if match:
-                try:
-                    await _discord_bot_commands[pattern](self, message, match)
-                except asyncio.CancelledError:
-                    raise
-                except Exception:
-                    await message.channel.send(
-                        f"Sorry {message.author.mention}! Something went wrong while running your"
-                        f" command.```{traceback.format_exc()[-1900:]}```"
-                    )
-                    raise
-                break
+        resolved = _command_router.resolve(command)
+        if resolved is None:
+            return
+
+        route, match = resolved
+        if route.busy:
+            route.stats.rejected += 1
+            await message.channel.send(
+                f"Sorry {message.author.mention}, I'm still working on that command. Please try"
+                " again in a bit."
+            )
+            return
+
+        try:
+            await route(self, message, match)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            await message.channel.send(
+                f"Sorry {message.author.mention}! Something went wrong while running your"
+                f" command.```{traceback.format_exc()[-1900:]}```"
+            )
+            raise
 
     async def on_reaction_change(
         self, action: ReactionAction, payload: RawReactionActionEvent
@@ -136,24 +293,29 @@ class DiscordBot:
                 guild = self.client.get_guild(payload.guild_id)
                 if guild is None:
                     raise ValueError(f"guild {payload.guild_id} not found")
-                user = (await guild.query_members(user_ids=[payload.user_id]))[0]
+                # reaction adds come with the member, only removals need a lookup
+                user = payload.member or await get_member(guild, payload.user_id)
             else:
-                user = self.client.get_user(payload.user_id)
+                user = await self._get_or_fetch_user(payload.user_id)
             if user is None:
                 raise ValueError(f"user {payload.user_id} not found")
             await self.reaction_handlers[payload.message_id](action, payload.emoji, user)
 
     @staticmethod
-    def command(r: str) -> Callable[..., Any]:
+    def command(
+        r: str, namespace: str | None = None, max_concurrency: int | None = None
+    ) -> Callable[..., Any]:
         """
         Decorator for defining bot commands matching a given regex.
 
         After receiving a command, the bot will call the first @command function whose regex
-        matches the given command.
+        matches the given command. Commands in a namespace must be prefixed with the namespace's
+        prefix, e.g. `$debug command_stats`. If `max_concurrency` is set, further invocations are
+        rejected while the command is already running that many times.
         """
 
         def deco(f: Callable[..., Any]) -> Callable[..., Any]:
-            _discord_bot_commands[re.compile(f"^{r}$", re.IGNORECASE)] = f
+            _command_router.add(r, f, namespace=namespace, max_concurrency=max_concurrency)
             return f
 
         return deco
@@ -164,9 +326,84 @@ class DiscordBot:
     def thank(self) -> str:
         return random.choice(THANKS)
 
-    @command(r"e refresh")
+    @command(r"e refresh", max_concurrency=1)
     async def refresh_events(self, message: Message, _command: re.Match) -> None:
-        await initialize_events(self)
+        await self.request_events_refresh(message.guild.id if message.guild is not None else None)
+        await message.channel.send(f"{self.affirm()} {message.author.mention}")
+
+    @command(r"e import", max_concurrency=1)
+    async def import_events(self, message: Message, _command: re.Match) -> None:
+        if message.guild is None:
+            await message.channel.send(
+                f"Sorry {message.author.mention}, events can only be imported in a server."
+            )
+            return
+        if not message.attachments:
+            await message.channel.send(
+                f"Sorry {message.author.mention}, please attach a .csv or .ics file to import."
+            )
+            return
+
+        imported = 0
+        failed: list[str] = []
+        with Session() as session:
+            for attachment in message.attachments:
+                file_format = (
+                    EventFileFormat.ICS
+                    if attachment.filename.endswith(".ics")
+                    else EventFileFormat.CSV
+                )
+                content = (await attachment.read()).decode("utf-8")
+                try:
+                    imported += bulk_import_events(
+                        session,
+                        parse_events(
+                            content.splitlines(keepends=True),
+                            file_format,
+                            created_by=message.author.id,
+                        ),
+                        guild_id=message.guild.id,
+                    )
+                except ValueError as e:
+                    # each file is imported in one transaction, so nothing of it was imported
+                    failed.append(f"{attachment.filename}: {e}")
+
+        # reconcile once after the whole import rather than once per event
+        if imported:
+            await self.request_events_refresh(message.guild.id)
+        if failed:
+            errors = "\n".join(failed)
+            await message.channel.send(
+                f"Sorry {message.author.mention}, I imported {imported} events but couldn't"
+                f" import {len(failed)} files.```{errors}```"
+            )
+            return
+        await message.channel.send(
+            f"{self.affirm()} {message.author.mention}, I imported {imported} events."
+        )
+
+    @command(r"guild configure (?P<options>.+)", max_concurrency=1)
+    async def configure_guild(self, message: Message, command: re.Match) -> None:
+        if (
+            not isinstance(message.author, Member)
+            or not message.author.guild_permissions.administrator
+        ):
+            await message.channel.send(
+                f"Sorry {message.author.mention}, only server administrators can configure me."
+            )
+            return
+
+        try:
+            values = parse_guild_config_options(command.group("options"))
+            with Session() as session:
+                upsert_guild_config(session, message.author.guild.id, values)
+        except ValueError as e:
+            await message.channel.send(
+                f"Sorry {message.author.mention}, I couldn't configure this server.```{e}```"
+            )
+            return
+
+        await self.request_events_refresh(message.author.guild.id)
         await message.channel.send(f"{self.affirm()} {message.author.mention}")
 
     @command(r"sync_commands")
@@ -174,28 +411,119 @@ class DiscordBot:
         if message.guild is None:
             raise ValueError("Guild is none")
         _logger.info("Syncing commands")
-        await self.tree.sync(guild=message.guild)  # type: ignore
+        await sync_command_tree(self.tree, message.guild, force=True)
 
     @command(r"whois (?P<user_id>.+)")
     async def whois(self, message: Message, command: re.Match) -> None:
         if message.guild is None:
             raise ValueError("Guild is none")
         user_id = int(command.group("user_id"))
-        if member := message.guild.get_member(user_id):
+        if member := await get_member(message.guild, user_id):
             if member.nick:
                 await message.channel.send(f"{member.nick} ({member.name})")
             else:
                 await message.channel.send(member.name)
-        elif user := self.client.get_user(user_id):
+        elif user := await self._get_or_fetch_user(user_id):
             await message.channel.send(f"{user.name} (Not a member of the server)")
         else:
             await message.channel.send(
                 f"Sorry {message.author.mention}, I couldn't find a user with ID {user_id}."
             )
 
+    async def _get_or_fetch_user(self, user_id: int) -> User | None:
+        if user := self.client.get_user(user_id):
+            return user
+        try:
+            return await self.client.fetch_user(user_id)
+        except discord.NotFound:
+            return None
+
+    @command(r"memory", namespace=DEBUG_NAMESPACE)
+    async def memory(self, message: Message, _command: re.Match) -> None:
+        await message.channel.send(f"```{self.memory_report()}```")
+
+    @command(r"command_stats", namespace=DEBUG_NAMESPACE)
+    async def command_stats(self, message: Message, _command: re.Match) -> None:
+        lines = [
+            f"{route.name}: {route.stats.calls} calls, {route.stats.errors} errors,"
+            f" {route.stats.rejected} rejected, mean {route.stats.mean_seconds * 1000:.0f}ms,"
+            f" max {route.stats.max_seconds * 1000:.0f}ms"
+            for route in _command_router.routes
+        ]
+        await message.channel.send("```" + "\n".join(lines) + "```")
+
+    @command(r"http_stats", namespace=DEBUG_NAMESPACE)
+    async def http_stats_summary(self, message: Message, _command: re.Match) -> None:
+        await message.channel.send(f"```{self.http_stats.format_summary()[-1900:]}```")
+
+    @command(r"jobs", namespace=DEBUG_NAMESPACE)
+    async def job_stats(self, message: Message, _command: re.Match) -> None:
+        lines = [
+            f"{job_id}: {stats.runs} runs, {stats.errors} errors, {stats.skipped} skipped,"
+            f" {stats.missed} missed, mean {stats.mean_seconds:.1f}s, max {stats.max_seconds:.1f}s"
+            for job_id, stats in job_stats.items()
+        ]
+        refresher = self.events_refresher.stats
+        lines.append(
+            f"initialize_events requests: {refresher.requests} requests, {refresher.runs} runs,"
+            f" {refresher.coalesced} coalesced, {refresher.failed} failed,"
+            f" mean {refresher.mean_seconds:.1f}s, max {refresher.max_seconds:.1f}s"
+        )
+        await message.channel.send("```" + "\n".join(lines) + "```")
+
+    @command(r"reload_settings", namespace=DEBUG_NAMESPACE)
+    async def reload_settings_command(self, message: Message, _command: re.Match) -> None:
+        try:
+            changed = reload_settings()
+        except ValueError as e:
+            # validation errors include the offending values, which may be secrets
+            _logger.exception("Error while reloading settings")
+            await message.channel.send(
+                f"Sorry {message.author.mention}, the new settings are invalid"
+                f" ({type(e).__name__}), keeping the current ones."
+            )
+            return
+
+        await message.channel.send(
+            f"{self.affirm()} {message.author.mention}, changed settings:"
+            f" {', '.join(sorted(changed)) or 'None'}"
+        )
 
-async def start() -> None:
+    def apply_settings(self, settings: Settings, _changed: set[str]) -> None:
+        self.rsvp_debouncer.window_seconds = settings.rsvp_debounce_seconds
+        self.introduction_updater.window_seconds = settings.introduction_update_window_seconds
+
+    @command(r"rsvp_queues", namespace=DEBUG_NAMESPACE)
+    async def rsvp_queue_stats(self, message: Message, _command: re.Match) -> None:
+        stats = self.rsvp_queues.stats
+        depths = ", ".join(
+            f"{event_id}: {depth}" for event_id, depth in self.rsvp_queues.depths.items()
+        )
+        await message.channel.send(
+            f"```{stats.submitted} submitted, {stats.processed} processed, {stats.failed} failed,"
+            f" {stats.batches} batches, max depth {stats.max_depth}"
+            f"\nQueue depths: {depths or 'None'}```"
+        )
+
+
+def _reload_settings_on_signal() -> None:
+    _logger.info("Received SIGHUP, reloading settings")
+    try:
+        reload_settings()
+    except ValueError:
+        _logger.exception("Error while reloading settings, keeping the current ones")
+
+
+async def start(with_api: bool = False) -> None:
+    """
+    Run the bot, and if `with_api` is set, the API server on the same event loop.
+    """
     loop = asyncio.get_running_loop()
+    init_db()
+    if settings.discord_api_base_url is not None:
+        Route.BASE = settings.discord_api_base_url
+    if settings.discord_gateway_url is not None:
+        DiscordWebSocket.DEFAULT_GATEWAY = yarl.URL(settings.discord_gateway_url)
 
     intents = discord.Intents(
         messages=True,
@@ -205,8 +533,36 @@ async def start() -> None:
         reactions=True,
         members=True,
     )
-    client = discord.Client(intents=intents, loop=loop)
-    discord_bot: DiscordBot = DiscordBot(client)
+    http_stats = DiscordHttpStats()
+    client_kwargs: dict[str, Any] = {}
+    client_class = discord.Client
+    if settings.discord_sharded:
+        client_class = discord.AutoShardedClient
+        client_kwargs.update(
+            shard_count=settings.discord_shard_count, shard_ids=settings.discord_shard_ids
+        )
+    client = client_class(
+        **client_kwargs,
+        intents=intents,
+        loop=loop,
+        http_trace=http_stats.trace_config(),
+        max_messages=settings.discord_max_messages or None,
+        chunk_guilds_at_startup=settings.discord_chunk_guilds_at_startup,
+        member_cache_flags=(
+            MemberCacheFlags.from_intents(intents)
+            if settings.discord_cache_members
+            else MemberCacheFlags.none()
+        ),
+    )
+    http_stats.install(client.http)
+    discord_bot: DiscordBot = DiscordBot(client, http_stats=http_stats)
+    metrics.process_name = discord_bot.status_name
+    subscribe_to_settings(
+        ("rsvp_debounce_seconds", "introduction_update_window_seconds"), discord_bot.apply_settings
+    )
+    # settings only read at startup (database, Discord client, schedules) need a restart
+    loop.add_signal_handler(signal.SIGHUP, _reload_settings_on_signal)
+    _logger.info(f"Starting with {discord_bot.memory_report()}")
 
     @client.event
     async def on_ready() -> None:
@@ -240,7 +596,7 @@ async def start() -> None:
     async def update_event(interaction: Interaction, event: str) -> None:
         _logger.info("Started update_event command")
         with Session() as session:
-            db_event = get_event_from_option(session, event)
+            db_event = get_event_from_option(session, event, interaction.guild_id)
             if db_event is None:
                 await interaction.response.send_message(
                     (
@@ -261,7 +617,7 @@ async def start() -> None:
     async def delete_event(interaction: Interaction, event: str) -> None:
         with Session() as session:
             _logger.info("Started delete_event command")
-            db_event = get_event_from_option(session, event)
+            db_event = get_event_from_option(session, event, interaction.guild_id)
             if db_event is None:
                 await interaction.response.send_message(
                     (
@@ -282,7 +638,7 @@ async def start() -> None:
     async def whos_going(interaction: Interaction, event: str) -> None:
         with Session() as session:
             _logger.info("Started whos_going command")
-            db_event = get_event_from_option(session, event)
+            db_event = get_event_from_option(session, event, interaction.guild_id)
             if db_event is None:
                 await interaction.response.send_message(
                     (
@@ -295,4 +651,19 @@ async def start() -> None:
 
             await whos_going_cmd(session, discord_bot, interaction, db_event)
 
-    await client.start(settings.discord_token)
+    if not with_api:
+        await client.start(settings.discord_token)
+        return
+
+    # only imported when needed, since the API's dependencies are slow to import
+    from moobot.fastapi.server import create_server
+
+    server = create_server(discord_bot)
+    bot_task = asyncio.create_task(client.start(settings.discord_token))
+    # stop serving if the bot stops, the server handles SIGINT/SIGTERM for both
+    bot_task.add_done_callback(lambda _task: setattr(server, "should_exit", True))
+    try:
+        await server.serve()
+    finally:
+        await client.close()
+        await bot_task
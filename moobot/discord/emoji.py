@@ -1,14 +1,12 @@
-import discord
-from discord import Emoji
-
-_emojis: list[Emoji] = []
-
-
-async def get_custom_emoji_by_name(client: discord.Client, emoji: str) -> Emoji:
-    for guild in client.guilds:
-        _emojis.extend(await guild.fetch_emojis())
-
-    try:
-        return next(e for e in _emojis if e.name == emoji)
-    except StopIteration:
-        raise ValueError(f"Custom emoji {emoji} not found")
+from discord import Emoji, Guild
+from discord.utils import get
+
+
+async def get_custom_emoji_by_name(guild: Guild, emoji: str) -> Emoji:
+    custom_emoji = get(guild.emojis, name=emoji)
+    if custom_emoji is None:
+        # the emoji cache may not be populated yet
+        custom_emoji = get(await guild.fetch_emojis(), name=emoji)
+    if custom_emoji is None:
+        raise ValueError(f"Custom emoji {emoji} not found in guild {guild.name}")
+    return custom_emoji
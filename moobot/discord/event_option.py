@@ -21,6 +21,7 @@ async def event_autocomplete(interaction: Interaction, current: str) -> list[Cho
     with Session() as session:
         events: list[MoobloomEvent] = (
             session.query(MoobloomEvent)
+            .filter(MoobloomEvent.guild_id == interaction.guild_id)
             .filter(MoobloomEvent.deleted == False)
             .order_by(desc(MoobloomEvent.id))
             .all()
@@ -34,15 +35,21 @@ async def event_autocomplete(interaction: Interaction, current: str) -> list[Cho
     ][:25]
 
 
-def get_event_from_option(session: SessionCls, event_arg: str) -> MoobloomEvent | None:
+def get_event_from_option(
+    session: SessionCls, event_arg: str, guild_id: int | None
+) -> MoobloomEvent | None:
+    # events belong to a guild, so can't be looked up outside of one
+    if guild_id is None:
+        return None
+
     # if arg is a valid PK ID (if user selected an auto-complete choice)
     try:
         event_id = int(event_arg)
         event = get_event_by_id(session, event_id)
-        if event is not None:
+        if event is not None and event.guild_id == guild_id:
             return event
     except ValueError:
         pass
 
     # otherwise they manually typed something, try matching by name
-    return get_event_by_name(session, event_arg)
+    return get_event_by_name(session, event_arg, guild_id=guild_id)
@@ -0,0 +1,43 @@
+import re
+import shlex
+from typing import Any
+
+# "guild configure" option name -> guild config column
+GUILD_CONFIG_OPTIONS = {
+    "calendar_channel": "calendar_channel_id",
+    "announce_channel": "event_announce_channel_id",
+    "all_events_emoji": "get_all_event_channels_react_emoji_name",
+    "google_calendar_emoji": "google_calendar_sync_react_emoji_name",
+    "all_events_role": "all_events_role_name",
+    "category": "active_events_category_name",
+}
+CHANNEL_COLUMNS = {"calendar_channel_id", "event_announce_channel_id"}
+
+# a channel mention or a plain channel ID
+_CHANNEL_REGEX = re.compile(r"^(?:<#(?P<mention_id>\d+)>|(?P<id>\d+))$")
+
+
+def parse_guild_config_options(options: str) -> dict[str, Any]:
+    """
+    Parse `key=value` pairs into guild config column values.
+
+    Values containing spaces must be quoted, e.g. `category="Active Events"`.
+    """
+    values: dict[str, Any] = {}
+    for option in shlex.split(options):
+        key, separator, value = option.partition("=")
+        if not separator or not value:
+            raise ValueError(f"Expected key=value, got {option}")
+        if key not in GUILD_CONFIG_OPTIONS:
+            raise ValueError(
+                f"Unknown option {key}, expected one of {', '.join(GUILD_CONFIG_OPTIONS)}"
+            )
+
+        column = GUILD_CONFIG_OPTIONS[key]
+        if column in CHANNEL_COLUMNS:
+            if (match := _CHANNEL_REGEX.match(value)) is None:
+                raise ValueError(f"{key} must be a channel, got {value}")
+            values[column] = int(match.group("mention_id") or match.group("id"))
+        else:
+            values[column] = value
+    return values
@@ -0,0 +1,196 @@
+"""
+Statistics for the REST requests discord.py makes on the bot's behalf.
+
+Every call to `HTTPClient.request` is recorded per route (e.g. "PATCH /channels/{channel_id}") and
+per logical operation, i.e. the `@discord_operation` functions it was made from. Since discord.py
+handles rate limits and retries inside a single `request` call, the aiohttp requests it makes are
+traced separately: each attempt's 429 responses are counted, and the time spent outside of HTTP
+requests (waiting on rate limit buckets and retry sleeps) is recorded as bucket wait time.
+"""
+
+from __future__ import annotations
+
+import bisect
+import functools
+import logging
+import time
+from collections.abc import Callable, Coroutine, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Any
+
+import aiohttp
+from discord.http import HTTPClient, Route
+
+from moobot import metrics
+
+_logger = logging.getLogger(__name__)
+
+# upper bounds of the latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+NO_OPERATION = "other"
+
+_current_operation: ContextVar[str | None] = ContextVar("discord_operation", default=None)
+_current_request: ContextVar[_RequestRecord | None] = ContextVar(
+    "discord_http_request", default=None
+)
+
+
+@dataclass
+class _RequestRecord:
+    http_seconds: float = 0.0
+    attempts: int = 0
+    rate_limited: int = 0
+
+
+@dataclass
+class RequestStats:
+    requests: int = 0
+    errors: int = 0
+    attempts: int = 0
+    rate_limited: int = 0  # 429 responses
+    total_seconds: float = 0.0
+    bucket_wait_seconds: float = 0.0
+    # request counts per LATENCY_BUCKETS bucket, the last one counting everything slower
+    latency_histogram: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.total_seconds / self.requests if self.requests else 0.0
+
+    def observe(self, record: _RequestRecord, seconds: float, error: bool) -> None:
+        self.requests += 1
+        self.errors += error
+        self.attempts += record.attempts
+        self.rate_limited += record.rate_limited
+        self.total_seconds += seconds
+        self.bucket_wait_seconds += max(0.0, seconds - record.http_seconds)
+        self.latency_histogram[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+    def format(self) -> str:
+        return (
+            f"{self.requests} requests, {self.errors} errors, {self.rate_limited} 429s,"
+            f" mean {self.mean_seconds * 1000:.0f}ms, waited {self.bucket_wait_seconds:.1f}s"
+        )
+
+
+@contextmanager
+def discord_operation_context(name: str) -> Iterator[None]:
+    """
+    Attribute Discord requests made inside the block to the named operation.
+
+    Nested operations are recorded under their full path, e.g.
+    "initialize_events/create_event_channel".
+    """
+    parent = _current_operation.get()
+    token = _current_operation.set(f"{parent}/{name}" if parent is not None else name)
+    try:
+        yield
+    finally:
+        _current_operation.reset(token)
+
+
+def discord_operation[**P, T](
+    f: Callable[P, Coroutine[Any, Any, T]],
+) -> Callable[P, Coroutine[Any, Any, T]]:
+    """
+    Decorator attributing the Discord requests made by an async function to an operation named
+    after the function.
+    """
+
+    @functools.wraps(f)
+    async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+        with discord_operation_context(f.__name__):
+            return await f(*args, **kwargs)
+
+    return wrapper
+
+
+class DiscordHttpStats:
+    def __init__(self) -> None:
+        self.by_route: dict[str, RequestStats] = {}
+        self.by_operation: dict[str, RequestStats] = {}
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """
+        aiohttp trace config to pass to `discord.Client(http_trace=...)`.
+        """
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(self._on_request_start)
+        trace_config.on_request_end.append(self._on_request_end)
+        trace_config.on_request_exception.append(self._on_request_exception)
+        return trace_config
+
+    def install(self, http: HTTPClient) -> None:
+        """
+        Wrap the client's `request` method to record every request.
+        """
+        request = http.request
+
+        async def instrumented_request(route: Route, **kwargs: Any) -> Any:
+            record = _RequestRecord()
+            token = _current_request.set(record)
+            start = time.perf_counter()
+            error = False
+            try:
+                return await request(route, **kwargs)
+            except Exception:
+                error = True
+                raise
+            finally:
+                _current_request.reset(token)
+                self._observe(route, record, time.perf_counter() - start, error)
+
+        http.request = instrumented_request  # type: ignore
+
+    def format_summary(self, limit: int = 10) -> str:
+        def format_top(stats: dict[str, RequestStats]) -> list[str]:
+            top = sorted(stats.items(), key=lambda item: item[1].requests, reverse=True)[:limit]
+            return [f"  {name}: {s.format()}" for name, s in top]
+
+        return "\n".join(
+            [
+                "Discord requests by route:",
+                *format_top(self.by_route),
+                "Discord requests by operation:",
+                *format_top(self.by_operation),
+            ]
+        )
+
+    def _observe(self, route: Route, record: _RequestRecord, seconds: float, error: bool) -> None:
+        operation = _current_operation.get() or NO_OPERATION
+        for key, stats in ((route.key, self.by_route), (operation, self.by_operation)):
+            stats.setdefault(key, RequestStats()).observe(record, seconds, error)
+        metrics.DISCORD_REQUESTS.inc(route=route.key, outcome="error" if error else "success")
+        metrics.DISCORD_REQUEST_SECONDS.observe(seconds, route=route.key)
+        if record.rate_limited:
+            metrics.DISCORD_RATE_LIMITS.inc(record.rate_limited, route=route.key)
+            _logger.warning(
+                f"Discord request {route.key} in {operation} was rate limited"
+                f" {record.rate_limited} times"
+            )
+
+    async def _on_request_start(
+        self, _session: aiohttp.ClientSession, context: SimpleNamespace, _params: Any
+    ) -> None:
+        context.start = time.perf_counter()
+
+    async def _on_request_end(
+        self, _session: aiohttp.ClientSession, context: SimpleNamespace, params: Any
+    ) -> None:
+        if (record := _current_request.get()) is None:
+            return
+        record.attempts += 1
+        record.http_seconds += time.perf_counter() - context.start
+        if params.response.status == 429:
+            record.rate_limited += 1
+
+    async def _on_request_exception(
+        self, _session: aiohttp.ClientSession, context: SimpleNamespace, _params: Any
+    ) -> None:
+        if (record := _current_request.get()) is None:
+            return
+        record.attempts += 1
+        record.http_seconds += time.perf_counter() - context.start
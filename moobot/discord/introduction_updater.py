@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Callable, Coroutine
+from typing import Any
+
+_logger = logging.getLogger(__name__)
+
+UpdateIntroduction = Callable[[int], Coroutine[Any, Any, None]]
+
+
+class IntroductionUpdater:
+    """
+    Coalesces event channel introduction updates.
+
+    An event's introduction is updated at most once per `window_seconds`. The first update after a
+    quiet period runs immediately; updates scheduled while one is already pending are merged into
+    it. Since `update` renders the event's state at the time it runs, the pending update always
+    includes every change scheduled before it.
+    """
+
+    def __init__(self, update: UpdateIntroduction, window_seconds: float) -> None:
+        self.update = update
+        self.window_seconds = window_seconds
+        self._scheduled: dict[int, asyncio.Task[None]] = {}
+        self._last_updated_at: dict[int, float] = {}  # event ID -> loop time
+
+    def schedule(self, event_id: int) -> None:
+        if event_id in self._scheduled:
+            return
+
+        now = asyncio.get_running_loop().time()
+        last_updated_at = self._last_updated_at.get(event_id)
+        delay = 0.0
+        if last_updated_at is not None:
+            delay = max(0.0, last_updated_at + self.window_seconds - now)
+            if delay == 0.0:
+                del self._last_updated_at[event_id]
+        self._scheduled[event_id] = asyncio.create_task(self._update_after(event_id, delay))
+
+    async def join(self) -> None:
+        """
+        Wait until all scheduled updates have run.
+        """
+        while self._scheduled:
+            await asyncio.wait(list(self._scheduled.values()))
+
+    async def _update_after(self, event_id: int, delay: float) -> None:
+        await asyncio.sleep(delay)
+
+        # anything scheduled from here on needs a new update, which waits for the next window
+        del self._scheduled[event_id]
+        self._last_updated_at[event_id] = asyncio.get_running_loop().time()
+        try:
+            await self.update(event_id)
+        except Exception:
+            _logger.exception(f"Error while updating channel introduction for event {event_id}")
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import logging
+import re
+import time
+from collections.abc import Callable, Coroutine
+from dataclasses import dataclass, field
+from re import Pattern
+from typing import Any
+
+_logger = logging.getLogger(__name__)
+
+CommandHandler = Callable[..., Coroutine[Any, Any, Any]]
+
+# a leading plain word followed by whitespace or the end of the pattern, e.g. "whois" in
+# "whois (?P<user_id>.+)"; patterns starting with anything else can't be indexed
+_LEADING_LITERAL_REGEX = re.compile(r"^(\w+)(?=\s|$)")
+
+
+@dataclass
+class CommandStats:
+    calls: int = 0
+    errors: int = 0
+    rejected: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.total_seconds / self.calls if self.calls else 0.0
+
+    def record(self, seconds: float) -> None:
+        self.calls += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+
+@dataclass
+class Route:
+    pattern: Pattern[str]
+    handler: CommandHandler
+    order: int
+    namespace: str | None = None
+    max_concurrency: int | None = None
+    stats: CommandStats = field(default_factory=CommandStats)
+    _semaphore: asyncio.Semaphore | None = field(default=None, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.max_concurrency is not None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    @property
+    def name(self) -> str:
+        return self.handler.__name__
+
+    @property
+    def busy(self) -> bool:
+        """
+        Whether the command is already running `max_concurrency` times.
+        """
+        return self._semaphore is not None and self._semaphore.locked()
+
+    async def __call__(self, *args: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            if self._semaphore is None:
+                return await self.handler(*args)
+            async with self._semaphore:
+                return await self.handler(*args)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.stats.errors += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self.stats.record(elapsed)
+            _logger.debug(f"Command {self.name} took {elapsed * 1000:.1f}ms")
+
+
+class _RouteTable:
+    def __init__(self) -> None:
+        self.by_literal: dict[str, list[Route]] = {}
+        self.unindexed: list[Route] = []
+
+    def add(self, route: Route, pattern_str: str) -> None:
+        if match := _LEADING_LITERAL_REGEX.match(pattern_str):
+            self.by_literal.setdefault(match.group(1).lower(), []).append(route)
+        else:
+            self.unindexed.append(route)
+
+    def candidates(self, command: str) -> list[Route]:
+        first_word = command.split(maxsplit=1)[0].lower() if command else ""
+        indexed = self.by_literal.get(first_word, [])
+        if not self.unindexed:
+            return indexed
+        # keep registration order so the first registered matching command still wins
+        return list(heapq.merge(indexed, self.unindexed, key=lambda r: r.order))
+
+
+class CommandRouter:
+    """
+    Dispatch table for text commands.
+
+    Commands are indexed by the first word of their pattern when they are registered, so resolving
+    a command only tries the patterns starting with the command's first word (plus any patterns
+    that can't be indexed), no matter how many commands exist. Commands can be registered in a
+    namespace, which is a prefix regex that is stripped before matching (e.g. the debug prefix).
+    """
+
+    def __init__(self, namespaces: dict[str, str] | None = None) -> None:
+        self._namespaces = {
+            name: re.compile(rf"^(?:{prefix})", re.IGNORECASE)
+            for name, prefix in (namespaces or {}).items()
+        }
+        self._tables: dict[str | None, _RouteTable] = {None: _RouteTable()}
+        self._tables.update({name: _RouteTable() for name in self._namespaces})
+        self.routes: list[Route] = []
+
+    def add(
+        self,
+        pattern: str,
+        handler: CommandHandler,
+        namespace: str | None = None,
+        max_concurrency: int | None = None,
+    ) -> Route:
+        if namespace not in self._tables:
+            raise ValueError(f"Unknown command namespace {namespace}")
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        route = Route(
+            pattern=re.compile(f"^{pattern}$", re.IGNORECASE),
+            handler=handler,
+            order=len(self.routes),
+            namespace=namespace,
+            max_concurrency=max_concurrency,
+        )
+        self._tables[namespace].add(route, pattern)
+        self.routes.append(route)
+        return route
+
+    def resolve(self, command: str) -> tuple[Route, re.Match[str]] | None:
+        """
+        Find the first registered command matching the given command string.
+        """
+        for name, prefix_regex in self._namespaces.items():
+            if prefix_match := prefix_regex.match(command):
+                resolved = self._match(name, command[prefix_match.end() :])
+                if resolved is not None:
+                    return resolved
+
+        return self._match(None, command)
+
+    def _match(self, namespace: str | None, command: str) -> tuple[Route, re.Match[str]] | None:
+        for route in self._tables[namespace].candidates(command):
+            if match := route.pattern.match(command):
+                return route, match
+        return None
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Callable, Coroutine
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from moobot.db.models import MoobloomEventAttendanceType
+
+if TYPE_CHECKING:
+    from moobot.discord.discord_bot import ReactionAction
+
+_logger = logging.getLogger(__name__)
+
+RSVPKey = tuple[int, int]  # (user ID, announcement message ID)
+ApplyRSVP = Callable[["ReactionAction", MoobloomEventAttendanceType], Coroutine[Any, Any, None]]
+
+
+@dataclass
+class _PendingRSVP:
+    apply: ApplyRSVP
+    # the latest reaction action, only used to refer to the ReactionAction members
+    action: ReactionAction
+    task: asyncio.Task[None] | None = None
+    added: MoobloomEventAttendanceType | None = None
+    removed: set[MoobloomEventAttendanceType] = field(default_factory=set)
+
+
+class RSVPDebouncer:
+    """
+    Collapses bursts of RSVP reactions by the same user on the same announcement message.
+
+    Reactions are only applied once no further reactions arrived for `window_seconds`, and then
+    only the final state is applied: the last added RSVP, or the removed RSVPs if nothing was added.
+    Applies for the same user and message never run concurrently.
+
+    Reactions removed by the bot itself (e.g. the other RSVP reactions after a user RSVPs) are
+    registered with `expect_removal` and skipped when their REMOVED event arrives.
+    """
+
+    def __init__(self, window_seconds: float, expected_removal_ttl_seconds: float = 10.0) -> None:
+        self.window_seconds = window_seconds
+        self.expected_removal_ttl_seconds = expected_removal_ttl_seconds
+        self._pending: dict[RSVPKey, _PendingRSVP] = {}
+        self._applying: dict[RSVPKey, asyncio.Task[None]] = {}
+        # key -> RSVP type -> loop time the removal is no longer expected at
+        self._expected_removals: dict[RSVPKey, dict[MoobloomEventAttendanceType, float]] = {}
+
+    def submit(
+        self,
+        user_id: int,
+        message_id: int,
+        action: ReactionAction,
+        rsvp_type: MoobloomEventAttendanceType,
+        apply: ApplyRSVP,
+    ) -> None:
+        key = (user_id, message_id)
+        # either way, a later removal of this reaction is the user's
+        expected_removal = self._consume_expected_removal(key, rsvp_type)
+        if action == action.REMOVED and expected_removal:
+            _logger.debug(f"Skipping removal of {rsvp_type} RSVP reaction made by the bot")
+            return
+
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = _PendingRSVP(apply=apply, action=action)
+        elif pending.task is not None:
+            pending.task.cancel()
+        pending.apply = apply
+        pending.action = action
+
+        if action == action.ADDED:
+            pending.added = rsvp_type
+            pending.removed.discard(rsvp_type)
+        else:
+            if pending.added == rsvp_type:
+                pending.added = None
+            pending.removed.add(rsvp_type)
+
+        pending.task = asyncio.create_task(self._apply_after_window(key))
+        self._pending[key] = pending
+
+    def expect_removal(
+        self, user_id: int, message_id: int, rsvp_type: MoobloomEventAttendanceType
+    ) -> None:
+        expires_at = asyncio.get_running_loop().time() + self.expected_removal_ttl_seconds
+        self._expected_removals.setdefault((user_id, message_id), {})[rsvp_type] = expires_at
+
+    def _consume_expected_removal(
+        self, key: RSVPKey, rsvp_type: MoobloomEventAttendanceType
+    ) -> bool:
+        expected = self._expected_removals.get(key)
+        if expected is None:
+            return False
+
+        expires_at = expected.pop(rsvp_type, None)
+        if not expected:
+            del self._expected_removals[key]
+        # removals the bot made for reactions the user didn't have never come back as events
+        return expires_at is not None and expires_at >= asyncio.get_running_loop().time()
+
+    async def _apply_after_window(self, key: RSVPKey) -> None:
+        await asyncio.sleep(self.window_seconds)
+
+        # past this point the apply can't be cancelled anymore, later reactions start a new window
+        pending = self._pending.pop(key)
+        previous = self._applying.get(key)
+        current = asyncio.current_task()
+        self._applying[key] = current  # type: ignore
+        try:
+            if previous is not None:
+                await asyncio.wait([previous])
+            if pending.added is not None:
+                await pending.apply(pending.action.ADDED, pending.added)
+            else:
+                for rsvp_type in pending.removed:
+                    await pending.apply(pending.action.REMOVED, rsvp_type)
+        except Exception:
+            _logger.exception(f"Error while applying RSVP for user {key[0]} on message {key[1]}")
+        finally:
+            if self._applying.get(key) is current:
+                del self._applying[key]
+
+    async def join(self) -> None:
+        """
+        Wait until all pending RSVPs have been applied.
+        """
+        while self._pending or self._applying:
+            tasks = [p.task for p in self._pending.values() if p.task is not None]
+            await asyncio.wait([*tasks, *self._applying.values()])
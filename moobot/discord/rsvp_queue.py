@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Callable, Coroutine
+from dataclasses import dataclass
+from typing import Any
+
+_logger = logging.getLogger(__name__)
+
+RSVPJob = Callable[[], Coroutine[Any, Any, None]]
+AfterBatch = Callable[[int], Coroutine[Any, Any, None]]
+
+
+@dataclass
+class RSVPQueueStats:
+    submitted: int = 0
+    processed: int = 0
+    failed: int = 0
+    batches: int = 0
+    max_depth: int = 0
+
+
+class EventRSVPQueues:
+    """
+    Processes RSVP jobs with one ordered queue (and worker) per event.
+
+    Jobs for the same event run one at a time in submission order. Whatever is queued when the
+    worker picks up work is processed as one batch (up to `max_batch_size` jobs), followed by a
+    single call to `after_batch`, e.g. to edit the event's channel introduction once per batch.
+    At most `max_concurrency` events are processed at the same time, and `submit` waits while an
+    event's queue already holds `max_queue_size` jobs.
+    """
+
+    def __init__(
+        self,
+        after_batch: AfterBatch,
+        max_concurrency: int = 4,
+        max_queue_size: int = 100,
+        max_batch_size: int = 20,
+    ) -> None:
+        if max_concurrency < 1 or max_queue_size < 1 or max_batch_size < 1:
+            raise ValueError("RSVP queue limits must be at least 1")
+
+        self.after_batch = after_batch
+        self.max_batch_size = max_batch_size
+        self.max_queue_size = max_queue_size
+        self.stats = RSVPQueueStats()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._queues: dict[int, asyncio.Queue[RSVPJob]] = {}
+        self._workers: dict[int, asyncio.Task[None]] = {}
+        # event ID -> number of submits waiting for room in the event's queue
+        self._waiting: dict[int, int] = {}
+
+    @property
+    def depths(self) -> dict[int, int]:
+        """
+        Number of queued jobs per event ID.
+        """
+        return {event_id: queue.qsize() for event_id, queue in self._queues.items()}
+
+    async def submit(self, event_id: int, job: RSVPJob) -> None:
+        queue = self._queues.get(event_id)
+        if queue is None:
+            queue = self._queues[event_id] = asyncio.Queue(self.max_queue_size)
+        if queue.full():
+            _logger.warning(f"RSVP queue for event {event_id} is full, waiting")
+        # the queue stays registered while submits wait for room, even if its worker exits
+        self._waiting[event_id] = self._waiting.get(event_id, 0) + 1
+        try:
+            await queue.put(job)
+        finally:
+            self._waiting[event_id] -= 1
+            if not self._waiting[event_id]:
+                del self._waiting[event_id]
+            if event_id not in self._workers:
+                self._release_queue(event_id, queue)
+
+        self.stats.submitted += 1
+        self.stats.max_depth = max(self.stats.max_depth, queue.qsize())
+        # the worker may have drained the queue and exited while this submit was waiting
+        if event_id not in self._workers:
+            self._workers[event_id] = asyncio.create_task(self._work(event_id, queue))
+
+    async def join(self) -> None:
+        """
+        Wait until all queued jobs have been processed.
+        """
+        while self._workers:
+            await asyncio.wait(list(self._workers.values()))
+
+    async def _work(self, event_id: int, queue: asyncio.Queue[RSVPJob]) -> None:
+        try:
+            while not queue.empty():
+                async with self._semaphore:
+                    batch_size = min(queue.qsize(), self.max_batch_size)
+                    await self._process_batch(
+                        event_id, [queue.get_nowait() for _ in range(batch_size)]
+                    )
+        finally:
+            del self._workers[event_id]
+            self._release_queue(event_id, queue)
+
+    def _release_queue(self, event_id: int, queue: asyncio.Queue[RSVPJob]) -> None:
+        """
+        Unregister an event's queue once it's empty and no submit is waiting to add to it.
+        """
+        if queue.empty() and event_id not in self._waiting and self._queues.get(event_id) is queue:
+            del self._queues[event_id]
+
+    async def _process_batch(self, event_id: int, batch: list[RSVPJob]) -> None:
+        _logger.debug(f"Processing {len(batch)} RSVPs for event {event_id}")
+        for job in batch:
+            try:
+                await job()
+                self.stats.processed += 1
+            except Exception:
+                self.stats.failed += 1
+                _logger.exception(f"Error while processing RSVP for event {event_id}")
+
+        self.stats.batches += 1
+        try:
+            await self.after_batch(event_id)
+        except Exception:
+            _logger.exception(f"Error after processing RSVPs for event {event_id}")
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Callable, Coroutine, Iterable
+from dataclasses import dataclass
+from typing import Any
+
+_logger = logging.getLogger(__name__)
+
+# keys (e.g. guild IDs) a run covers, None for all of them
+RunKeys = frozenset[int] | None
+Run = Callable[[RunKeys], Coroutine[Any, Any, None]]
+
+
+@dataclass
+class SingleFlightStats:
+    requests: int = 0
+    runs: int = 0
+    coalesced: int = 0  # requests served by an already queued run
+    failed: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    last_seconds: float = 0.0
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.total_seconds / self.runs if self.runs else 0.0
+
+
+class SingleFlight:
+    """
+    Runs a coroutine function at most once at a time.
+
+    A request made while nothing is running starts a run. Requests made while a run is in flight
+    are coalesced into a single follow-up run, which starts when the in-flight run finishes, so
+    every request is served by a run that started after it was made. The follow-up covers the
+    union of the keys its requests asked for.
+    """
+
+    def __init__(self, name: str, run: Run) -> None:
+        self.name = name
+        self.run = run
+        self.stats = SingleFlightStats()
+        self._in_flight: asyncio.Task[None] | None = None
+        self._queued: asyncio.Future[None] | None = None
+        self._queued_keys: set[int] | None = None
+
+    @property
+    def busy(self) -> bool:
+        return self._in_flight is not None
+
+    async def request(self, keys: Iterable[int] | None = None) -> None:
+        """
+        Request a run covering `keys` (all keys if None) and wait until it has finished.
+
+        Failures are logged rather than raised, since a run may serve many requests.
+        """
+        self.stats.requests += 1
+        loop = asyncio.get_running_loop()
+        if self._in_flight is None:
+            done = loop.create_future()
+            self._start(frozenset(keys) if keys is not None else None, done)
+        elif self._queued is None:
+            done = self._queued = loop.create_future()
+            self._queued_keys = set(keys) if keys is not None else None
+        else:
+            done = self._queued
+            self.stats.coalesced += 1
+            if keys is None:
+                self._queued_keys = None
+            elif self._queued_keys is not None:
+                self._queued_keys.update(keys)
+        # a cancelled requester must not cancel the run for everyone else
+        await asyncio.shield(done)
+
+    def _start(self, keys: RunKeys, done: asyncio.Future[None]) -> None:
+        self._in_flight = asyncio.create_task(self._run(keys, done))
+
+    async def _run(self, keys: RunKeys, done: asyncio.Future[None]) -> None:
+        loop = asyncio.get_running_loop()
+        started_at = loop.time()
+        try:
+            await self.run(keys)
+        except Exception:
+            self.stats.failed += 1
+            _logger.exception(f"{self.name} failed")
+        finally:
+            seconds = loop.time() - started_at
+            self.stats.runs += 1
+            self.stats.total_seconds += seconds
+            self.stats.max_seconds = max(self.stats.max_seconds, seconds)
+            self.stats.last_seconds = seconds
+            _logger.info(f"{self.name} took {seconds:.1f}s")
+            done.set_result(None)
+
+            if self._queued is not None:
+                queued, queued_keys = self._queued, self._queued_keys
+                self._queued = self._queued_keys = None
+                self._start(frozenset(queued_keys) if queued_keys is not None else None, queued)
+            else:
+                self._in_flight = None
@@ -11,8 +11,11 @@ from discord import Interaction, TextStyle
 from discord.ui import Modal, TextInput
 
 from moobot.db.models import MoobloomEvent
-from moobot.util.date_parser import TimeAwareParserResult, time_aware_parser
-from moobot.util.format import format_event_duration_for_event_modal
+from moobot.util.date_parser import parse_time_aware
+from moobot.util.format import (
+    format_event_description_for_event_modal,
+    format_event_duration_for_event_modal,
+)
 
 if TYPE_CHECKING:
     from moobot.discord.discord_bot import DiscordBot
@@ -36,23 +39,24 @@ def _parse_event_time(raw_time: str) -> EventTime:
     if len(time_parts) > 2:
         raise ValueError("Could not parse event time: too many parts")
 
-    start: TimeAwareParserResult = time_aware_parser.parse(time_parts[0])  # type: ignore
+    now = datetime.now()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    start = parse_time_aware(time_parts[0], default=today)
 
     if len(time_parts) == 2:
-        end: TimeAwareParserResult = time_aware_parser.parse(time_parts[1])  # type: ignore
-        # support strings like "9/21 7pm to 10pm"
-        if not end.has_date:
-            end.dt = end.dt.replace(year=start.dt.year, month=start.dt.month, day=start.dt.day)
+        # the end defaults to the start date, to support strings like "9/21 7pm to 10pm" and
+        # "Sept 21 to 23"
+        end = parse_time_aware(time_parts[1], default=start.dt.replace(hour=0, minute=0))
     else:
         end = dataclasses.replace(start)  # copy object
 
     # this event is probably occurring next year
-    if start.dt < datetime.now():
+    if start.dt < now:
         _logger.info(
             "User specified start date appears to be in the past, automatically adding 1 year"
         )
         start.dt = start.dt.replace(year=start.dt.year + 1)
-    if end.dt < datetime.now():
+    if end.dt < now:
         _logger.info(
             "User specified end date appears to be in the past, automatically adding 1 year"
         )
@@ -151,11 +155,7 @@ class CreateEventModal(Modal):
             self._prefill_fields(prefill)
 
     def _prefill_fields(self, event: MoobloomEvent) -> None:
-        description_parts = (
-            f"url:{event.url}" if event.url else None,
-            f"image_url:{event.image_url}" if event.image_url else None,
-            event.description,
-        )
+        description = format_event_description_for_event_modal(event)
 
         for child in self.children:
             if not isinstance(child, TextInput):
@@ -169,9 +169,8 @@ class CreateEventModal(Modal):
                 child.default = format_event_duration_for_event_modal(event)
             elif child == self.location and event.location:
                 child.default = event.location
-            elif child == self.description and any(description_parts):
-                parts = (part for part in description_parts if part)
-                child.default = "\n".join(parts)
+            elif child == self.description and description:
+                child.default = description
 
     async def on_submit(self, interaction: Interaction) -> None:
         assert self.time.value is not None
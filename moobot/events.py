@@ -1,15 +1,16 @@
 from __future__ import annotations
 
 import asyncio
-import calendar
+import hashlib
 import logging
 from asyncio import run_coroutine_threadsafe
-from datetime import date
+from collections.abc import Collection, Sequence
+from contextlib import suppress
+from datetime import date, timedelta
 from threading import Thread
 from typing import TYPE_CHECKING
 
 import discord
-import google
 from discord import (
     Embed,
     Emoji,
@@ -17,12 +18,13 @@ from discord import (
     Message,
     PartialEmoji,
     PermissionOverwrite,
+    Role,
     TextChannel,
     User,
 )
 from discord.utils import get
-from sqlalchemy.orm import joinedload
 
+from moobot import metrics
 from moobot.constants import (
     GOOGLE_CALENDAR_SYNC_DISABLE_DM,
     GOOGLE_CALENDAR_SYNC_ENABLE_DM_TEMPLATE,
@@ -30,18 +32,39 @@ from moobot.constants import (
     GOOGLE_CALENDAR_SYNC_SETUP_COMPLETE_DM,
     GOOGLE_CALENDAR_SYNC_TOKEN_NOT_AUTHORIZED,
 )
+from moobot.db.crud.archive import archive_events_ended_before
+from moobot.db.crud.events import get_event_snapshot, get_event_snapshots, update_event_by_id
 from moobot.db.crud.google import get_api_user_by_user_id, get_api_users_by_setup_finished
+from moobot.db.crud.guilds import (
+    CALENDAR_HEADER_KEY,
+    CalendarMessage,
+    assign_events_without_guild,
+    get_calendar_messages,
+    get_guild_config,
+    get_guild_configs,
+    set_calendar_messages,
+    upsert_guild_config,
+)
 from moobot.db.models import (
     GoogleApiUser,
     MoobloomEvent,
     MoobloomEventAttendanceType,
     MoobloomEventRSVP,
 )
-from moobot.db.session import Session
+from moobot.db.session import Session, WriteSession
+from moobot.db.snapshots import EventSnapshot, GuildConfigSnapshot
 from moobot.discord.emoji import get_custom_emoji_by_name
+from moobot.discord.http_stats import discord_operation
 from moobot.settings import get_settings
-from moobot.util.discord import channel_mention, mention
-from moobot.util.format import format_event_duration, format_single_event_for_calendar
+from moobot.util.calendar_renderer import CalendarRenderer
+from moobot.util.discord import (
+    channel_mention,
+    get_members,
+    grant_channel_access,
+    has_reacted,
+    mention,
+)
+from moobot.util.format import format_event_duration
 from moobot.util.google import (
     add_or_update_event,
     create_moobloom_events_calendar,
@@ -53,25 +76,120 @@ if TYPE_CHECKING:
     from discord.guild import GuildChannel
 
     from moobot.discord.discord_bot import DiscordBot, ReactionAction
+    from moobot.discord.rsvp_debouncer import RSVPDebouncer
 
 settings = get_settings()
 
 _logger = logging.getLogger(__name__)
 
+# message ID -> last known content of event channel introduction messages, so that they can be
+# edited without fetching them first
+_introduction_message_contents: dict[int, str] = {}
+# guild ID -> renderer of the guild's calendar
+_calendar_renderers: dict[int, CalendarRenderer] = {}
+
+CALENDAR_GREETING = "Welcome to the Moobloom Event calendar!"
+
 
-async def initialize_events(bot: DiscordBot) -> None:
-    _logger.info("Initializing events!")
-    await send_event_announcements(bot.client)
-    await create_event_channels(bot.client)
-    await send_event_channel_introductions(bot.client)
-    await update_calendar_message(bot.client)
-    await add_reaction_handlers(bot)
-    await update_out_of_sync_events(bot.client)
-    await add_rsvp_reactions(bot.client)
+@discord_operation
+async def initialize_events(bot: DiscordBot, guild_ids: Collection[int] | None = None) -> None:
+    """
+    Reconcile the events of the given guilds, or of every configured guild served by this client.
 
+    Guilds are reconciled concurrently, and a failure in one guild doesn't affect the others. Use
+    `DiscordBot.request_events_refresh` instead of calling this directly, so that overlapping
+    runs are coalesced.
+    """
+    with Session() as session:
+        guild_configs = get_guild_configs(session)
+    if guild_ids is not None:
+        guild_configs = [g for g in guild_configs if g.guild_id in guild_ids]
+    # with sharding, other processes serve the remaining guilds
+    guild_configs = [g for g in guild_configs if bot.client.get_guild(g.guild_id) is not None]
+
+    results = await asyncio.gather(
+        *(initialize_guild_events(bot, guild_config) for guild_config in guild_configs),
+        return_exceptions=True,
+    )
+    failed = 0
+    for guild_config, result in zip(guild_configs, results):
+        if isinstance(result, BaseException):
+            failed += 1
+            _logger.error(
+                f"Failed to initialize events for guild {guild_config.guild_id}", exc_info=result
+            )
+    if failed:
+        raise ValueError(f"Failed to initialize events for {failed} of {len(results)} guilds")
+
+
+@discord_operation
+async def initialize_guild_events(bot: DiscordBot, guild_config: GuildConfigSnapshot) -> None:
+    _logger.info(f"Initializing events for guild {guild_config.guild_id}!")
+    stage_seconds = metrics.INITIALIZE_EVENTS_STAGE_SECONDS
+    with stage_seconds.time(stage="send_event_announcements"):
+        await send_event_announcements(bot.client, guild_config)
+    with stage_seconds.time(stage="create_event_channels"):
+        await create_event_channels(bot.client, guild_config)
+    with stage_seconds.time(stage="send_event_channel_introductions"):
+        await send_event_channel_introductions(bot.client, guild_config)
+    with stage_seconds.time(stage="update_calendar_message"):
+        await update_calendar_message(bot.client, guild_config)
+    with stage_seconds.time(stage="add_reaction_handlers"):
+        await add_reaction_handlers(bot, guild_config)
+    with stage_seconds.time(stage="update_out_of_sync_events"):
+        await update_out_of_sync_events(bot.client, guild_config)
+    with stage_seconds.time(stage="add_rsvp_reactions"):
+        await add_rsvp_reactions(bot.client, guild_config)
+
+
+def seed_guild_config_from_settings(client: discord.Client) -> None:
+    """
+    Configure the guild containing the announcement channel from the settings, if set, and move
+    events created before multi-guild support into it.
+    """
+    if settings.event_announce_channel_id is None:
+        return
+    # with sharding, the guild may be served by another process
+    guild = getattr(client.get_channel(settings.event_announce_channel_id), "guild", None)
+    if guild is None:
+        return
+
+    with Session() as session:
+        if get_guild_config(session, guild.id) is None:
+            _logger.info(f"Configuring guild {guild.name} from settings")
+            # raises if only some of the settings are set
+            upsert_guild_config(
+                session,
+                guild.id,
+                {
+                    "calendar_channel_id": settings.calendar_channel_id,
+                    "event_announce_channel_id": settings.event_announce_channel_id,
+                    "get_all_event_channels_react_emoji_name": (
+                        settings.get_all_event_channels_react_emoji_name
+                    ),
+                    "google_calendar_sync_react_emoji_name": (
+                        settings.google_calendar_sync_react_emoji_name
+                    ),
+                    "all_events_role_name": settings.all_events_role_name,
+                    "active_events_category_name": settings.active_events_category_name,
+                },
+            )
+        if moved := assign_events_without_guild(session, guild.id):
+            _logger.info(f"Moved {moved} events without a guild into guild {guild.name}")
+
+
+def load_guild_config(guild_id: int | None) -> GuildConfigSnapshot:
+    if guild_id is None:
+        raise ValueError("Events can only be managed in a server")
+    with Session() as session:
+        guild_config = get_guild_config(session, guild_id)
+    if guild_config is None:
+        raise ValueError(f"Guild {guild_id} is not configured")
+    return guild_config
 
-def get_calendar_channel(client: discord.Client) -> TextChannel:
-    calendar_channel = client.get_channel(settings.calendar_channel_id)
+
+def get_calendar_channel(client: discord.Client, guild_config: GuildConfigSnapshot) -> TextChannel:
+    calendar_channel = client.get_channel(guild_config.calendar_channel_id)
     if calendar_channel is None:
         raise ValueError("Calendar channel does not exist")
     if not isinstance(calendar_channel, TextChannel):
@@ -79,8 +197,10 @@ def get_calendar_channel(client: discord.Client) -> TextChannel:
     return calendar_channel
 
 
-def get_announcement_channel(client: discord.Client) -> TextChannel:
-    announcement_channel = client.get_channel(settings.event_announce_channel_id)
+def get_announcement_channel(
+    client: discord.Client, guild_config: GuildConfigSnapshot
+) -> TextChannel:
+    announcement_channel = client.get_channel(guild_config.event_announce_channel_id)
     if announcement_channel is None:
         raise ValueError("Announcement channel does not exist")
     if not isinstance(announcement_channel, TextChannel):
@@ -88,12 +208,12 @@ def get_announcement_channel(client: discord.Client) -> TextChannel:
     return announcement_channel
 
 
-async def get_event_channel(client: discord.Client, event: MoobloomEvent) -> TextChannel:
+async def get_event_channel(client: discord.Client, event: EventSnapshot) -> TextChannel:
     if event.channel_id is None:
         raise ValueError(f"Event {event.name} ({event.id}) does not have a channel")
 
-    event_channel = client.get_channel(event.channel_id) or await client.fetch_channel(  # type: ignore
-        event.channel_id  # type: ignore
+    event_channel = client.get_channel(event.channel_id) or await client.fetch_channel(
+        event.channel_id
     )
     if event_channel is None:
         raise ValueError("Event channel does not exist")
@@ -102,20 +222,23 @@ async def get_event_channel(client: discord.Client, event: MoobloomEvent) -> Tex
     return event_channel
 
 
-async def send_event_announcements(client: discord.Client) -> None:
-    with Session(expire_on_commit=False) as session:
-        events: list[MoobloomEvent] = (
-            session.query(MoobloomEvent)
-            .filter(MoobloomEvent.deleted == False)
-            .filter(MoobloomEvent.announcement_message_id == None)
-            .all()
+@discord_operation
+async def send_event_announcements(
+    client: discord.Client, guild_config: GuildConfigSnapshot
+) -> None:
+    with Session() as session:
+        events = get_event_snapshots(
+            session,
+            MoobloomEvent.guild_id == guild_config.guild_id,
+            MoobloomEvent.deleted == False,
+            MoobloomEvent.announcement_message_id == None,
         )
 
     for event in events:
-        await send_event_announcement(client, event)
+        await send_event_announcement(client, guild_config, event)
 
 
-def build_event_announcement_embed(event: MoobloomEvent) -> Embed:
+def build_event_announcement_embed(event: EventSnapshot) -> Embed:
     event_duration = format_event_duration(
         event.start_date, event.start_time, event.end_date, event.end_time
     )
@@ -149,150 +272,204 @@ def build_event_announcement_embed(event: MoobloomEvent) -> Embed:
     return embed
 
 
-async def send_event_announcement(client: discord.Client, event: MoobloomEvent) -> None:
+async def send_event_announcement(
+    client: discord.Client, guild_config: GuildConfigSnapshot, event: EventSnapshot
+) -> None:
     _logger.info(f"Announcing event {event.name}")
 
-    announcement_channel = get_announcement_channel(client)
+    announcement_channel = get_announcement_channel(client, guild_config)
 
     message = await announcement_channel.send(embed=build_event_announcement_embed(event))
 
     with Session() as session:
-        session.add(event)
-        event.announcement_message_id = str(message.id)
-        session.commit()
+        update_event_by_id(session, event.id, {"announcement_message_id": message.id})
 
 
-async def add_rsvp_reactions(client: discord.Client) -> None:
+@discord_operation
+async def add_rsvp_reactions(client: discord.Client, guild_config: GuildConfigSnapshot) -> None:
     with Session() as session:
-        events: list[MoobloomEvent] = (
-            session.query(MoobloomEvent)
-            .filter(MoobloomEvent.deleted == False)
-            .filter(MoobloomEvent.reactions_created == False)
-            .all()
+        events = get_event_snapshots(
+            session,
+            MoobloomEvent.guild_id == guild_config.guild_id,
+            MoobloomEvent.deleted == False,
+            MoobloomEvent.reactions_created == False,
         )
 
-        await asyncio.gather(*[add_event_rsvp_reaction(client, event) for event in events])
+    await asyncio.gather(
+        *[add_event_rsvp_reaction(client, guild_config, event) for event in events]
+    )
 
-        session.commit()
+    if events:
+        with Session() as session:
+            session.query(MoobloomEvent).filter(
+                MoobloomEvent.id.in_([event.id for event in events])
+            ).update({MoobloomEvent.reactions_created: True})
+            session.commit()
 
 
-async def add_event_rsvp_reaction(client: discord.Client, event: MoobloomEvent) -> None:
-    announcement_channel = get_announcement_channel(client)
+async def add_event_rsvp_reaction(
+    client: discord.Client, guild_config: GuildConfigSnapshot, event: EventSnapshot
+) -> None:
+    announcement_channel = get_announcement_channel(client, guild_config)
     message = await announcement_channel.fetch_message(event.announcement_message_id)  # type: ignore
     await message.add_reaction(settings.rsvp_yes_emoji)
     await message.add_reaction(settings.rsvp_maybe_emoji)
     await message.add_reaction(settings.rsvp_no_emoji)
-    event.reactions_created = True
     _logger.info(f"Added rsvp emojis to announcement of event {event.name}")
 
 
-async def update_out_of_sync_events(client: discord.Client) -> None:
+@discord_operation
+async def update_out_of_sync_events(
+    client: discord.Client, guild_config: GuildConfigSnapshot
+) -> None:
     with Session() as session:
-        events: list[MoobloomEvent] = (
-            session.query(MoobloomEvent)
-            .filter(MoobloomEvent.deleted == False)
-            .filter(MoobloomEvent.out_of_sync == True)
-            .all()
+        events = get_event_snapshots(
+            session,
+            MoobloomEvent.guild_id == guild_config.guild_id,
+            MoobloomEvent.deleted == False,
+            MoobloomEvent.out_of_sync == True,
+            include_rsvps=True,
         )
 
-        for event in events:
-            _logger.info(f"Updating out-of-sync event {event.name}")
-            await update_event_announcement(client, event)
-            await update_event_google_calendar_events(client, event)
-            await update_event_channel_introduction(client, event)
-            event.out_of_sync = False
-
-        session.commit()
+    for event in events:
+        _logger.info(f"Updating out-of-sync event {event.name}")
+        await update_event_announcement(client, guild_config, event)
+        await update_event_google_calendar_events(client, event)
+        await update_event_channel_introduction(client, event)
+        with Session() as session:
+            update_event_by_id(session, event.id, {"out_of_sync": False})
 
 
-async def update_event_announcement(client: discord.Client, event: MoobloomEvent) -> None:
+async def update_event_announcement(
+    client: discord.Client, guild_config: GuildConfigSnapshot, event: EventSnapshot
+) -> None:
     if event.announcement_message_id is None:
         raise ValueError(
             f"Cannot update announcement for unnanounced event {event.name} (id={event.id})"
         )
 
-    announcement_channel = get_announcement_channel(client)
-    message = await announcement_channel.fetch_message(int(event.announcement_message_id))
+    announcement_channel = get_announcement_channel(client, guild_config)
+    message = await announcement_channel.fetch_message(event.announcement_message_id)
 
     await message.edit(embed=build_event_announcement_embed(event))
 
 
-async def update_event_google_calendar_events(client: discord.Client, event: MoobloomEvent) -> None:
+async def update_event_google_calendar_events(client: discord.Client, event: EventSnapshot) -> None:
     for rsvp in event.rsvps:
-        user = await client.fetch_user(int(rsvp.user_id))
-        handle_google_calendar_sync_on_rsvp(
-            client, user, event, MoobloomEventAttendanceType(rsvp.attendance_type)
-        )
+        user = await client.fetch_user(rsvp.user_id)
+        handle_google_calendar_sync_on_rsvp(client, user, event, rsvp.attendance_type)
 
 
-async def create_event_channels(client: discord.Client) -> None:
-    with Session(expire_on_commit=False) as session:
-        events: list[MoobloomEvent] = (
-            session.query(MoobloomEvent)
-            .filter(MoobloomEvent.deleted == False)
-            .filter(MoobloomEvent.create_channel == True)
-            .filter(MoobloomEvent.channel_id == None)
-            .all()
+@discord_operation
+async def create_event_channels(client: discord.Client, guild_config: GuildConfigSnapshot) -> None:
+    with Session() as session:
+        events = get_event_snapshots(
+            session,
+            MoobloomEvent.guild_id == guild_config.guild_id,
+            MoobloomEvent.deleted == False,
+            MoobloomEvent.create_channel == True,
+            MoobloomEvent.channel_id == None,
+            include_rsvps=True,
         )
 
     for event in events:
-        await create_event_channel(client, event)
+        await create_event_channel(client, guild_config, event)
+
 
+def _hash_calendar_content(content: str) -> str:
+    return hashlib.sha256(content.encode()).hexdigest()
 
-async def get_calendar_message(
+
+async def _find_legacy_calendar_message(
     client: discord.Client, calendar_channel: TextChannel
 ) -> Message | None:
-    calendar_message: Message | None = None
+    # calendars sent before their messages were tracked are looked up once, so that the existing
+    # message (and its reactions) becomes the header
     async for message in calendar_channel.history():
-        if client.user is not None and message.author.id == client.user.id:
-            calendar_message = message
-            break
+        if (
+            client.user is not None
+            and message.author.id == client.user.id
+            and message.content.startswith(CALENDAR_GREETING)
+        ):
+            return message
+    return None
+
+
+async def sync_calendar_pages(
+    calendar_channel: TextChannel, old_pages: Sequence[CalendarMessage], pages: dict[str, str]
+) -> tuple[list[CalendarMessage], int]:
+    """
+    Bring the calendar's page messages in line with the rendered pages, in as few requests as
+    possible.
+
+    Pages are matched to their existing messages by key and only edited when their content
+    changed, the pages of months no longer shown are deleted. Messages can't be reordered, so a
+    page inserted before existing ones takes over the next message instead, which moves the
+    following pages down by one.
+
+    Returns the page messages and the number of requests made.
+    """
+    new_pages: list[CalendarMessage] = []
+    requests = 0
+    old_index = 0
+
+    async def delete_page(page: CalendarMessage) -> None:
+        nonlocal requests
+        with suppress(discord.NotFound):
+            await calendar_channel.get_partial_message(page.message_id).delete()
+        requests += 1
+
+    for key, content in pages.items():
+        content_hash = _hash_calendar_content(content)
+        while old_index < len(old_pages) and old_pages[old_index].key not in pages:
+            await delete_page(old_pages[old_index])
+            old_index += 1
+
+        if old_index < len(old_pages):
+            old_page = old_pages[old_index]
+            old_index += 1
+            if old_page.content_hash != content_hash:
+                await calendar_channel.get_partial_message(old_page.message_id).edit(
+                    content=content
+                )
+                requests += 1
+            message_id = old_page.message_id
+        else:
+            message_id = (await calendar_channel.send(content=content)).id
+            requests += 1
+        new_pages.append(CalendarMessage(key, message_id, content_hash))
 
-    return calendar_message
+    for old_page in old_pages[old_index:]:
+        await delete_page(old_page)
+    return new_pages, requests
 
 
-async def update_calendar_message(client: discord.Client) -> None:
-    calendar_channel = get_calendar_channel(client)
-    announcement_channel = get_announcement_channel(client)
+@discord_operation
+async def update_calendar_message(
+    client: discord.Client, guild_config: GuildConfigSnapshot
+) -> None:
+    calendar_channel = get_calendar_channel(client, guild_config)
+    announcement_channel = get_announcement_channel(client, guild_config)
 
     with Session() as session:
-        events: list[MoobloomEvent] = (
-            session.query(MoobloomEvent)
-            .filter(MoobloomEvent.deleted == False)
-            .filter(MoobloomEvent.end_date >= date.today())
-            .order_by(MoobloomEvent.start_date)
-            .all()
+        events = get_event_snapshots(
+            session,
+            MoobloomEvent.guild_id == guild_config.guild_id,
+            MoobloomEvent.deleted == False,
+            MoobloomEvent.end_date >= date.today(),
+            order_by=MoobloomEvent.start_date,
         )
 
-    events_by_month_and_year: dict[tuple[int, int], list[MoobloomEvent]] = {}
-    for event in events:
-        month_and_year = (event.start_date.month, event.start_date.year)
-        if month_and_year not in events_by_month_and_year:
-            events_by_month_and_year[month_and_year] = []
-        events_by_month_and_year[month_and_year].append(event)
-
-    formatted_events_by_month_and_year: dict[tuple[int, int], str] = {}
-    for (month, year), events in events_by_month_and_year.items():
-        formatted_events_by_month_and_year[(month, year)] = "\n".join(
-            [format_single_event_for_calendar(e) for e in events]
-        )
-
-    months_sections = "\n\n".join(
-        [
-            f"**{calendar.month_name[month]} {year}:**\n{events}"
-            for (month, year), events in formatted_events_by_month_and_year.items()
-        ]
-    )
-    if not months_sections:
-        months_sections = "No upcoming events!"
+    renderer = _calendar_renderers.setdefault(guild_config.guild_id, CalendarRenderer())
+    pages = renderer.render_pages(events)
 
     intro_section = (
-        "Welcome to the Moobloom Event calendar! A full list of upcoming events is available"
+        f"{CALENDAR_GREETING} A full list of upcoming events is available"
         " below.\nIn order to reduce notification spam, each event has a private channel for"
         f" discussion and planning. To gain access, RSVP in {announcement_channel.mention}."
     )
     all_events_react_emoji = await get_custom_emoji_by_name(
-        client, settings.get_all_event_channels_react_emoji_name
+        calendar_channel.guild, guild_config.get_all_event_channels_react_emoji_name
     )
     all_events_react_section = (
         "To automatically gain access to all new event channels (and accept the consequences of"
@@ -300,28 +477,56 @@ async def update_calendar_message(client: discord.Client) -> None:
     )
 
     google_calendar_sync_react_emoji = await get_custom_emoji_by_name(
-        client, settings.google_calendar_sync_react_emoji_name
+        calendar_channel.guild, guild_config.google_calendar_sync_react_emoji_name
     )
     google_calendar_sync_react_section = (
         "To enable automatic syncing of events to Google Calendar, react with"
         f" {google_calendar_sync_react_emoji}."
     )
 
-    message_content = (
-        f"{intro_section}\n\n**Moobloom Event"
-        f" Calendar:**\n\n{months_sections}\n\n*{all_events_react_section}*\n\n*{google_calendar_sync_react_section}*"
+    header_content = (
+        f"{intro_section}\n\n*{all_events_react_section}*\n\n*{google_calendar_sync_react_section}*"
+        "\n\n**Moobloom Event Calendar:**"
     )
 
-    calendar_message = await get_calendar_message(client, calendar_channel)
+    # the calendar's messages are tracked by ID, the calendar channel may hold other messages
+    with Session() as session:
+        calendar_messages = get_calendar_messages(session, guild_config.guild_id)
+    calendar_message: Message | None = None
+    if calendar_messages:
+        with suppress(discord.NotFound):
+            calendar_message = await calendar_channel.fetch_message(calendar_messages[0].message_id)
+    else:
+        calendar_message = await _find_legacy_calendar_message(client, calendar_channel)
+
+    edited = 0
+    old_pages = calendar_messages[1:]
     if calendar_message is None:
-        _logger.info("Calendar message not found, sending new calendar")
-        calendar_message = await calendar_channel.send(content=message_content)
-        await calendar_message.add_reaction(google_calendar_sync_react_emoji)
-    elif message_content != calendar_message.content:
-        _logger.info("Updating calendar message")
-        await calendar_message.edit(content=message_content)
+        # the header was deleted, send the calendar anew after deleting its remaining pages
+        _, deleted = await sync_calendar_pages(calendar_channel, old_pages, {})
+        old_pages = []
+        calendar_message = await calendar_channel.send(content=header_content)
+        edited += deleted + 1
+    elif calendar_message.content != header_content:
+        calendar_message = await calendar_message.edit(content=header_content)
+        edited += 1
+    # e.g. a new event costs a single edit of its month's page
+    new_pages, edited_pages = await sync_calendar_pages(calendar_channel, old_pages, pages)
+    edited += edited_pages
+
+    new_calendar_messages = [
+        CalendarMessage(
+            CALENDAR_HEADER_KEY, calendar_message.id, _hash_calendar_content(header_content)
+        ),
+        *new_pages,
+    ]
+    if new_calendar_messages != calendar_messages:
+        with Session() as session:
+            set_calendar_messages(session, guild_config.guild_id, new_calendar_messages)
+    if edited:
+        _logger.info(f"Made {edited} requests to update {len(pages) + 1} calendar messages")
     else:
-        _logger.info("Calendar message is up to date, doing nothing")
+        _logger.info("Calendar messages are up to date, doing nothing")
 
     await add_reaction_if_missing(calendar_message, all_events_react_emoji)
     await add_reaction_if_missing(calendar_message, google_calendar_sync_react_emoji)
@@ -334,58 +539,77 @@ async def add_reaction_if_missing(message: Message, emoji: Emoji) -> None:
     await message.add_reaction(emoji)
 
 
-async def create_event_channel(client: discord.Client, event: MoobloomEvent) -> None:
+@discord_operation
+async def create_event_channel(
+    client: discord.Client, guild_config: GuildConfigSnapshot, event: EventSnapshot
+) -> None:
     if event.channel_name is None:
         raise ValueError(f"Event {event.name} has no channel name")
 
-    guild = get_announcement_channel(client).guild
-    category = get(guild.categories, name=settings.active_events_category_name)
+    guild = get_announcement_channel(client, guild_config).guild
+    category = get(guild.categories, name=guild_config.active_events_category_name)
     if category is None:
-        raise ValueError(f"category {settings.active_events_category_name} not found")
-    all_events_role = get(guild.roles, name=settings.all_events_role_name)
+        raise ValueError(f"category {guild_config.active_events_category_name} not found")
+    all_events_role = get(guild.roles, name=guild_config.all_events_role_name)
     if all_events_role is None:
-        raise ValueError(f"role {settings.all_events_role_name} not found")
+        raise ValueError(f"role {guild_config.all_events_role_name} not found")
 
-    overwrites = {
+    # everyone who already RSVP'd is added as part of creating the channel
+    attendee_ids = _get_attendee_ids(event)
+    attendees = await get_members(guild, attendee_ids)
+    overwrites: dict[Role | Member, PermissionOverwrite] = {
         guild.default_role: PermissionOverwrite(read_messages=False),
         all_events_role: PermissionOverwrite(read_messages=True),
     }
+    overwrites.update({member: PermissionOverwrite(read_messages=True) for member in attendees})
     channel = await guild.create_text_channel(
         name=event.channel_name,
         category=category,
         overwrites=overwrites,  # type: ignore
     )
     with Session() as session:
-        session.add(event)
-        event.channel_id = str(channel.id)
-        session.commit()
-        _logger.info(f"Created channel {event.channel_name} for event {event.name}")
+        update_event_by_id(session, event.id, {"channel_id": channel.id})
+        # RSVPs handled while the channel was being created couldn't add anyone to it
+        latest_event = get_event_snapshot(session, event.id)
+    _logger.info(
+        f"Created channel {event.channel_name} for event {event.name} with"
+        f" {len(attendees)} attendees"
+    )
 
-        for rsvp in event.rsvps:
-            member = await guild.fetch_member(int(rsvp.user_id))
-            await channel.set_permissions(member, overwrite=PermissionOverwrite(read_messages=True))
-            _logger.info(f"Added {member.name} to event channel {channel.name}")
+    if latest_event is not None and (late_ids := _get_attendee_ids(latest_event) - attendee_ids):
+        late_attendees = await get_members(guild, late_ids)
+        await grant_channel_access(channel, late_attendees)
+        _logger.info(f"Added {len(late_attendees)} late attendees to event channel {channel.name}")
 
 
-async def add_calendar_reaction_handler(bot: DiscordBot) -> None:
-    calendar_channel = get_calendar_channel(bot.client)
-    calendar_message = await get_calendar_message(bot.client, calendar_channel)
+def _get_attendee_ids(event: EventSnapshot) -> set[int]:
+    return {
+        rsvp.user_id
+        for rsvp in event.rsvps
+        if rsvp.attendance_type != MoobloomEventAttendanceType.NO
+    }
+
+
+async def add_calendar_reaction_handler(bot: DiscordBot, guild_config: GuildConfigSnapshot) -> None:
+    calendar_channel = get_calendar_channel(bot.client, guild_config)
+    with Session() as session:
+        calendar_messages = get_calendar_messages(session, guild_config.guild_id)
     all_events_react_emoji = await get_custom_emoji_by_name(
-        bot.client, settings.get_all_event_channels_react_emoji_name
+        calendar_channel.guild, guild_config.get_all_event_channels_react_emoji_name
     )
     google_calendar_sync_react_emoji = await get_custom_emoji_by_name(
-        bot.client, settings.google_calendar_sync_react_emoji_name
+        calendar_channel.guild, guild_config.google_calendar_sync_react_emoji_name
     )
 
-    if calendar_message is None:
+    if not calendar_messages:
         raise ValueError("calendar message not yet sent")
 
     async def handle_all_events_react(
         action: ReactionAction, emoji: PartialEmoji, user: Member
     ) -> None:
-        role = get(user.guild.roles, name=settings.all_events_role_name)
+        role = get(user.guild.roles, name=guild_config.all_events_role_name)
         if role is None:
-            raise ValueError(f"role {settings.all_events_role_name} not found")
+            raise ValueError(f"role {guild_config.all_events_role_name} not found")
         if action == action.ADDED:
             _logger.info(f"Adding all events role to user {user.name}")
             await user.add_roles(role)  # type: ignore
@@ -425,16 +649,16 @@ async def add_calendar_reaction_handler(bot: DiscordBot) -> None:
         elif emoji == google_calendar_sync_react_emoji:
             await handle_google_calendar_sync_react(action, emoji, user)
 
-    bot.reaction_handlers[calendar_message.id] = on_calendar_message_reaction
+    bot.reaction_handlers[calendar_messages[0].message_id] = on_calendar_message_reaction
     _logger.info("Registered reaction handler for calendar message")
 
 
 def update_rsvp(rsvp_type: MoobloomEventAttendanceType, user_id: int, event_id: int) -> None:
-    with Session() as session:
+    with WriteSession() as session:
         existing_rsvp: MoobloomEventRSVP | None = (
             session.query(MoobloomEventRSVP)
             .filter(MoobloomEventRSVP.event_id == event_id)
-            .filter(MoobloomEventRSVP.user_id == str(user_id))
+            .filter(MoobloomEventRSVP.user_id == user_id)
             .first()
         )
         if existing_rsvp is not None:
@@ -447,22 +671,38 @@ def update_rsvp(rsvp_type: MoobloomEventAttendanceType, user_id: int, event_id:
         session.commit()
 
 
-def remove_rsvp(rsvp_type: MoobloomEventAttendanceType, user_id: int, event_id: int) -> None:
-    with Session() as session:
+def remove_rsvp(rsvp_type: MoobloomEventAttendanceType, user_id: int, event_id: int) -> bool:
+    """
+    Remove the user's RSVP of the given type, returning whether they still attend the event.
+    """
+    with WriteSession() as session:
         existing_rsvp: MoobloomEventRSVP | None = (
             session.query(MoobloomEventRSVP)
             .filter(MoobloomEventRSVP.event_id == event_id)
-            .filter(MoobloomEventRSVP.user_id == str(user_id))
+            .filter(MoobloomEventRSVP.user_id == user_id)
             .filter(MoobloomEventRSVP.attendance_type == rsvp_type)
             .first()
         )
         if existing_rsvp is not None:
             session.delete(existing_rsvp)
-            session.commit()
+        # checked in the same transaction, if you change your RSVP from "yes" to "maybe", you
+        # don't want to be removed from the channel
+        still_attending = (
+            session.query(MoobloomEventRSVP)
+            .filter(MoobloomEventRSVP.event_id == event_id)
+            .filter(MoobloomEventRSVP.user_id == user_id)
+            .filter(MoobloomEventRSVP.attendance_type != MoobloomEventAttendanceType.NO)
+            .first()
+            is not None
+        )
+        session.commit()
+    return still_attending
 
 
-def add_event_reaction_handler(bot: DiscordBot, event: MoobloomEvent) -> None:
-    announcement_channel = get_announcement_channel(bot.client)
+def add_event_reaction_handler(
+    bot: DiscordBot, guild_config: GuildConfigSnapshot, event: EventSnapshot
+) -> None:
+    announcement_channel = get_announcement_channel(bot.client, guild_config)
     event_id = event.id
 
     async def on_event_message_reaction(
@@ -480,14 +720,35 @@ def add_event_reaction_handler(bot: DiscordBot, event: MoobloomEvent) -> None:
             return
 
         rsvp_type = MoobloomEventAttendanceType.from_rsvp_react_emoji(emoji.name)
-        await handle_rsvp(bot.client, announcement_channel, event_id, action, rsvp_type, user)
+
+        async def apply_rsvp(
+            action: ReactionAction, rsvp_type: MoobloomEventAttendanceType
+        ) -> None:
+            # the event's intro message is updated once per processed batch by the queue
+            await bot.rsvp_queues.submit(
+                event_id,
+                lambda: handle_rsvp(
+                    bot.client,
+                    announcement_channel,
+                    event_id,
+                    action,
+                    rsvp_type,
+                    user,
+                    debouncer=bot.rsvp_debouncer,
+                    update_introduction=False,
+                ),
+            )
+
+        bot.rsvp_debouncer.submit(user.id, announcement_message_id, action, rsvp_type, apply_rsvp)
 
     if event.announcement_message_id is None:
         raise ValueError(f"Event {event.name} not yet announced!")
-    bot.reaction_handlers[int(event.announcement_message_id)] = on_event_message_reaction
+    announcement_message_id = event.announcement_message_id
+    bot.reaction_handlers[event.announcement_message_id] = on_event_message_reaction
     _logger.info(f"Registered reaction handler for event {event.name}")
 
 
+@discord_operation
 async def handle_rsvp(
     client: discord.Client,
     announcement_channel: TextChannel,
@@ -495,22 +756,24 @@ async def handle_rsvp(
     action: ReactionAction,
     rsvp_type: MoobloomEventAttendanceType,
     user: Member,
+    debouncer: RSVPDebouncer | None = None,
+    update_introduction: bool = True,
 ) -> None:
-    with Session() as session:
-        event = (
-            session.query(MoobloomEvent)
-            .filter(MoobloomEvent.id == event_id)
-            .options(joinedload(MoobloomEvent.rsvps))
-            .one()
-        )
+    with metrics.RSVP_SECONDS.time(action=action.value):
+        # the session isn't kept open across the awaits below, on SQLite it would pin a snapshot
+        # that doesn't see the RSVP changes written by `update_rsvp` and `remove_rsvp`
+        with Session() as session:
+            event = get_event_snapshot(session, event_id, include_rsvps=False)
+        if event is None:
+            raise ValueError(f"Event {event_id} not found")
 
         channel: GuildChannel | None = None
         if event.create_channel and event.channel_id is not None:
-            channel = announcement_channel.guild.get_channel(int(event.channel_id))
+            channel = announcement_channel.guild.get_channel(event.channel_id)
             if channel is None:
                 raise ValueError(f"Channel {event.channel_id} for event {event.name} not found")
         elif event.create_channel:
-            _logger.warn(f"Channel for event {event.name} not yet created")
+            _logger.warning(f"Channel for event {event.name} not yet created")
 
         if action == action.ADDED:
             _logger.info(f"Updating RSVP to {rsvp_type} to {event.name} for user {user.name}")
@@ -524,26 +787,25 @@ async def handle_rsvp(
             # sync to gcalendar if necessary
             handle_google_calendar_sync_on_rsvp(client, user, event, rsvp_type)
             # remove reactions from other rsvp types
-            message = await announcement_channel.fetch_message(int(event.announcement_message_id))  # type: ignore
+            message = await announcement_channel.fetch_message(event.announcement_message_id)  # type: ignore
             if message is None:
                 raise ValueError(f"announcement message {event.announcement_message_id} not found")
+            reactions = {str(reaction.emoji): reaction for reaction in message.reactions}
             for other_rsvp_type in MoobloomEventAttendanceType:
-                if other_rsvp_type == rsvp_type:
+                reaction = reactions.get(other_rsvp_type.rsvp_react_emoji)
+                if (
+                    other_rsvp_type == rsvp_type
+                    or reaction is None
+                    or not await has_reacted(reaction, user)
+                ):
                     continue
-                await message.remove_reaction(other_rsvp_type.rsvp_react_emoji, user)  # type: ignore
+                # the resulting REMOVED event is ours, not the user's
+                if debouncer is not None:
+                    debouncer.expect_removal(user.id, message.id, other_rsvp_type)
+                await message.remove_reaction(reaction.emoji, user)
         elif action == action.REMOVED:
             _logger.info(f"Removing RSVP {rsvp_type} to {event.name} for user {user.name}")
-            remove_rsvp(rsvp_type, user.id, event.id)  # type: ignore
-            # avoid a race condition
-            # if you change your RSVP from "yes" to "maybe", you don't want to be removed from the channel
-            if (
-                session.query(MoobloomEventRSVP)
-                .filter(MoobloomEventRSVP.event_id == event.id)
-                .filter(MoobloomEventRSVP.user_id == str(user.id))
-                .filter(MoobloomEventRSVP.attendance_type != MoobloomEventAttendanceType.NO)
-                .first()
-                is None
-            ):
+            if not remove_rsvp(rsvp_type, user.id, event.id):
                 if channel is not None:
                     _logger.info(f"Removing {user.name} from event channel {channel.name}")
                     await channel.set_permissions(user, overwrite=None)
@@ -553,21 +815,22 @@ async def handle_rsvp(
                 )
 
         # update list of RSVPs in private event channel intro message
-        if event.channel_introduction_message_id is not None:
-            session.refresh(event)  # update rsvps relationship attr
-            await update_event_channel_introduction(client, event)
+        if update_introduction:
+            await update_event_channel_introduction_by_id(client, event_id)
 
 
 def handle_google_calendar_sync_on_rsvp(
     client: discord.Client,
     user: Member | User,
-    event: MoobloomEvent,
+    event: EventSnapshot,
     rsvp_type: MoobloomEventAttendanceType,
 ) -> None:
     with Session() as session:
         if (google_api_user := get_api_user_by_user_id(session, user.id)) is None:
             return
 
+    from google.auth.exceptions import RefreshError
+
     _logger.debug(
         f"Handling Google calendar sync for user {user.name}'s RSVP {rsvp_type} to {event.name}"
     )
@@ -588,7 +851,7 @@ def handle_google_calendar_sync_on_rsvp(
 
         try:
             add_or_update_event(calendar_service, calendar_id, event, rsvp_type)
-        except google.auth.exceptions.RefreshError:
+        except RefreshError:
             _logger.exception(
                 f"Auth error while handling calendar sync for {user.name}. Removing user."
             )
@@ -609,19 +872,13 @@ def handle_google_calendar_sync_on_rsvp(
 
 
 def complete_unfinished_google_calendar_setups(bot: DiscordBot) -> None:
+    # read everything upfront, the session mustn't stay open while syncing to Google and DMing
+    # users, and the setup is then marked as finished in a write transaction of its own
+    users_with_unfinished_setup: list[
+        tuple[int, int, list[tuple[EventSnapshot, MoobloomEventAttendanceType]]]
+    ] = []
     with Session() as session:
-        users_with_unfinished_setup = get_api_users_by_setup_finished(session, False)
-
-        if not users_with_unfinished_setup:
-            return
-
-        for api_user in users_with_unfinished_setup:
-            discord_user_future = run_coroutine_threadsafe(
-                bot.client.fetch_user(int(api_user.user_id)), bot.client.loop
-            )
-            discord_user = discord_user_future.result()
-            _logger.info(f"Completing Google Calendar sync setup for user {discord_user.name}")
-
+        for api_user in get_api_users_by_setup_finished(session, False):
             rsvps: list[MoobloomEventRSVP] = (
                 session.query(MoobloomEventRSVP)
                 .join(MoobloomEventRSVP.event)
@@ -631,58 +888,111 @@ def complete_unfinished_google_calendar_setups(bot: DiscordBot) -> None:
                 .order_by(MoobloomEvent.start_date)
                 .all()
             )
-            _logger.info(f"Adding Google Calendar events for {len(rsvps)} existing RSVPs")
-            for rsvp in rsvps:
-                event = rsvp.event
-                handle_google_calendar_sync_on_rsvp(
-                    bot.client,
-                    discord_user,
-                    event,
-                    MoobloomEventAttendanceType(rsvp.attendance_type),
+            users_with_unfinished_setup.append(
+                (
+                    api_user.id,
+                    api_user.user_id,
+                    [
+                        (
+                            EventSnapshot.from_model(rsvp.event, include_rsvps=False),
+                            rsvp.attendance_type,
+                        )
+                        for rsvp in rsvps
+                    ],
                 )
+            )
 
-            api_user.setup_finished = True
+    for api_user_id, user_id, rsvp_snapshots in users_with_unfinished_setup:
+        discord_user_future = run_coroutine_threadsafe(
+            bot.client.fetch_user(user_id), bot.client.loop
+        )
+        discord_user = discord_user_future.result()
+        _logger.info(f"Completing Google Calendar sync setup for user {discord_user.name}")
+
+        _logger.info(f"Adding Google Calendar events for {len(rsvp_snapshots)} existing RSVPs")
+        for event, attendance_type in rsvp_snapshots:
+            handle_google_calendar_sync_on_rsvp(bot.client, discord_user, event, attendance_type)
+
+        with WriteSession() as session:
+            session.query(GoogleApiUser).filter(GoogleApiUser.id == api_user_id).update(
+                {GoogleApiUser.setup_finished: True}
+            )
             session.commit()
 
-            run_coroutine_threadsafe(
-                discord_user.send(GOOGLE_CALENDAR_SYNC_SETUP_COMPLETE_DM), bot.client.loop
-            ).result()
-            _logger.info(f"Done Google Calendar sync setup for user {discord_user.name}")
+        run_coroutine_threadsafe(
+            discord_user.send(GOOGLE_CALENDAR_SYNC_SETUP_COMPLETE_DM), bot.client.loop
+        ).result()
+        _logger.info(f"Done Google Calendar sync setup for user {discord_user.name}")
+
+
+@discord_operation
+async def add_reaction_handlers(bot: DiscordBot, guild_config: GuildConfigSnapshot) -> None:
+    await add_calendar_reaction_handler(bot, guild_config)
+
+    with Session() as session:
+        events = get_event_snapshots(
+            session,
+            MoobloomEvent.guild_id == guild_config.guild_id,
+            MoobloomEvent.deleted == False,
+        )
 
+    for event in events:
+        add_event_reaction_handler(bot, guild_config, event)
 
-async def add_reaction_handlers(bot: DiscordBot) -> None:
-    await add_calendar_reaction_handler(bot)
 
+@discord_operation
+async def archive_ended_events(bot: DiscordBot) -> None:
+    ended_before = date.today() - timedelta(days=settings.event_archive_retention_days)
+    # every shard process runs this job, each archiving only the events of its own guilds
+    guild_ids = [guild.id for guild in bot.client.guilds] if settings.discord_sharded else None
     with Session() as session:
-        for event in session.query(MoobloomEvent).filter(MoobloomEvent.deleted == False).all():
-            add_event_reaction_handler(bot, event)
+        archived_events = archive_events_ended_before(
+            session,
+            ended_before,
+            batch_size=settings.event_archive_batch_size,
+            guild_ids=guild_ids,
+        )
+
+    for archived_event in archived_events:
+        # archived events no longer accept RSVPs
+        if archived_event.announcement_message_id is not None:
+            bot.reaction_handlers.pop(archived_event.announcement_message_id, None)
+        forget_event_channel_introduction(archived_event.channel_introduction_message_id)
+    if archived_events:
+        _logger.info(f"Archived {len(archived_events)} ended events")
 
 
-async def delete_event_announcement(client: discord.Client, event: MoobloomEvent) -> None:
+async def delete_event_announcement(
+    client: discord.Client, guild_config: GuildConfigSnapshot, event: EventSnapshot
+) -> None:
     if not event.announcement_message_id:
         return
 
-    announcement_channel = get_announcement_channel(client)
+    announcement_channel = get_announcement_channel(client, guild_config)
 
-    message = await announcement_channel.fetch_message(int(event.announcement_message_id))
+    message = await announcement_channel.fetch_message(event.announcement_message_id)
     await message.delete()
 
 
-async def send_event_channel_introductions(client: discord.Client) -> None:
-    with Session(expire_on_commit=False) as session:
-        events: list[MoobloomEvent] = (
-            session.query(MoobloomEvent)
-            .filter(MoobloomEvent.channel_id != None)
-            .filter(MoobloomEvent.channel_introduction_message_id == None)
-            .options(joinedload(MoobloomEvent.rsvps))
-            .all()
+@discord_operation
+async def send_event_channel_introductions(
+    client: discord.Client, guild_config: GuildConfigSnapshot
+) -> None:
+    with Session() as session:
+        events = get_event_snapshots(
+            session,
+            MoobloomEvent.guild_id == guild_config.guild_id,
+            MoobloomEvent.deleted == False,
+            MoobloomEvent.channel_id != None,
+            MoobloomEvent.channel_introduction_message_id == None,
+            include_rsvps=True,
         )
 
     for event in events:
         await update_event_channel_introduction(client, event)
 
 
-def get_event_channel_introduction_message_content(event: MoobloomEvent) -> str:
+def get_event_channel_introduction_message_content(event: EventSnapshot) -> str:
     if event.channel_id is None:
         raise ValueError("Event has no event channel!")
 
@@ -707,9 +1017,28 @@ def get_event_channel_introduction_message_content(event: MoobloomEvent) -> str:
     return "\n".join([intro, event_details, rsvps])
 
 
-async def update_event_channel_introduction(client: discord.Client, event: MoobloomEvent) -> None:
+async def update_event_channel_introduction_by_id(client: discord.Client, event_id: int) -> None:
+    """
+    Update the RSVPs in an event's channel introduction, if it already has one.
+    """
+    with Session() as session:
+        event = get_event_snapshot(session, event_id)
+    if event is not None and event.channel_introduction_message_id is not None:
+        await update_event_channel_introduction(client, event)
+
+
+def forget_event_channel_introduction(message_id: int | None) -> None:
+    """
+    Drop the known content of an event channel introduction, once its event is deleted or archived.
+    """
+    if message_id is not None:
+        _introduction_message_contents.pop(message_id, None)
+
+
+@discord_operation
+async def update_event_channel_introduction(client: discord.Client, event: EventSnapshot) -> None:
     # skip events without a channel or that were created before this feature was introduced
-    if event.channel_id is None or event.channel_introduction_message_id == "0":
+    if event.channel_id is None or event.channel_introduction_message_id == 0:
         return
 
     message_content = get_event_channel_introduction_message_content(event)
@@ -721,24 +1050,25 @@ async def update_event_channel_introduction(client: discord.Client, event: Moobl
         await message.pin()
 
         with Session() as session:
-            session.add(event)
-            event.channel_introduction_message_id = str(message.id)
-            session.commit()
+            update_event_by_id(session, event.id, {"channel_introduction_message_id": message.id})
+        _introduction_message_contents[message.id] = message_content
 
         return
 
-    # otherwise fetch and update the existing message
-    event_channel_introduction_message = await event_channel.fetch_message(
-        event.channel_introduction_message_id  # type: ignore
-    )
-    if event_channel_introduction_message is None:
+    # otherwise update the existing message, unless it's known to be up to date
+    message_id = event.channel_introduction_message_id
+    if _introduction_message_contents.get(message_id) == message_content:
+        _logger.info("Event channel introduction message is up to date, doing nothing")
+        metrics.CACHE_REQUESTS.inc(cache="introduction", result="hit")
+        return
+    metrics.CACHE_REQUESTS.inc(cache="introduction", result="miss")
+    _logger.info("Updating event channel introduction message")
+    try:
+        await event_channel.get_partial_message(message_id).edit(content=message_content)
+    except discord.NotFound:
         _logger.info(
             f"Failed to update event channel introduction message for {event.name} ({event.id}):"
             + "event channel introduction message not found"
         )
         return
-    if message_content == event_channel_introduction_message.content:
-        _logger.info("Event channel introduction message is up to date, doing nothing")
-        return
-    _logger.info("Updating event channel introduction message")
-    await event_channel_introduction_message.edit(content=message_content)
+    _introduction_message_contents[message_id] = message_content
@@ -1,22 +1,34 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 
-from moobot.fastapi.routers import google_oauth, health
+from moobot.db.session import init_db
+from moobot.fastapi.routers import events, google_oauth, health, metrics
 from moobot.settings import get_settings
 
 settings = get_settings()
 
 ROUTERS = [
     health.router,
+    metrics.router,
     google_oauth.router,
+    events.router,
 ]
 
 
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    init_db()
+    yield
+
+
 def create_app() -> FastAPI:
     """
     Perform application setup tasks and create FastAPI app instance.
     """
-    app = FastAPI(openapi_url=None)
+    app = FastAPI(openapi_url=None, lifespan=lifespan)
     app.mount("/static", StaticFiles(directory="static"), name="static")
 
     for router in ROUTERS:
@@ -0,0 +1,102 @@
+import io
+import secrets
+from collections.abc import Iterator
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, UploadFile, status
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy.orm import Session
+
+from moobot.bulk import (
+    EventFileFormat,
+    export_events_csv,
+    export_events_ics,
+    export_rsvps_csv,
+    import_events,
+    parse_events,
+)
+from moobot.db.session import Session as SessionMaker
+from moobot.db.session import get_session
+from moobot.settings import get_settings
+
+settings = get_settings()
+
+_bearer = HTTPBearer(auto_error=False)
+
+
+def require_admin_token(
+    credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(_bearer)],
+) -> None:
+    if settings.admin_api_token is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    if credentials is None or not secrets.compare_digest(
+        credentials.credentials, settings.admin_api_token
+    ):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+
+
+router = APIRouter(prefix="/events", dependencies=[Depends(require_admin_token)])
+
+MEDIA_TYPES = {
+    EventFileFormat.CSV: "text/csv",
+    EventFileFormat.ICS: "text/calendar",
+}
+
+
+@router.post("/import")
+def post_import_events(
+    request: Request,
+    file: UploadFile,
+    guild_id: int,
+    session: Annotated[Session, Depends(get_session)],
+    file_format: Annotated[EventFileFormat, Query(alias="format")] = EventFileFormat.CSV,
+) -> dict[str, int | bool]:
+    """
+    Import events into a guild.
+
+    When the API runs inside the bot's process, the bot announces the imported events right away
+    ("refresh_requested" is true). Otherwise they're announced by the bot's next periodic refresh,
+    within 5 minutes.
+    """
+    lines = io.TextIOWrapper(file.file, encoding="utf-8", newline="")
+    try:
+        imported = import_events(session, parse_events(lines, file_format), guild_id=guild_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+
+    on_events_imported = getattr(request.app.state, "on_events_imported", None)
+    if not imported or on_events_imported is None:
+        return {"imported": imported, "refresh_requested": False}
+    on_events_imported(guild_id)
+    return {"imported": imported, "refresh_requested": True}
+
+
+@router.get("/export")
+def get_export_events(
+    guild_id: int,
+    file_format: Annotated[EventFileFormat, Query(alias="format")] = EventFileFormat.CSV,
+    rsvps: bool = False,
+    include_deleted: bool = False,
+) -> StreamingResponse:
+    if rsvps and file_format != EventFileFormat.CSV:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="RSVPs can only be exported as CSV"
+        )
+
+    def stream() -> Iterator[str]:
+        # the session must outlive the request handler, so it can't come from a dependency
+        with SessionMaker() as session:
+            if rsvps:
+                yield from export_rsvps_csv(session, guild_id, include_deleted=include_deleted)
+            elif file_format == EventFileFormat.ICS:
+                yield from export_events_ics(session, guild_id, include_deleted=include_deleted)
+            else:
+                yield from export_events_csv(session, guild_id, include_deleted=include_deleted)
+
+    filename = f"{'rsvps' if rsvps else 'events'}.{file_format.value}"
+    return StreamingResponse(
+        stream(),
+        media_type=MEDIA_TYPES[file_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -32,7 +32,7 @@ def handle_oauth_response(
             {"request": request, "message": "❌ Invalid authorization state. Please try again."},
         )
 
-    user_id = int(auth_session.user_id)
+    user_id = auth_session.user_id
     session.delete(auth_session)
 
     credentials = fetch_credentials(code)
@@ -45,6 +45,13 @@ def handle_oauth_response(
         scopes=credentials.scopes,
         commit=True,
     )
+    # when running inside the bot's process, the bot finishes the setup right away instead of on
+    # its next poll of the database
+    on_google_calendar_authorized = getattr(
+        request.app.state, "on_google_calendar_authorized", None
+    )
+    if on_google_calendar_authorized is not None:
+        on_google_calendar_authorized(user_id)
 
     return templates.TemplateResponse(
         "google_oauth.html", {"request": request, "message": "✅ Success!"}
@@ -1,9 +1,104 @@
-from fastapi import APIRouter, Response, status
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Annotated, Any
+
+from fastapi import APIRouter, Depends, Response, status
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from moobot.db.crud.status import count_pending_google_calendar_setups, get_bot_statuses
+from moobot.db.session import get_session
+from moobot.settings import get_settings
+
+settings = get_settings()
 
 router = APIRouter(prefix="/health")
 
+# (monotonic time, status code, body) of the last readiness check
+_readiness_cache: tuple[float, int, dict[str, Any]] | None = None
+_readiness_lock = threading.Lock()
+
+
+@dataclass
+class ReadinessCheck:
+    # None if the metric couldn't be measured, which fails the check
+    value: float | None
+    threshold: float
+
+    @property
+    def ok(self) -> bool:
+        return self.value is not None and self.value <= self.threshold
+
 
 @router.get("")
 @router.head("")
 def get_health() -> Response:
     return Response(status_code=status.HTTP_200_OK)
+
+
+@router.get("/ready")
+def get_readiness(session: Annotated[Session, Depends(get_session)]) -> JSONResponse:
+    """
+    Report whether the bot is healthy enough to serve, failing with 503 on degradation.
+    """
+    global _readiness_cache
+    with _readiness_lock:
+        now = time.monotonic()
+        if _readiness_cache is None or now - _readiness_cache[0] > settings.readiness_cache_seconds:
+            checks = check_readiness(session)
+            ready = all(check.ok for check in checks.values())
+            body = {
+                "ready": ready,
+                "checks": {
+                    name: {"value": check.value, "threshold": check.threshold, "ok": check.ok}
+                    for name, check in checks.items()
+                },
+            }
+            status_code = status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE
+            _readiness_cache = (now, status_code, body)
+        _cached_at, status_code, body = _readiness_cache
+    return JSONResponse(body, status_code=status_code)
+
+
+def check_readiness(session: Session) -> dict[str, ReadinessCheck]:
+    checks = {
+        "db_checkout_seconds": ReadinessCheck(None, settings.readiness_max_db_checkout_seconds),
+        "bot_status_age_seconds": ReadinessCheck(None, settings.readiness_max_status_age_seconds),
+        "gateway_latency_seconds": ReadinessCheck(
+            None, settings.readiness_max_gateway_latency_seconds
+        ),
+        "reconcile_age_seconds": ReadinessCheck(None, settings.readiness_max_reconcile_age_seconds),
+        "scheduler_lag_seconds": ReadinessCheck(None, settings.readiness_max_scheduler_lag_seconds),
+        "pending_google_setups": ReadinessCheck(None, settings.readiness_max_pending_google_setups),
+    }
+
+    start = time.perf_counter()
+    try:
+        session.execute(text("SELECT 1"))
+        checks["db_checkout_seconds"].value = time.perf_counter() - start
+        bot_statuses = get_bot_statuses(session)
+        checks["pending_google_setups"].value = count_pending_google_calendar_setups(session)
+    except SQLAlchemyError:
+        # everything else is read from the database
+        return checks
+    if not bot_statuses:
+        return checks
+
+    # with several bot processes, the worst one decides
+    now = datetime.now()
+    checks["bot_status_age_seconds"].value = max(
+        (now - s.reported_at).total_seconds() for s in bot_statuses
+    )
+    latencies = [s.gateway_latency_seconds for s in bot_statuses if s.connected]
+    if len(latencies) == len(bot_statuses) and None not in latencies:
+        checks["gateway_latency_seconds"].value = max(latencies)  # type: ignore
+    # before the first reconciliation, time since starting counts
+    checks["reconcile_age_seconds"].value = max(
+        (now - (s.last_reconciled_at or s.started_at)).total_seconds() for s in bot_statuses
+    )
+    checks["scheduler_lag_seconds"].value = max(s.scheduler_lag_seconds for s in bot_statuses)
+    return checks
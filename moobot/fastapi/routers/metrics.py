@@ -0,0 +1,29 @@
+from datetime import datetime, timedelta
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy.orm import Session
+
+from moobot import metrics
+from moobot.db.crud.status import get_metrics_snapshots
+from moobot.db.session import get_session
+from moobot.settings import get_settings
+
+settings = get_settings()
+
+router = APIRouter(prefix="/metrics")
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("")
+def get_metrics(session: Annotated[Session, Depends(get_session)]) -> Response:
+    """
+    Export this process's metrics and those recently reported by bot processes.
+    """
+    sources = {metrics.process_name: metrics.registry.collect()}
+    reported_after = datetime.now() - timedelta(seconds=settings.readiness_max_status_age_seconds)
+    for snapshot in get_metrics_snapshots(session, reported_after):
+        # when serving the API from the bot process, its own snapshot is older than the registry
+        sources.setdefault(snapshot.source, snapshot.families)
+    return Response(metrics.render(metrics.merge_families(sources)), media_type=CONTENT_TYPE)
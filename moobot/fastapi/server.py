@@ -0,0 +1,34 @@
+"""
+Runs the API inside the bot's process and event loop, see `python -m moobot.main --with-api`.
+
+Both then share one database engine, the settings and in-memory state, and API routes can hand
+work to the bot directly instead of through the database.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+import uvicorn
+
+from moobot.fastapi.app import app
+from moobot.settings import get_settings
+
+if TYPE_CHECKING:
+    from moobot.discord.discord_bot import DiscordBot
+
+settings = get_settings()
+
+
+def create_server(bot: DiscordBot) -> uvicorn.Server:
+    app.state.on_google_calendar_authorized = lambda _user_id: (
+        bot.complete_google_calendar_setups_now()
+    )
+    # called from the threads that run synchronous routes
+    app.state.on_events_imported = lambda guild_id: asyncio.run_coroutine_threadsafe(
+        bot.request_events_refresh(guild_id), bot.client.loop
+    )
+    return uvicorn.Server(
+        uvicorn.Config(app, host=settings.api_host, port=settings.api_port, lifespan="on")
+    )
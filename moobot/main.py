@@ -1,10 +1,19 @@
+import argparse
 import asyncio
 
 from moobot.discord import discord_bot
 
 
-def main() -> None:
-    asyncio.run(discord_bot.start())
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m moobot.main")
+    parser.add_argument(
+        "--with-api",
+        action="store_true",
+        help="Also serve the API from this process, sharing the bot's event loop",
+    )
+    args = parser.parse_args(argv)
+
+    asyncio.run(discord_bot.start(with_api=args.with_api))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,245 @@
+"""
+A minimal Prometheus metrics registry.
+
+Metrics are collected into plain, JSON-serializable samples, so that the bot process can store
+them in the database for the API process to export on /metrics alongside its own.
+"""
+
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from typing import Any, TypedDict
+
+# upper bounds of the default histogram buckets, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelValues = tuple[str, ...]
+
+
+class Sample(TypedDict):
+    name: str
+    labels: dict[str, str]
+    value: float
+
+
+class Family(TypedDict):
+    name: str
+    type: str
+    help: str
+    samples: list[Sample]
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _label_values(self, labels: dict[str, Any]) -> LabelValues:
+        if labels.keys() != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, values: LabelValues, **extra: str) -> dict[str, str]:
+        return {**dict(zip(self.labelnames, values)), **extra}
+
+    def collect(self) -> Family:
+        return {"name": self.name, "type": self.type, "help": self.help, "samples": self._samples()}
+
+    def _samples(self) -> list[Sample]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()) -> None:
+        super().__init__(name, help, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _samples(self) -> list[Sample]:
+        with self._lock:
+            values = list(self._values.items())
+        return [
+            {"name": f"{self.name}_total", "labels": self._labels(key), "value": value}
+            for key, value in values
+        ]
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> (counts per bucket plus +Inf, sum)
+        self._values: dict[LabelValues, tuple[list[int], float]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            counts, total = self._values.get(key) or ([0] * (len(self.buckets) + 1), 0.0)
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._values[key] = (counts, total + value)
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        """
+        Observe the duration of the block, including when it raises.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _samples(self) -> list[Sample]:
+        with self._lock:
+            values = [(key, list(counts), total) for key, (counts, total) in self._values.items()]
+
+        samples: list[Sample] = []
+        for key, counts, total in values:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                samples.append(
+                    {
+                        "name": f"{self.name}_bucket",
+                        "labels": self._labels(key, le=str(bound)),
+                        "value": cumulative,
+                    }
+                )
+            samples.append(
+                {"name": f"{self.name}_sum", "labels": self._labels(key), "value": total}
+            )
+            samples.append(
+                {"name": f"{self.name}_count", "labels": self._labels(key), "value": cumulative}
+            )
+        return samples
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))  # type: ignore
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))  # type: ignore
+
+    def collect(self) -> list[Family]:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return [metric.collect() for metric in metrics]
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+
+def merge_families(sources: dict[str, list[Family]]) -> list[Family]:
+    """
+    Merge the families collected by several processes, labelling samples by process name.
+    """
+    merged: dict[str, Family] = {}
+    for process, families in sources.items():
+        for family in families:
+            target = merged.setdefault(family["name"], {**family, "samples": []})
+            target["samples"].extend(
+                {**sample, "labels": {**sample["labels"], "process": process}}
+                for sample in family["samples"]
+            )
+    return list(merged.values())
+
+
+def render(families: Iterable[Family]) -> str:
+    """
+    Render families in the Prometheus text exposition format.
+    """
+    lines: list[str] = []
+    for family in families:
+        lines.append(f"# HELP {family['name']} {_escape(family['help'])}")
+        lines.append(f"# TYPE {family['name']} {family['type']}")
+        for sample in family["samples"]:
+            labels = ",".join(
+                f'{k}="{_escape(v, quote=True)}"' for k, v in sample["labels"].items()
+            )
+            lines.append(f"{sample['name']}{{{labels}}} {_format_value(sample['value'])}")
+    return "\n".join(lines) + "\n"
+
+
+def _escape(value: str, quote: bool = False) -> str:
+    value = value.replace("\\", "\\\\").replace("\n", "\\n")
+    return value.replace('"', '\\"') if quote else value
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+registry = Registry()
+# set by the entry point, labels this process's samples
+process_name = "api"
+
+RSVP_SECONDS = registry.histogram(
+    "moobot_rsvp_handling_seconds", "Time to handle an RSVP reaction", ["action"]
+)
+INITIALIZE_EVENTS_STAGE_SECONDS = registry.histogram(
+    "moobot_initialize_events_stage_seconds",
+    "Duration of each stage of reconciling a guild's events",
+    ["stage"],
+)
+DISCORD_REQUESTS = registry.counter(
+    "moobot_discord_requests", "Discord REST requests by route and outcome", ["route", "outcome"]
+)
+DISCORD_RATE_LIMITS = registry.counter(
+    "moobot_discord_rate_limits", "Discord 429 responses by route", ["route"]
+)
+DISCORD_REQUEST_SECONDS = registry.histogram(
+    "moobot_discord_request_seconds",
+    "Discord REST request duration including rate limit waits",
+    ["route"],
+)
+GOOGLE_REQUESTS = registry.counter(
+    "moobot_google_requests",
+    "Google Calendar API requests by method and outcome",
+    ["method", "outcome"],
+)
+GOOGLE_REQUEST_SECONDS = registry.histogram(
+    "moobot_google_request_seconds", "Google Calendar API request duration", ["method"]
+)
+DB_QUERY_SECONDS = registry.histogram(
+    "moobot_db_query_seconds", "Database statement duration by statement type", ["statement"]
+)
+CACHE_REQUESTS = registry.counter(
+    "moobot_cache_requests", "Cache lookups by cache and result (hit or miss)", ["cache", "result"]
+)
@@ -1,12 +1,91 @@
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
 from functools import cache
 
+from apscheduler.events import (
+    EVENT_JOB_ERROR,
+    EVENT_JOB_EXECUTED,
+    EVENT_JOB_MAX_INSTANCES,
+    EVENT_JOB_MISSED,
+    EVENT_JOB_SUBMITTED,
+    JobEvent,
+    JobSubmissionEvent,
+)
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.schedulers.base import BaseScheduler
+
+_logger = logging.getLogger(__name__)
+
+
+@dataclass
+class JobStats:
+    runs: int = 0
+    errors: int = 0
+    skipped: int = 0  # the previous run was still going
+    missed: int = 0  # the scheduler was too busy to start the run in time
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    # how late the last run was submitted after its scheduled time
+    lag_seconds: float = 0.0
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.total_seconds / self.runs if self.runs else 0.0
+
+
+# job ID -> stats, for jobs of both schedulers
+job_stats: dict[str, JobStats] = {}
+# job ID -> monotonic time its current run was submitted at
+_submitted_at: dict[str, float] = {}
+
+
+def _track_job_event(event: JobEvent) -> None:
+    stats = job_stats.setdefault(event.job_id, JobStats())
+    if isinstance(event, JobSubmissionEvent):
+        _submitted_at[event.job_id] = time.monotonic()
+        scheduled_at = event.scheduled_run_times[-1]
+        stats.lag_seconds = max(
+            0.0, (datetime.now(scheduled_at.tzinfo) - scheduled_at).total_seconds()
+        )
+    elif event.code in (EVENT_JOB_EXECUTED, EVENT_JOB_ERROR):
+        seconds = time.monotonic() - _submitted_at.pop(event.job_id, time.monotonic())
+        stats.runs += 1
+        stats.errors += event.code == EVENT_JOB_ERROR
+        stats.total_seconds += seconds
+        stats.max_seconds = max(stats.max_seconds, seconds)
+    elif event.code == EVENT_JOB_MAX_INSTANCES:
+        stats.skipped += 1
+        _logger.warning(f"Skipped a run of job {event.job_id}, its previous run is still going")
+    elif event.code == EVENT_JOB_MISSED:
+        stats.missed += 1
+        _logger.warning(f"Missed a run of job {event.job_id}")
+
+
+def get_scheduler_lag_seconds() -> float:
+    """
+    The highest lag of the last runs of all jobs.
+    """
+    return max((stats.lag_seconds for stats in job_stats.values()), default=0.0)
+
+
+def _add_job_tracking(scheduler: BaseScheduler) -> None:
+    scheduler.add_listener(
+        _track_job_event,
+        EVENT_JOB_SUBMITTED
+        | EVENT_JOB_EXECUTED
+        | EVENT_JOB_ERROR
+        | EVENT_JOB_MAX_INSTANCES
+        | EVENT_JOB_MISSED,
+    )
 
 
 @cache
 def get_async_scheduler() -> AsyncIOScheduler:
     scheduler = AsyncIOScheduler()
+    _add_job_tracking(scheduler)
     scheduler.start()
     return scheduler
 
@@ -14,5 +93,6 @@ def get_async_scheduler() -> AsyncIOScheduler:
 @cache
 def get_threadpool_scheduler() -> BackgroundScheduler:
     scheduler = BackgroundScheduler()
+    _add_job_tracking(scheduler)
     scheduler.start()
     return scheduler
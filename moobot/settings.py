@@ -1,7 +1,13 @@
 import logging
+import threading
+from collections.abc import Callable, Iterable
+from typing import Self
 
+from pydantic import model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+_logger = logging.getLogger(__name__)
+
 
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(
@@ -18,32 +24,155 @@ class Settings(BaseSettings):
     log_format: str = "%(asctime)s [%(process)d] [%(levelname)s] %(name)-16s %(message)s"
     log_date_format: str = "%Y-%m-%d %H:%M:%S"
 
+    # full SQLAlchemy database URL, e.g. "sqlite:///data/moobot.db" for an embedded database
+    # if unset, a postgres URL is built from the postgres credentials below
+    database_url: str | None = None
+    sqlite_busy_timeout_ms: int = 5000
+
     # db credentials
     postgres_host: str = "db"
-    postgres_user: str
-    postgres_password: str
+    postgres_user: str | None = None
+    postgres_password: str | None = None
 
     discord_token: str
 
+    # discord.py cache policy: number of messages to cache (0 to disable), whether to request every
+    # guild member at startup, and whether to cache members at all. The defaults are discord.py's;
+    # to save memory on large guilds, opt in to DISCORD_MAX_MESSAGES=0 and
+    # DISCORD_CHUNK_GUILDS_AT_STARTUP=false, with which only members who interact with the bot are
+    # cached and others are requested when needed.
+    discord_max_messages: int = 1000
+    discord_chunk_guilds_at_startup: bool = True
+    discord_cache_members: bool = True
+    # use discord.AutoShardedClient, with the shard count recommended by discord if unset
+    discord_sharded: bool = False
+    discord_shard_count: int | None = None
+    # shards served by this process, e.g. [0, 1]; all shards if unset
+    discord_shard_ids: list[int] | None = None
+    # point the bot at another Discord API, e.g. the fake server in loadtest/; real Discord if unset
+    discord_api_base_url: str | None = None
+    discord_gateway_url: str | None = None
+
     # event listing config
-    calendar_channel_id: int
-    event_announce_channel_id: int
     rsvp_yes_emoji: str = "✅"
     rsvp_maybe_emoji: str = "❓"
     rsvp_no_emoji: str = "❌"
-    get_all_event_channels_react_emoji_name: str
-    google_calendar_sync_react_emoji_name: str
-    all_events_role_name: str
-    active_events_category_name: str
+
+    # each guild is configured in the guildconfig table (see the "guild configure" command)
+    # if set, these seed the configuration of the guild containing the announcement channel
+    calendar_channel_id: int | None = None
+    event_announce_channel_id: int | None = None
+    get_all_event_channels_react_emoji_name: str | None = None
+    google_calendar_sync_react_emoji_name: str | None = None
+    all_events_role_name: str | None = None
+    active_events_category_name: str | None = None
+
+    # RSVP reactions by the same user on the same event are collapsed within this window
+    rsvp_debounce_seconds: float = 1.5
+    # RSVPs are processed in order per event, with at most this many events at a time
+    rsvp_max_concurrent_events: int = 4
+    rsvp_queue_size: int = 100
+    rsvp_batch_size: int = 20
+    # event channel introductions are edited at most once per this many seconds
+    introduction_update_window_seconds: float = 10.0
+
+    # readiness: the bot reports its status this often, and /health/ready fails if a metric
+    # exceeds its threshold; responses are cached to keep probes cheap
+    bot_status_interval_seconds: int = 30
+    readiness_cache_seconds: float = 5.0
+    readiness_max_status_age_seconds: float = 120.0
+    readiness_max_gateway_latency_seconds: float = 5.0
+    readiness_max_reconcile_age_seconds: float = 900.0
+    readiness_max_db_checkout_seconds: float = 1.0
+    readiness_max_pending_google_setups: int = 20
+    readiness_max_scheduler_lag_seconds: float = 30.0
+
+    # discord REST request statistics are logged this often
+    discord_http_stats_log_interval_minutes: int = 15
+
+    # ended events are moved to the archive tables after this many days
+    event_archive_retention_days: int = 30
+    event_archive_batch_size: int = 500
 
     google_calendar_sync_calendar_name: str = "Moobloom Events"
 
+    # address of the API server when it runs in the bot's process
+    # (`python -m moobot.main --with-api`)
+    api_host: str = "0.0.0.0"
+    api_port: int = 8000
+
+    # bearer token required by admin API routes (bulk import/export), routes are disabled if unset
+    admin_api_token: str | None = None
+
     # google api credentials for gcalendar integration
     google_client_id: str
     google_project_id: str
     google_client_secret: str
     google_redirect_uri_host: str
 
+    @model_validator(mode="after")
+    def check_discord_shards(self) -> Self:
+        # discord.py can't tell which of the recommended number of shards the IDs refer to
+        if self.discord_shard_ids is not None and self.discord_shard_count is None:
+            raise ValueError("DISCORD_SHARD_COUNT must be set when DISCORD_SHARD_IDS is")
+        return self
+
+
+SettingsSubscriber = Callable[["Settings", set[str]], None]
+
+_settings: Settings | None = None
+_settings_lock = threading.Lock()
+_subscribers: list[tuple[frozenset[str], SettingsSubscriber]] = []
+
 
 def get_settings() -> Settings:
-    return Settings()  # type: ignore
+    """
+    Get the settings, which are read from the environment once and shared by every caller.
+
+    `reload_settings` updates this instance in place, so references held by modules stay current.
+    """
+    global _settings
+    if _settings is None:
+        with _settings_lock:
+            if _settings is None:
+                _settings = Settings()  # type: ignore
+    return _settings
+
+
+def subscribe_to_settings(fields: Iterable[str], callback: SettingsSubscriber) -> None:
+    """
+    Call `callback(settings, changed_fields)` after a reload changes any of the given fields.
+    """
+    fields = frozenset(fields)
+    if unknown := fields - Settings.model_fields.keys():
+        raise ValueError(f"Unknown settings: {', '.join(sorted(unknown))}")
+    _subscribers.append((fields, callback))
+
+
+def reload_settings() -> set[str]:
+    """
+    Re-read and validate the settings, then notify subscribers of the changed fields.
+
+    Raises a pydantic ValidationError (a ValueError) and keeps the current settings if the new
+    ones are invalid. Returns the names of the changed fields.
+    """
+    settings = get_settings()
+    with _settings_lock:
+        new_settings = Settings()  # type: ignore
+        changed = {
+            name
+            for name in Settings.model_fields
+            if getattr(new_settings, name) != getattr(settings, name)
+        }
+        for name in changed:
+            setattr(settings, name, getattr(new_settings, name))
+
+    if changed:
+        _logger.info(f"Reloaded settings, changed: {', '.join(sorted(changed))}")
+    for fields, callback in _subscribers:
+        if fields & changed:
+            try:
+                callback(settings, changed)
+            except Exception:
+                _logger.exception(f"Error while applying changed settings with {callback}")
+    return changed
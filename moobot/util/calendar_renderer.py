@@ -0,0 +1,99 @@
+import calendar
+from collections.abc import Sequence
+from datetime import date, datetime
+
+from moobot import metrics
+from moobot.db.snapshots import EventSnapshot
+from moobot.util.format import format_single_event_for_calendar
+
+NO_EVENTS = "No upcoming events!"
+NO_EVENTS_PAGE_KEY = "no-events"
+DISCORD_MAX_MESSAGE_LENGTH = 2000
+
+# the fields of an event its calendar line is rendered from, and today's date
+LineKey = tuple[str, date, datetime | None, date, datetime | None, date]
+
+
+class CalendarRenderer:
+    """
+    Renders the upcoming events of the calendar as pages, reusing previous work.
+
+    Each month is rendered as its own page, split into continuation pages if it doesn't fit in a
+    single message. Pages are keyed by their month, e.g. "2030-09", and continuation pages by
+    their month and number, e.g. "2030-09/2", so that they can be matched to their messages.
+
+    Each event's line is memoized by its ID, the fields it's rendered from and today's date (which
+    decides the "Today!"/"Ongoing" markers), and a month's pages are only rebuilt when one of its
+    lines changed, so re-rendering an unchanged calendar only costs a dict lookup per event.
+    """
+
+    def __init__(self, max_page_length: int = DISCORD_MAX_MESSAGE_LENGTH) -> None:
+        self.max_page_length = max_page_length
+        # event ID -> (rendered fields and today, line)
+        self._lines: dict[int, tuple[LineKey, str]] = {}
+        # (month, year) -> (lines, pages)
+        self._sections: dict[tuple[int, int], tuple[tuple[str, ...], tuple[str, ...]]] = {}
+
+    def render_pages(
+        self, events: Sequence[EventSnapshot], today: date | None = None
+    ) -> dict[str, str]:
+        """
+        Render events ordered by start date into pages by page key, grouped by month.
+        """
+        today = today or date.today()
+
+        lines_by_month: dict[tuple[int, int], list[str]] = {}
+        lines: dict[int, tuple[LineKey, str]] = {}
+        for event in events:
+            # not keyed by updated_at, which only has a resolution of seconds on SQLite
+            key: LineKey = (
+                event.name,
+                event.start_date,
+                event.start_time,
+                event.end_date,
+                event.end_time,
+                today,
+            )
+            cached = self._lines.get(event.id)
+            if cached is None or cached[0] != key:
+                cached = (key, format_single_event_for_calendar(event, today=today))
+                metrics.CACHE_REQUESTS.inc(cache="calendar_line", result="miss")
+            else:
+                metrics.CACHE_REQUESTS.inc(cache="calendar_line", result="hit")
+            lines[event.id] = cached
+            month_and_year = (event.start_date.month, event.start_date.year)
+            lines_by_month.setdefault(month_and_year, []).append(cached[1])
+        # dropping events that are no longer shown keeps the memo bounded
+        self._lines = lines
+
+        sections: dict[tuple[int, int], tuple[tuple[str, ...], tuple[str, ...]]] = {}
+        for (month, year), month_lines in lines_by_month.items():
+            section_lines = tuple(month_lines)
+            cached_section = self._sections.get((month, year))
+            if cached_section is None or cached_section[0] != section_lines:
+                title = f"**{calendar.month_name[month]} {year}:**"
+                cached_section = (section_lines, self._paginate(title, section_lines))
+            sections[(month, year)] = cached_section
+        self._sections = sections
+
+        pages = {
+            f"{year}-{month:02}" + (f"/{i + 1}" if i else ""): page
+            for (month, year), (_lines, section_pages) in sections.items()
+            for i, page in enumerate(section_pages)
+        }
+        return pages or {NO_EVENTS_PAGE_KEY: NO_EVENTS}
+
+    def _paginate(self, title: str, lines: Sequence[str]) -> tuple[str, ...]:
+        continued_title = title.replace(":**", " (continued):**")
+        pages: list[str] = []
+        page = [title]
+        length = len(title)
+        for line in lines:
+            if length + 1 + len(line) > self.max_page_length and len(page) > 1:
+                pages.append("\n".join(page))
+                page = [continued_title]
+                length = len(continued_title)
+            page.append(line)
+            length += 1 + len(line)
+        pages.append("\n".join(page))
+        return tuple(pages)
@@ -1,3 +1,5 @@
+import calendar
+import re
 from dataclasses import dataclass
 from datetime import datetime
 
@@ -20,3 +22,80 @@ class TimeAwareParser(parser.parser):
 
 
 time_aware_parser = TimeAwareParser()
+
+MONTHS = {
+    **{name.lower(): i for i, name in enumerate(calendar.month_name) if name},
+    **{name.lower(): i for i, name in enumerate(calendar.month_abbr) if name},
+    "sept": 9,
+}
+
+# the formats users actually enter, e.g. "9/21", "9/21/2030 7pm", "Sept 21st, 7:30 PM" or "10pm"
+_FAST_PATH_REGEX = re.compile(
+    r"""
+    (?:
+        (?P<month>\d{1,2})/(?P<day>\d{1,2})(?:/(?P<year>\d{4}|\d{2}))?
+        | (?P<month_name>[a-z]+)\.?\s+(?P<named_day>\d{1,2})(?:st|nd|rd|th)?
+          (?:,?\s+(?P<named_year>\d{4}))?
+        | (?P<bare_day>\d{1,2})(?:st|nd|rd|th)?
+    )?
+    (?:
+        (?:^|(?:\s*,\s*|\s+)(?:(?:at|@)\s*)?|\s*@\s*)
+        (?P<hour>\d{1,2})(?::(?P<minute>\d{2}))?\s*(?P<meridiem>[ap])\.?m\.?
+    )?
+    """,
+    re.IGNORECASE | re.VERBOSE,
+)
+
+
+def parse_time_aware(text: str, default: datetime | None = None) -> TimeAwareParserResult:
+    """
+    Parse a date and/or time, filling in missing fields from `default` (today at midnight if
+    unset).
+
+    Common formats are matched by a precompiled grammar; anything else falls back to dateutil.
+    """
+    if default is None:
+        default = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    result = _parse_fast_path(text, default)
+    if result is not None:
+        return result
+    return time_aware_parser.parse(text, default=default)  # type: ignore
+
+
+def _parse_fast_path(text: str, default: datetime) -> TimeAwareParserResult | None:
+    match = _FAST_PATH_REGEX.fullmatch(text.strip())
+    if match is None or not any(match.group("month", "named_day", "bare_day", "hour")):
+        return None
+    groups = match.groupdict()
+
+    year, month, day = default.year, default.month, default.day
+    if groups["month"] is not None:
+        month, day = int(groups["month"]), int(groups["day"])
+        if groups["year"] is not None:
+            year = int(groups["year"]) + (2000 if len(groups["year"]) == 2 else 0)
+    elif groups["named_day"] is not None:
+        if (named_month := MONTHS.get(groups["month_name"].lower())) is None:
+            return None
+        month, day = named_month, int(groups["named_day"])
+        if groups["named_year"] is not None:
+            year = int(groups["named_year"])
+    elif groups["bare_day"] is not None:
+        day = int(groups["bare_day"])
+
+    hour, minute = default.hour, default.minute
+    if groups["hour"] is not None:
+        hour = int(groups["hour"])
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if groups["meridiem"].lower() == "p" else 0)
+        minute = int(groups["minute"] or 0)
+
+    try:
+        dt = default.replace(year=year, month=month, day=day, hour=hour, minute=minute)
+    except ValueError:
+        return None
+    return TimeAwareParserResult(
+        dt=dt,
+        has_time=groups["hour"] is not None,
+        has_date=any(groups[key] is not None for key in ("day", "named_day", "bare_day")),
+    )
@@ -1,6 +1,76 @@
-def mention(user_id: str) -> str:
+from collections.abc import Iterable
+
+from discord import Guild, Member, Object, PermissionOverwrite, Reaction, TextChannel
+
+from moobot import metrics
+
+# maximum number of user IDs per gateway member request
+MEMBER_QUERY_LIMIT = 100
+
+
+def mention(user_id: int) -> str:
     return f"<@{user_id}>"
 
 
-def channel_mention(channel_id: str) -> str:
+def channel_mention(channel_id: int) -> str:
     return f"<#{channel_id}>"
+
+
+async def get_members(guild: Guild, user_ids: Iterable[int]) -> list[Member]:
+    """
+    Get members of a guild from the member cache, requesting any uncached members in bulk.
+
+    Users that aren't members of the guild are left out.
+    """
+    members: list[Member] = []
+    missing_user_ids: list[int] = []
+    for user_id in user_ids:
+        if (member := guild.get_member(user_id)) is not None:
+            members.append(member)
+        else:
+            missing_user_ids.append(user_id)
+    metrics.CACHE_REQUESTS.inc(len(members), cache="members", result="hit")
+    metrics.CACHE_REQUESTS.inc(len(missing_user_ids), cache="members", result="miss")
+
+    for i in range(0, len(missing_user_ids), MEMBER_QUERY_LIMIT):
+        chunk = missing_user_ids[i : i + MEMBER_QUERY_LIMIT]
+        members.extend(await guild.query_members(user_ids=chunk, limit=len(chunk)))
+    return members
+
+
+async def get_member(guild: Guild, user_id: int) -> Member | None:
+    members = await get_members(guild, [user_id])
+    return members[0] if members else None
+
+
+async def has_reacted(reaction: Reaction, member: Member) -> bool:
+    """
+    Check whether a member added a reaction, fetching at most one user from Discord.
+    """
+    # only the bot's own reaction
+    if reaction.count <= int(reaction.me):
+        return False
+    # reaction users are listed by ascending ID
+    async for user in reaction.users(limit=1, after=Object(id=member.id - 1)):
+        return user.id == member.id
+    return False
+
+
+async def grant_channel_access(channel: TextChannel, members: Iterable[Member]) -> None:
+    """
+    Let all given members read a channel, using a single channel edit for several members.
+    """
+    members = list(members)
+    if len(members) <= 1:
+        for member in members:
+            await channel.set_permissions(member, overwrite=PermissionOverwrite(read_messages=True))
+        return
+
+    # editing the overwrites replaces all of them, so they're fetched rather than taken from the
+    # cached channel, which may not know about those set meanwhile (e.g. by RSVPs)
+    current_channel = await channel.guild.fetch_channel(channel.id)
+    if not isinstance(current_channel, TextChannel):
+        raise TypeError(f"Channel {channel.name} has bad type {type(current_channel)}")
+    overwrites = dict(current_channel.overwrites)
+    overwrites.update({member: PermissionOverwrite(read_messages=True) for member in members})
+    await channel.edit(overwrites=overwrites)
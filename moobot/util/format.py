@@ -2,6 +2,7 @@ import calendar
 from datetime import date, datetime
 
 from moobot.db.models import MoobloomEvent
+from moobot.db.snapshots import EventSnapshot
 
 
 def format_event_duration(
@@ -117,17 +118,14 @@ def format_event_duration_for_calendar(
     raise ValueError(f"can't format dates {start_date=} {start_time=} {end_date=} {end_time=}")
 
 
-def format_single_event_for_calendar(event: MoobloomEvent) -> str:
+def format_single_event_for_calendar(event: EventSnapshot, today: date | None = None) -> str:
+    today = today or date.today()
     formatted_duration = format_event_duration_for_calendar(
         event.start_date, event.start_time, event.end_date, event.end_time
     )
-    if event.start_date == date.today():
+    if event.start_date == today:
         return f"**📢  (Today!) {formatted_duration}: {event.name}**"
-    if (
-        event.start_date != event.end_date
-        and date.today() >= event.start_date
-        and date.today() <= event.end_date
-    ):
+    if event.start_date != event.end_date and event.start_date <= today <= event.end_date:
         return f"**📢  (Ongoing) {formatted_duration}: {event.name}**"
     return f"{formatted_duration}: {event.name}"
 
@@ -146,3 +144,15 @@ def format_event_duration_for_event_modal(event: MoobloomEvent) -> str:
         end = None
 
     return f"{start} to {end}" if end is not None else start
+
+
+def format_event_description_for_event_modal(event: MoobloomEvent) -> str | None:
+    description_parts = (
+        f"url:{event.url}" if event.url else None,
+        f"image_url:{event.image_url}" if event.image_url else None,
+        event.description,
+    )
+    if not any(description_parts):
+        return None
+
+    return "\n".join(part for part in description_parts if part)
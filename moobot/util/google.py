@@ -2,19 +2,20 @@ from __future__ import annotations
 
 import logging
 from datetime import timedelta
-from typing import TYPE_CHECKING
-
-import google_auth_oauthlib.flow
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
+from typing import TYPE_CHECKING, Any
 
+from moobot import metrics
 from moobot.db.crud.google import create_auth_session
-from moobot.db.models import GoogleApiUser, MoobloomEvent, MoobloomEventAttendanceType
+from moobot.db.models import GoogleApiUser, MoobloomEventAttendanceType
 from moobot.db.session import Session
+from moobot.db.snapshots import EventSnapshot
 from moobot.settings import get_settings
 
+# the google client libraries are slow to import and only needed once a user enables calendar
+# sync, so they are imported on first use
 if TYPE_CHECKING:
+    import google_auth_oauthlib.flow
+    from google.oauth2.credentials import Credentials
     from googleapiclient._apis.calendar.v3.resources import CalendarResource  # type: ignore
     from googleapiclient._apis.calendar.v3.schemas import (  # type: ignore
         Calendar,
@@ -39,7 +40,23 @@ CLIENT_CONFIG = {
 SCOPES = ["https://www.googleapis.com/auth/calendar.app.created"]
 
 
+def _execute(request: Any, method: str) -> Any:
+    """
+    Execute a Google API request, recording its outcome and duration under `method`.
+    """
+    outcome = "error"
+    try:
+        with metrics.GOOGLE_REQUEST_SECONDS.time(method=method):
+            response = request.execute()
+        outcome = "success"
+        return response
+    finally:
+        metrics.GOOGLE_REQUESTS.inc(method=method, outcome=outcome)
+
+
 def _get_flow(state: str | None = None) -> google_auth_oauthlib.flow.Flow:
+    import google_auth_oauthlib.flow
+
     flow = google_auth_oauthlib.flow.Flow.from_client_config(CLIENT_CONFIG, SCOPES, state=state)
     flow.redirect_uri = f"{settings.google_redirect_uri_host}/google_oauth/auth"
 
@@ -70,6 +87,9 @@ def fetch_credentials(code: str) -> Credentials:
 
 
 def get_calendar_service(user: GoogleApiUser) -> CalendarResource:
+    from google.oauth2.credentials import Credentials
+    from googleapiclient.discovery import build
+
     credentials = Credentials(
         token=user.token,
         refresh_token=user.refresh_token,
@@ -84,16 +104,16 @@ def get_calendar_service(user: GoogleApiUser) -> CalendarResource:
 
 def create_moobloom_events_calendar(service: CalendarResource) -> str:
     calendar: Calendar = {"summary": settings.google_calendar_sync_calendar_name}
-    created_calendar = service.calendars().insert(body=calendar).execute()
+    created_calendar = _execute(service.calendars().insert(body=calendar), "calendars.insert")
     return created_calendar["id"]
 
 
-def _build_gcalendar_event_id(event: MoobloomEvent) -> str:
+def _build_gcalendar_event_id(event: EventSnapshot) -> str:
     return f"moob{event.id}"
 
 
 def _build_gcalendar_event(
-    event: MoobloomEvent, attendance_type: MoobloomEventAttendanceType
+    event: EventSnapshot, attendance_type: MoobloomEventAttendanceType
 ) -> Event:
     start: EventDateTime
     if event.start_time:
@@ -139,14 +159,16 @@ def _build_gcalendar_event(
 def add_or_update_event(
     service: CalendarResource,
     calendar_id: str,
-    event: MoobloomEvent,
+    event: EventSnapshot,
     attendance_type: MoobloomEventAttendanceType,
 ) -> None:
+    from googleapiclient.errors import HttpError
+
     gcalendar_event_id = _build_gcalendar_event_id(event)
     existing_event = None
     try:
-        existing_event = (
-            service.events().get(calendarId=calendar_id, eventId=gcalendar_event_id).execute()
+        existing_event = _execute(
+            service.events().get(calendarId=calendar_id, eventId=gcalendar_event_id), "events.get"
         )
     except HttpError as e:
         if e.status_code != 404:
@@ -157,15 +179,21 @@ def add_or_update_event(
     if existing_event is not None:
         _logger.debug(f"Updating existing Google Calendar event {event.name}")
         existing_event.update(gcalendar_event)
-        service.events().update(
-            calendarId=calendar_id, eventId=gcalendar_event_id, body=existing_event
-        ).execute()
+        _execute(
+            service.events().update(
+                calendarId=calendar_id, eventId=gcalendar_event_id, body=existing_event
+            ),
+            "events.update",
+        )
         _logger.debug(f"Done updating existing Google Calendar event {event.name}")
     # create new event
     else:
         _logger.debug(f"Creating new Google Calendar event {event.name}")
         try:
-            service.events().insert(calendarId=calendar_id, body=gcalendar_event).execute()
+            _execute(
+                service.events().insert(calendarId=calendar_id, body=gcalendar_event),
+                "events.insert",
+            )
             _logger.debug(f"Done creating new Google Calendar event {event.name}")
         except HttpError as e:
             if e.status_code != 404:
@@ -0,0 +1,18 @@
+import os
+import resource
+import sys
+
+
+def get_rss_bytes() -> int:
+    """
+    Get the resident memory of the current process.
+
+    Falls back to the peak resident memory where /proc isn't available.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # reported in bytes on macOS and in kilobytes everywhere else
+        return max_rss if sys.platform == "darwin" else max_rss * 1024
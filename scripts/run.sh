@@ -6,8 +6,13 @@ if [ "$1" = "dev" ]; then
     run="dev"
 fi
 
-# wait for database to be ready
-python -c "import moobot.db.session"
+# wait for the database, then create tables and run migrations before starting both processes
+python -c "from moobot.db.session import init_db; init_db()"
+
+# opt-in: serve the bot and the API from a single process sharing one event loop
+if [ "$SINGLE_PROCESS" = "true" ] && [ "$run" = "run" ]; then
+    exec python -m moobot.main --with-api
+fi
 
 python -m moobot.main &
 bot_pid=$!
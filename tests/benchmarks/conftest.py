@@ -0,0 +1,74 @@
+"""
+Micro-benchmarks compared against saved baselines.
+
+Benchmarks are excluded from the default test run, run them with `pytest -m benchmark`. Each one
+fails if it's more than `MOOBOT_BENCHMARK_THRESHOLD` (default 1.0, i.e. twice as) slow as its
+baseline in baselines.json. Timings vary between runs by tens of percent on shared machines, so
+the threshold only catches real regressions; compare the printed timings (`-s`) for smaller ones.
+
+Baselines depend on the machine they were recorded on. Re-record them with
+`MOOBOT_BENCHMARK_SAVE=1` after intentionally changing performance or when running on different
+hardware.
+"""
+
+import json
+import os
+import timeit
+from collections.abc import Callable, Generator
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+BASELINES_PATH = Path(__file__).parent / "baselines.json"
+DEFAULT_THRESHOLD = 1.0
+REPEAT = 7
+
+Benchmark = Callable[[Callable[[], Any]], float]
+
+
+@pytest.fixture(scope="session")
+def _benchmark_results() -> Generator[dict[str, float], None, None]:
+    results: dict[str, float] = {}
+    yield results
+    if results and os.environ.get("MOOBOT_BENCHMARK_SAVE"):
+        baselines = _load_baselines()
+        baselines.update(results)
+        BASELINES_PATH.write_text(json.dumps(dict(sorted(baselines.items())), indent=2) + "\n")
+
+
+@pytest.fixture
+def benchmark(request: pytest.FixtureRequest, _benchmark_results: dict[str, float]) -> Benchmark:
+    """
+    Time a function, failing if it regressed compared to the test's baseline.
+
+    Returns the best time per call, in seconds.
+    """
+
+    def run(f: Callable[[], Any]) -> float:
+        timer = timeit.Timer(f)
+        number, _ = timer.autorange()
+        seconds = min(timer.repeat(repeat=REPEAT, number=number)) / number
+        name = request.node.nodeid.split("/")[-1]
+        _benchmark_results[name] = float(f"{seconds:.3g}")
+
+        baseline = _load_baselines().get(name)
+        if baseline is None or os.environ.get("MOOBOT_BENCHMARK_SAVE"):
+            print(f"{name}: {seconds * 1e6:.1f}µs")
+            return seconds
+
+        threshold = float(os.environ.get("MOOBOT_BENCHMARK_THRESHOLD", DEFAULT_THRESHOLD))
+        print(f"{name}: {seconds * 1e6:.1f}µs (baseline {baseline * 1e6:.1f}µs)")
+        assert seconds <= baseline * (1 + threshold), (
+            f"{seconds * 1e6:.1f}µs per call, more than {threshold:.0%} slower than the baseline"
+            f" of {baseline * 1e6:.1f}µs"
+        )
+        return seconds
+
+    return run
+
+
+def _load_baselines() -> dict[str, float]:
+    if not BASELINES_PATH.exists():
+        return {}
+    return json.loads(BASELINES_PATH.read_text())
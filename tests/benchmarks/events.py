@@ -0,0 +1,48 @@
+from datetime import date, datetime, timedelta
+
+from moobot.db.models import MoobloomEventAttendanceType
+from moobot.db.snapshots import EventSnapshot, RSVPSnapshot
+
+START_DATE = date(2030, 1, 1)
+TODAY = START_DATE
+
+
+def build_event(id: int, rsvps: int = 0) -> EventSnapshot:
+    """
+    An event with a mix of all-day, timed and multi-day events depending on its ID.
+    """
+    start_date = START_DATE + timedelta(days=id // 5)
+    start_time = end_time = None
+    end_date = start_date
+    if id % 3 == 1:
+        start_time = datetime.combine(start_date, datetime.min.time()).replace(hour=19)
+        end_time = start_time.replace(hour=22, minute=30)
+    elif id % 3 == 2:
+        end_date = start_date + timedelta(days=2)
+
+    attendance_types = list(MoobloomEventAttendanceType)
+    return EventSnapshot(
+        id=id,
+        guild_id=1234,
+        name=f"Event {id}",
+        create_channel=True,
+        channel_name=None,
+        start_date=start_date,
+        start_time=start_time,
+        end_date=end_date,
+        end_time=end_time,
+        location="Somewhere",
+        description="Description",
+        url=None,
+        image_url=None,
+        thumbnail_url=None,
+        announcement_message_id=None,
+        channel_id=5678,
+        channel_introduction_message_id=None,
+        deleted=False,
+        updated_at=datetime(2029, 1, 1),
+        rsvps=tuple(
+            RSVPSnapshot(user_id=10**17 + i, attendance_type=attendance_types[i % 3])
+            for i in range(rsvps)
+        ),
+    )
@@ -0,0 +1,29 @@
+from dataclasses import replace
+from datetime import datetime
+
+import pytest
+
+from moobot.util.calendar_renderer import CalendarRenderer
+from tests.benchmarks.conftest import Benchmark
+from tests.benchmarks.events import TODAY, build_event
+
+pytestmark = pytest.mark.benchmark
+
+EVENTS = [build_event(id) for id in range(10_000)]
+
+
+def test_render_pages__10000_events__cold(benchmark: Benchmark) -> None:
+    benchmark(lambda: CalendarRenderer().render_pages(EVENTS, today=TODAY))
+
+
+def test_render_pages__10000_events__one_event_changed(benchmark: Benchmark) -> None:
+    renderer = CalendarRenderer()
+    renderer.render_pages(EVENTS, today=TODAY)
+    changed = [*EVENTS[:-1], replace(EVENTS[-1], name="Renamed", updated_at=datetime(2029, 6, 1))]
+
+    def run() -> None:
+        # alternate between two versions of the calendar, re-rendering one event every time
+        renderer.render_pages(changed, today=TODAY)
+        renderer.render_pages(EVENTS, today=TODAY)
+
+    benchmark(run)
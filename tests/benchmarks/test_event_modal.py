@@ -0,0 +1,38 @@
+import pytest
+
+from moobot.discord.views.event_modal import _parse_event_description, _parse_event_time
+from tests.benchmarks.conftest import Benchmark
+
+pytestmark = pytest.mark.benchmark
+
+TIMES = [
+    "9/21",
+    "9/21 7PM",
+    "Sept 21 7PM",
+    "9/21 7PM to 9/21 10PM",
+    "9/21 7PM to 10PM",
+    "9/21 to 9/28",
+    "September 21st at 7:30pm",
+]
+DESCRIPTIONS = [
+    None,
+    "A plain description\nspanning two lines",
+    "https://example.com/event\nhttps://example.com/image.png\nDescription",
+    "Description\nurl:https://example.com/event\nimage_url:https://example.com/image.png",
+]
+
+
+def test__parse_event_time(benchmark: Benchmark) -> None:
+    def run() -> None:
+        for raw_time in TIMES:
+            _parse_event_time(raw_time)
+
+    benchmark(run)
+
+
+def test__parse_event_description(benchmark: Benchmark) -> None:
+    def run() -> None:
+        for raw_description in DESCRIPTIONS:
+            _parse_event_description(raw_description)
+
+    benchmark(run)
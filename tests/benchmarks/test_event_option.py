@@ -0,0 +1,44 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from pytest_mock import MockerFixture
+from sqlalchemy.orm import Session, sessionmaker
+
+from moobot.db.models import MoobloomEvent
+from moobot.discord.event_option import event_autocomplete
+from tests.benchmarks.conftest import Benchmark
+from tests.benchmarks.events import build_event
+
+pytestmark = pytest.mark.benchmark
+
+GUILD_ID = 1234
+
+
+@pytest.mark.parametrize("events", [1000, 10_000])
+def test_event_autocomplete(
+    benchmark: Benchmark,
+    test_db_session: sessionmaker[Session],
+    mocker: MockerFixture,
+    events: int,
+) -> None:
+    mocker.patch("moobot.discord.event_option.Session", test_db_session)
+    with test_db_session() as session:
+        session.add_all(
+            MoobloomEvent(
+                name=event.name,
+                guild_id=GUILD_ID,
+                start_date=event.start_date,
+                start_time=event.start_time,
+                end_date=event.end_date,
+                end_time=event.end_time,
+            )
+            for event in map(build_event, range(events))
+        )
+        session.commit()
+    interaction = SimpleNamespace(guild_id=GUILD_ID)
+
+    with asyncio.Runner() as runner:
+        choices = runner.run(event_autocomplete(interaction, "event 1"))  # type: ignore
+        assert len(choices) == 25
+        benchmark(lambda: runner.run(event_autocomplete(interaction, "event 1")))  # type: ignore
@@ -0,0 +1,33 @@
+import pytest
+
+from moobot.events import get_event_channel_introduction_message_content
+from moobot.util.format import format_event_duration, format_event_duration_for_calendar
+from tests.benchmarks.conftest import Benchmark
+from tests.benchmarks.events import build_event
+
+pytestmark = pytest.mark.benchmark
+
+# one of each kind of event: all-day, timed and multi-day
+EVENTS = [build_event(id) for id in range(3)]
+
+
+def test_format_event_duration(benchmark: Benchmark) -> None:
+    def run() -> None:
+        for e in EVENTS:
+            format_event_duration(e.start_date, e.start_time, e.end_date, e.end_time)
+
+    benchmark(run)
+
+
+def test_format_event_duration_for_calendar(benchmark: Benchmark) -> None:
+    def run() -> None:
+        for e in EVENTS:
+            format_event_duration_for_calendar(e.start_date, e.start_time, e.end_date, e.end_time)
+
+    benchmark(run)
+
+
+def test_get_event_channel_introduction_message_content__5000_rsvps(benchmark: Benchmark) -> None:
+    event = build_event(1, rsvps=5000)
+
+    benchmark(lambda: get_event_channel_introduction_message_content(event))
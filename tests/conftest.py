@@ -20,6 +20,7 @@ def test_db_session(mocker: MockerFixture) -> Generator[sessionmaker[Session], N
     """
     sm = sessionmaker(sqlite_engine)
     mocker.patch("moobot.db.session.Session", sm)
+    mocker.patch("moobot.db.session.WriteSession", sm)
 
     Base.metadata.create_all(sqlite_engine)
     yield sm
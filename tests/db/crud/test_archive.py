@@ -0,0 +1,97 @@
+from datetime import date, timedelta
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from moobot.db.crud.archive import (
+    ArchivedEventMessages,
+    archive_events_ended_before,
+    get_archived_event_by_id,
+)
+from moobot.db.models import (
+    MoobloomEvent,
+    MoobloomEventArchive,
+    MoobloomEventAttendanceType,
+    MoobloomEventRSVP,
+)
+
+TODAY = date.today()
+LAST_YEAR = TODAY - timedelta(days=365)
+
+
+def _add_event(
+    session: Session,
+    name: str,
+    end_date: date,
+    announcement_message_id: int,
+    guild_id: int | None = None,
+    channel_introduction_message_id: int | None = None,
+) -> int:
+    event = MoobloomEvent(
+        name=name,
+        guild_id=guild_id,
+        channel_introduction_message_id=channel_introduction_message_id,
+        start_date=end_date,
+        end_date=end_date,
+        announcement_message_id=announcement_message_id,
+    )
+    session.add(event)
+    session.flush()
+    session.add(
+        MoobloomEventRSVP(
+            user_id=1234, event_id=event.id, attendance_type=MoobloomEventAttendanceType.YES
+        )
+    )
+    session.commit()
+    return event.id
+
+
+def test_archive_events_ended_before__ended_and_upcoming_events__only_ended_events_archived(
+    test_db_session: sessionmaker[Session],
+) -> None:
+    with test_db_session() as session:
+        ended_ids = [
+            _add_event(session, f"ended {i}", LAST_YEAR, announcement_message_id=i)
+            for i in range(3)
+        ]
+        upcoming_id = _add_event(session, "upcoming", TODAY, announcement_message_id=100)
+
+        archived = archive_events_ended_before(session, TODAY, batch_size=2)
+
+        assert archived == [ArchivedEventMessages(i, None) for i in range(3)]
+        assert [e.id for e in session.query(MoobloomEvent).all()] == [upcoming_id]
+        assert [r.event_id for r in session.query(MoobloomEventRSVP).all()] == [upcoming_id]
+        assert sorted(e.id for e in session.query(MoobloomEventArchive).all()) == ended_ids
+
+
+def test_archive_events_ended_before__guild_ids__only_events_of_guilds_archived(
+    test_db_session: sessionmaker[Session],
+) -> None:
+    with test_db_session() as session:
+        _add_event(
+            session,
+            "ours",
+            LAST_YEAR,
+            announcement_message_id=1,
+            guild_id=10,
+            channel_introduction_message_id=3,
+        )
+        other_id = _add_event(session, "other", LAST_YEAR, announcement_message_id=2, guild_id=20)
+
+        archived = archive_events_ended_before(session, TODAY, guild_ids=[10])
+
+        assert archived == [ArchivedEventMessages(1, 3)]
+        assert [e.id for e in session.query(MoobloomEvent).all()] == [other_id]
+
+
+def test_get_archived_event_by_id__archived_event__returns_event_with_rsvps(
+    test_db_session: sessionmaker[Session],
+) -> None:
+    with test_db_session() as session:
+        event_id = _add_event(session, "ended", LAST_YEAR, announcement_message_id=1)
+        archive_events_ended_before(session, TODAY)
+
+        archived_event = get_archived_event_by_id(session, event_id)
+
+        assert archived_event is not None
+        assert archived_event.name == "ended"
+        assert [r.user_id for r in archived_event.rsvps] == [1234]
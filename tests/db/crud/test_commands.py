@@ -0,0 +1,16 @@
+from sqlalchemy.orm import Session, sessionmaker
+
+from moobot.db.crud.commands import get_command_tree_hash, set_command_tree_hash
+
+
+def test_set_command_tree_hash__existing_hash__replaced(
+    test_db_session: sessionmaker[Session],
+) -> None:
+    with test_db_session() as session:
+        assert get_command_tree_hash(session, 1234) is None
+        set_command_tree_hash(session, 1234, "old")
+        set_command_tree_hash(session, 1234, "new")
+        set_command_tree_hash(session, 5678, "other")
+
+        assert get_command_tree_hash(session, 1234) == "new"
+        assert get_command_tree_hash(session, 5678) == "other"
@@ -0,0 +1,79 @@
+from datetime import date
+
+import pytest
+from sqlalchemy.orm import Session, sessionmaker
+
+from moobot.db.crud.guilds import (
+    CalendarMessage,
+    assign_events_without_guild,
+    get_calendar_messages,
+    get_guild_config,
+    set_calendar_messages,
+    upsert_guild_config,
+)
+from moobot.db.models import MoobloomEvent
+
+GUILD_CONFIG = {
+    "calendar_channel_id": 1,
+    "event_announce_channel_id": 2,
+    "get_all_event_channels_react_emoji_name": "all_events",
+    "google_calendar_sync_react_emoji_name": "google_calendar",
+    "all_events_role_name": "All Events",
+    "active_events_category_name": "Active Events",
+}
+
+
+def test_upsert_guild_config__existing_config__partially_updated(
+    test_db_session: sessionmaker[Session],
+) -> None:
+    with test_db_session() as session:
+        upsert_guild_config(session, 1234, GUILD_CONFIG)
+        upsert_guild_config(session, 1234, {"calendar_channel_id": 3})
+
+        guild_config = get_guild_config(session, 1234)
+        assert guild_config is not None
+        assert guild_config.calendar_channel_id == 3
+        assert guild_config.event_announce_channel_id == 2
+        assert get_guild_config(session, 5678) is None
+
+
+def test_upsert_guild_config__new_config_missing_values__raises_value_error(
+    test_db_session: sessionmaker[Session],
+) -> None:
+    with test_db_session() as session, pytest.raises(ValueError):
+        upsert_guild_config(session, 1234, {"calendar_channel_id": 3})
+
+
+def test_set_calendar_messages__calendar_channel_changed__messages_forgotten(
+    test_db_session: sessionmaker[Session],
+) -> None:
+    messages = [CalendarMessage("header", 1, "a"), CalendarMessage("2030-09", 2, "b")]
+    with test_db_session() as session:
+        upsert_guild_config(session, 1234, GUILD_CONFIG)
+        assert get_calendar_messages(session, 1234) == []
+
+        set_calendar_messages(session, 1234, messages)
+        upsert_guild_config(session, 1234, {"event_announce_channel_id": 3})
+        assert get_calendar_messages(session, 1234) == messages
+
+        upsert_guild_config(session, 1234, {"calendar_channel_id": 3})
+        assert get_calendar_messages(session, 1234) == []
+
+
+def test_assign_events_without_guild__mixed_events__only_events_without_guild_assigned(
+    test_db_session: sessionmaker[Session],
+) -> None:
+    with test_db_session() as session:
+        for name, guild_id in (("Legacy", None), ("Other", 5678)):
+            session.add(
+                MoobloomEvent(
+                    name=name, start_date=date.today(), end_date=date.today(), guild_id=guild_id
+                )
+            )
+        session.commit()
+
+        assert assign_events_without_guild(session, 1234) == 1
+        assert {e.name: e.guild_id for e in session.query(MoobloomEvent)} == {
+            "Legacy": 1234,
+            "Other": 5678,
+        }
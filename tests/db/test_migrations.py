@@ -0,0 +1,67 @@
+from pathlib import Path
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from moobot.db.migrations import run_migrations
+from moobot.db.models import Base, MoobloomEvent, MoobloomEventAttendanceType, MoobloomEventRSVP
+from moobot.db.session import create_db_engine
+
+OLD_EVENT_TABLE = """
+CREATE TABLE moobloomevent (
+    id INTEGER PRIMARY KEY, name VARCHAR NOT NULL, create_channel BOOLEAN NOT NULL,
+    channel_name VARCHAR, start_date DATE NOT NULL, start_time DATETIME, end_date DATE NOT NULL,
+    end_time DATETIME, location VARCHAR, description VARCHAR, url VARCHAR, image_url VARCHAR,
+    thumbnail_url VARCHAR, announcement_message_id VARCHAR, channel_id VARCHAR,
+    channel_introduction_message_id VARCHAR, out_of_sync BOOLEAN NOT NULL, created_by VARCHAR,
+    updated_by VARCHAR, deleted BOOLEAN NOT NULL, created_at DATETIME NOT NULL,
+    updated_at DATETIME NOT NULL,
+    reactions_created BOOLEAN NOT NULL
+)
+"""
+OLD_RSVP_TABLE = """
+CREATE TABLE moobloomeventrsvp (
+    id INTEGER PRIMARY KEY, user_id VARCHAR NOT NULL,
+    event_id INTEGER NOT NULL REFERENCES moobloomevent (id), attendance_type VARCHAR NOT NULL,
+    created_at DATETIME NOT NULL
+)
+"""
+
+
+def test_run_migrations__string_snowflakes_and_attendance_types__converted(
+    tmp_path: Path,
+) -> None:
+    engine = create_db_engine(f"sqlite:///{tmp_path}/moobot.db")
+    with engine.begin() as connection:
+        connection.execute(text(OLD_EVENT_TABLE))
+        connection.execute(text(OLD_RSVP_TABLE))
+        connection.execute(
+            text(
+                "INSERT INTO moobloomevent VALUES (1, 'some event', 1, NULL, '2030-09-21', NULL,"
+                " '2030-09-21', NULL, NULL, NULL, NULL, NULL, NULL, '1000000000000000001', NULL,"
+                " '0', 0, '1234', NULL, 0, '2030-01-01 00:00:00', '2030-01-01 00:00:00', 1)"
+            )
+        )
+        connection.execute(
+            text(
+                "INSERT INTO moobloomeventrsvp VALUES"
+                " (1, '1234', 1, 'maybe', '2030-01-01 00:00:00')"
+            )
+        )
+    Base.metadata.create_all(engine)
+
+    run_migrations(engine)
+    # migrations are a no-op once applied
+    run_migrations(engine)
+
+    with Session(engine) as session:
+        event = session.query(MoobloomEvent).one()
+        rsvp = session.query(MoobloomEventRSVP).one()
+
+        assert event.announcement_message_id == 1000000000000000001
+        assert event.channel_introduction_message_id == 0
+        assert event.created_by == 1234
+        assert event.guild_id is None
+        assert rsvp.user_id == 1234
+        assert rsvp.attendance_type == MoobloomEventAttendanceType.MAYBE
+        assert rsvp.event == event
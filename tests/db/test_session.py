@@ -0,0 +1,78 @@
+import threading
+from pathlib import Path
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from moobot.db.session import WRITE_OPTION, create_db_engine
+
+
+def test_create_db_engine__sqlite_file__uses_wal_and_pragmas(tmp_path: Path) -> None:
+    engine = create_db_engine(f"sqlite:///{tmp_path}/data/moobot.db")
+
+    with engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert connection.execute(text("PRAGMA foreign_keys")).scalar() == 1
+        assert connection.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+
+
+def test_create_db_engine__sqlite_file__transactions_are_isolated(tmp_path: Path) -> None:
+    engine = create_db_engine(f"sqlite:///{tmp_path}/moobot.db")
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE t (x INTEGER)"))
+
+    with engine.connect() as writer, engine.connect() as reader:
+        writer.execute(text("INSERT INTO t VALUES (1)"))
+        # uncommitted writes are not visible to other connections, and don't block readers
+        assert reader.execute(text("SELECT COUNT(*) FROM t")).scalar() == 0
+        writer.commit()
+        reader.rollback()
+        assert reader.execute(text("SELECT COUNT(*) FROM t")).scalar() == 1
+
+
+def test_create_db_engine__sqlite_write_option__concurrent_read_then_write_serialized(
+    tmp_path: Path,
+) -> None:
+    engine = create_db_engine(f"sqlite:///{tmp_path}/moobot.db")
+    write_engine = engine.execution_options(**{WRITE_OPTION: True})
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE counter (x INTEGER)"))
+        connection.execute(text("INSERT INTO counter VALUES (0)"))
+    first_read = threading.Event()
+    second_committed = threading.Event()
+    errors: list[Exception] = []
+
+    def increment(first: bool) -> None:
+        try:
+            if not first:
+                first_read.wait()
+            with write_engine.begin() as connection:
+                x = connection.execute(text("SELECT x FROM counter")).scalar_one()
+                if first:
+                    first_read.set()
+                    # with deferred transactions, the second writer would commit here
+                    second_committed.wait(timeout=0.5)
+                connection.execute(text("UPDATE counter SET x = :x"), {"x": x + 1})
+            if not first:
+                second_committed.set()
+        except OperationalError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=increment, args=(first,)) for first in (True, False)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT x FROM counter")).scalar() == 2
+
+
+def test_create_db_engine__sqlite_in_memory__connections_share_database() -> None:
+    engine = create_db_engine("sqlite://")
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE t (x INTEGER)"))
+
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT COUNT(*) FROM t")).scalar() == 0
@@ -0,0 +1,36 @@
+import dataclasses
+from datetime import date
+
+import pytest
+from sqlalchemy.orm import Session, sessionmaker
+
+from moobot.db.crud.events import get_event_snapshot
+from moobot.db.models import MoobloomEvent, MoobloomEventAttendanceType, MoobloomEventRSVP
+from moobot.db.snapshots import RSVPSnapshot
+
+
+def test_get_event_snapshot__event_with_rsvps__usable_after_session_closed(
+    test_db_session: sessionmaker[Session],
+) -> None:
+    with test_db_session() as session:
+        event = MoobloomEvent(name="some event", start_date=date.today(), end_date=date.today())
+        session.add(event)
+        session.flush()
+        session.add(
+            MoobloomEventRSVP(
+                user_id=1234, event_id=event.id, attendance_type=MoobloomEventAttendanceType.YES
+            )
+        )
+        session.commit()
+        event_id = event.id
+
+    with test_db_session() as session:
+        snapshot = get_event_snapshot(session, event_id)
+
+    assert snapshot is not None
+    assert snapshot.name == "some event"
+    assert snapshot.rsvps == (
+        RSVPSnapshot(user_id=1234, attendance_type=MoobloomEventAttendanceType.YES),
+    )
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        snapshot.name = "some other event"  # type: ignore[misc]
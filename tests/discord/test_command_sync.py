@@ -0,0 +1,23 @@
+from unittest.mock import MagicMock
+
+import discord
+from discord import app_commands
+
+from moobot.discord.command_sync import hash_command_tree
+
+
+def test_hash_command_tree__commands_changed__hash_changes() -> None:
+    tree = app_commands.CommandTree(discord.Client(intents=discord.Intents.none()))
+    guild = MagicMock(id=1234)
+
+    async def some_command(interaction: discord.Interaction) -> None:
+        pass
+
+    tree.add_command(app_commands.Command(name="a", description="A", callback=some_command))
+    tree.copy_global_to(guild=guild)
+    initial_hash = hash_command_tree(tree, guild)
+    assert hash_command_tree(tree, guild) == initial_hash
+
+    tree.add_command(app_commands.Command(name="b", description="B", callback=some_command))
+    tree.copy_global_to(guild=guild)
+    assert hash_command_tree(tree, guild) != initial_hash
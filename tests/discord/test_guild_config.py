@@ -0,0 +1,23 @@
+import pytest
+
+from moobot.discord.guild_config import parse_guild_config_options
+
+
+def test_parse_guild_config_options__valid_options__column_values() -> None:
+    values = parse_guild_config_options(
+        'calendar_channel=<#1234> announce_channel=5678 category="Active Events"'
+    )
+
+    assert values == {
+        "calendar_channel_id": 1234,
+        "event_announce_channel_id": 5678,
+        "active_events_category_name": "Active Events",
+    }
+
+
+@pytest.mark.parametrize(
+    "options", ["calendar_channel=general", "unknown=value", "category", "category="]
+)
+def test_parse_guild_config_options__invalid_option__raises_value_error(options: str) -> None:
+    with pytest.raises(ValueError):
+        parse_guild_config_options(options)
@@ -0,0 +1,45 @@
+import asyncio
+from types import SimpleNamespace
+from typing import Any
+
+from discord.http import Route
+
+from moobot.discord.http_stats import DiscordHttpStats, discord_operation
+
+
+def test_install__rate_limited_request__recorded_per_route_and_operation() -> None:
+    stats = DiscordHttpStats()
+
+    class FakeHTTPClient:
+        async def request(self, route: Route, **kwargs: Any) -> Any:
+            # one 429 response followed by a successful retry
+            for status in (429, 200):
+                context = SimpleNamespace()
+                await stats._on_request_start(None, context, None)  # type: ignore
+                await stats._on_request_end(
+                    None,  # type: ignore
+                    context,
+                    SimpleNamespace(response=SimpleNamespace(status=status)),
+                )
+            return {}
+
+    http = FakeHTTPClient()
+    stats.install(http)  # type: ignore
+
+    @discord_operation
+    async def update_channel() -> None:
+        await http.request(Route("PATCH", "/channels/{channel_id}", channel_id=1234))
+
+    async def run() -> None:
+        await update_channel()
+        await http.request(Route("GET", "/users/@me"))
+
+    asyncio.run(run())
+
+    route_stats = stats.by_route["PATCH /channels/{channel_id}"]
+    assert route_stats.requests == 1
+    assert route_stats.attempts == 2
+    assert route_stats.rate_limited == 1
+    assert sum(route_stats.latency_histogram) == 1
+    assert stats.by_operation["update_channel"].requests == 1
+    assert stats.by_operation["other"].requests == 1
@@ -0,0 +1,28 @@
+import asyncio
+
+from moobot.discord.introduction_updater import IntroductionUpdater
+
+
+def test_schedule__burst__updates_immediately_then_once_per_window() -> None:
+    updates: list[int] = []
+
+    async def update(event_id: int) -> None:
+        updates.append(event_id)
+
+    async def run() -> None:
+        updater = IntroductionUpdater(update, window_seconds=0.2)
+        updater.schedule(1)
+        await asyncio.sleep(0.01)
+        assert updates == [1]
+
+        for _ in range(10):
+            updater.schedule(1)
+        updater.schedule(2)
+        await asyncio.sleep(0.01)
+        # event 2 isn't held back by event 1's window
+        assert updates == [1, 2]
+
+        await updater.join()
+
+    asyncio.run(run())
+    assert updates == [1, 2, 1]
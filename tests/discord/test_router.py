@@ -0,0 +1,82 @@
+import asyncio
+from typing import Any
+
+import pytest
+
+from moobot.discord.router import CommandRouter
+
+
+async def first(*_args: Any) -> str:
+    return "first"
+
+
+async def second(*_args: Any) -> str:
+    return "second"
+
+
+async def catch_all(*_args: Any) -> str:
+    return "catch_all"
+
+
+def test_resolve__multiple_matches__first_registered_wins() -> None:
+    router = CommandRouter()
+    router.add(r"(e|event) .+", catch_all)
+    router.add(r"e refresh", first)
+
+    resolved = router.resolve("E refresh")
+
+    assert resolved is not None
+    assert resolved[0].handler is catch_all
+
+
+def test_resolve__indexed_and_unindexed_routes__matches_by_first_word() -> None:
+    router = CommandRouter()
+    router.add(r"e refresh", first)
+    router.add(r"whois (?P<user_id>.+)", second)
+    router.add(r"(e|event) .+", catch_all)
+
+    assert router.resolve("whois 123")[1].group("user_id") == "123"  # type: ignore
+    assert router.resolve("e refresh")[0].handler is first  # type: ignore
+    assert router.resolve("event import")[0].handler is catch_all  # type: ignore
+    assert router.resolve("unknown") is None
+    assert router.resolve("") is None
+
+
+def test_resolve__namespace__requires_prefix() -> None:
+    router = CommandRouter(namespaces={"debug": r"(d|debug) "})
+    router.add(r"stats", first, namespace="debug")
+    router.add(r"stats", second)
+
+    assert router.resolve("debug stats")[0].handler is first  # type: ignore
+    assert router.resolve("d stats")[0].handler is first  # type: ignore
+    assert router.resolve("stats")[0].handler is second  # type: ignore
+
+
+def test_add__unknown_namespace__raises_value_error() -> None:
+    router = CommandRouter()
+    with pytest.raises(ValueError):
+        router.add(r"stats", first, namespace="debug")
+
+
+def test_route__max_concurrency__busy_while_running() -> None:
+    router = CommandRouter()
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def slow(*_args: Any) -> None:
+        started.set()
+        await release.wait()
+
+    route = router.add(r"slow", slow, max_concurrency=1)
+
+    async def run() -> None:
+        task = asyncio.create_task(route())
+        await started.wait()
+        assert route.busy
+        release.set()
+        await task
+        assert not route.busy
+
+    asyncio.run(run())
+    assert route.stats.calls == 1
+    assert route.stats.errors == 0
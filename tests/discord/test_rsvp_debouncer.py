@@ -0,0 +1,75 @@
+import asyncio
+
+from moobot.db.models import MoobloomEventAttendanceType
+from moobot.discord.discord_bot import ReactionAction
+from moobot.discord.rsvp_debouncer import RSVPDebouncer
+
+USER_ID = 1234
+MESSAGE_ID = 5678
+YES = MoobloomEventAttendanceType.YES
+MAYBE = MoobloomEventAttendanceType.MAYBE
+
+
+def _run(
+    reactions: list[tuple[ReactionAction, MoobloomEventAttendanceType]],
+    expected_removals: list[MoobloomEventAttendanceType] | None = None,
+) -> list[tuple[ReactionAction, MoobloomEventAttendanceType]]:
+    applied: list[tuple[ReactionAction, MoobloomEventAttendanceType]] = []
+
+    async def apply(action: ReactionAction, rsvp_type: MoobloomEventAttendanceType) -> None:
+        applied.append((action, rsvp_type))
+
+    async def run() -> None:
+        debouncer = RSVPDebouncer(window_seconds=0.01)
+        for rsvp_type in expected_removals or []:
+            debouncer.expect_removal(USER_ID, MESSAGE_ID, rsvp_type)
+        for action, rsvp_type in reactions:
+            debouncer.submit(USER_ID, MESSAGE_ID, action, rsvp_type, apply)
+        await debouncer.join()
+
+    asyncio.run(run())
+    return applied
+
+
+def test_submit__flipping_rsvps__applies_last_added_once() -> None:
+    applied = _run(
+        [
+            (ReactionAction.ADDED, YES),
+            (ReactionAction.ADDED, MAYBE),
+            (ReactionAction.REMOVED, YES),
+            (ReactionAction.ADDED, YES),
+            (ReactionAction.REMOVED, MAYBE),
+        ]
+    )
+
+    assert applied == [(ReactionAction.ADDED, YES)]
+
+
+def test_submit__added_then_removed__applies_removal() -> None:
+    applied = _run([(ReactionAction.ADDED, YES), (ReactionAction.REMOVED, YES)])
+
+    assert applied == [(ReactionAction.REMOVED, YES)]
+
+
+def test_submit__expected_removal__skipped() -> None:
+    applied = _run([(ReactionAction.REMOVED, MAYBE)], expected_removals=[MAYBE])
+
+    assert applied == []
+
+
+def test_submit__expected_removal_already_consumed__applies_removal() -> None:
+    applied = _run(
+        [(ReactionAction.REMOVED, MAYBE), (ReactionAction.REMOVED, MAYBE)],
+        expected_removals=[MAYBE],
+    )
+
+    assert applied == [(ReactionAction.REMOVED, MAYBE)]
+
+
+def test_submit__expected_removal_then_added_by_user__removal_applied() -> None:
+    applied = _run(
+        [(ReactionAction.ADDED, MAYBE), (ReactionAction.REMOVED, MAYBE)],
+        expected_removals=[MAYBE],
+    )
+
+    assert applied == [(ReactionAction.REMOVED, MAYBE)]
@@ -0,0 +1,109 @@
+import asyncio
+
+from moobot.discord.rsvp_queue import EventRSVPQueues, RSVPJob
+
+
+def test_submit__same_event__processed_in_order_with_one_after_batch() -> None:
+    processed: list[tuple[int, int]] = []
+    after_batches: list[int] = []
+
+    async def after_batch(event_id: int) -> None:
+        after_batches.append(event_id)
+
+    def job(event_id: int, i: int) -> RSVPJob:
+        async def run() -> None:
+            await asyncio.sleep(0)
+            processed.append((event_id, i))
+
+        return run
+
+    async def run() -> None:
+        queues = EventRSVPQueues(after_batch, max_concurrency=2)
+        for i in range(5):
+            await queues.submit(1, job(1, i))
+        await queues.submit(2, job(2, 0))
+        assert queues.depths == {1: 5, 2: 1}
+        await queues.join()
+        assert queues.depths == {}
+        assert queues.stats.processed == 6
+
+    asyncio.run(run())
+    assert [i for event_id, i in processed if event_id == 1] == [0, 1, 2, 3, 4]
+    assert sorted(after_batches) == [1, 2]
+
+
+def test_submit__failing_job__continues_with_next_job() -> None:
+    processed: list[int] = []
+
+    async def after_batch(_event_id: int) -> None:
+        pass
+
+    async def failing() -> None:
+        raise ValueError("failed")
+
+    async def succeeding() -> None:
+        processed.append(1)
+
+    async def run() -> EventRSVPQueues:
+        queues = EventRSVPQueues(after_batch)
+        await queues.submit(1, failing)
+        await queues.submit(1, succeeding)
+        await queues.join()
+        return queues
+
+    queues = asyncio.run(run())
+    assert processed == [1]
+    assert queues.stats.failed == 1
+
+
+def test_submit__max_concurrency__limits_parallel_events() -> None:
+    running = 0
+    max_running = 0
+
+    async def after_batch(_event_id: int) -> None:
+        pass
+
+    async def job() -> None:
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    async def run() -> None:
+        queues = EventRSVPQueues(after_batch, max_concurrency=2)
+        for event_id in range(5):
+            await queues.submit(event_id, job)
+        await queues.join()
+
+    asyncio.run(run())
+    assert max_running == 2
+
+
+def test_submit__full_queue_while_worker_exits__all_jobs_processed_in_order() -> None:
+    processed: list[int] = []
+
+    async def after_batch(_event_id: int) -> None:
+        pass
+
+    def job(i: int, yields: bool = False) -> RSVPJob:
+        async def run() -> None:
+            if yields:
+                await asyncio.sleep(0)
+            processed.append(i)
+
+        return run
+
+    async def run() -> EventRSVPQueues:
+        queues = EventRSVPQueues(after_batch, max_queue_size=1)
+        asyncio.create_task(queues.submit(1, job(0)))
+        # waits for room in the full queue, which the worker frees without yielding before it
+        # finds the queue empty and exits
+        await asyncio.create_task(queues.submit(1, job(1, yields=True)))
+        await queues.submit(1, job(2))
+        await queues.join()
+        return queues
+
+    queues = asyncio.run(run())
+    assert processed == [0, 1, 2]
+    assert queues.depths == {}
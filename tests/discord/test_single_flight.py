@@ -0,0 +1,69 @@
+import asyncio
+
+from moobot.discord.single_flight import RunKeys, SingleFlight
+
+
+def test_request__overlapping_requests__one_run_plus_one_coalesced_follow_up() -> None:
+    runs: list[RunKeys] = []
+    release = asyncio.Event()
+
+    async def run(keys: RunKeys) -> None:
+        runs.append(keys)
+        await release.wait()
+
+    async def main() -> SingleFlight:
+        single_flight = SingleFlight("refresh", run)
+        first = asyncio.create_task(single_flight.request([1]))
+        await asyncio.sleep(0)
+        assert single_flight.busy
+
+        # all arrive while the first run is in flight
+        follow_ups = [asyncio.create_task(single_flight.request([guild])) for guild in (2, 3, 2)]
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(first, *follow_ups)
+        assert not single_flight.busy
+        return single_flight
+
+    single_flight = asyncio.run(main())
+    assert runs == [frozenset({1}), frozenset({2, 3})]
+    assert single_flight.stats.requests == 4
+    assert single_flight.stats.runs == 2
+    assert single_flight.stats.coalesced == 2
+
+
+def test_request__queued_request_for_all_keys__follow_up_covers_all_keys() -> None:
+    runs: list[RunKeys] = []
+
+    async def run(keys: RunKeys) -> None:
+        runs.append(keys)
+        await asyncio.sleep(0.01)
+
+    async def main() -> None:
+        single_flight = SingleFlight("refresh", run)
+        first = asyncio.create_task(single_flight.request([1]))
+        await asyncio.sleep(0)
+        await asyncio.gather(first, single_flight.request([2]), single_flight.request(None))
+
+    asyncio.run(main())
+    assert runs == [frozenset({1}), None]
+
+
+def test_request__failing_run__logged_and_next_request_runs() -> None:
+    calls = 0
+
+    async def run(_keys: RunKeys) -> None:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise ValueError("failed")
+
+    async def main() -> SingleFlight:
+        single_flight = SingleFlight("refresh", run)
+        await single_flight.request()
+        await single_flight.request()
+        return single_flight
+
+    single_flight = asyncio.run(main())
+    assert calls == 2
+    assert single_flight.stats.failed == 1
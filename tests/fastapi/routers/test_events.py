@@ -0,0 +1,38 @@
+import io
+from unittest.mock import MagicMock
+
+from fastapi import UploadFile
+from sqlalchemy.orm import Session, sessionmaker
+
+from moobot.bulk import EventFileFormat
+from moobot.db.models import MoobloomEvent
+from moobot.fastapi.routers.events import post_import_events
+
+CSV_EVENTS = b"name,time\nSome event,9/21 7PM to 10PM\n"
+
+
+def test_post_import_events__inside_bot_process__refresh_requested(
+    test_db_session: sessionmaker[Session],
+) -> None:
+    request = MagicMock()
+    with test_db_session() as session:
+        response = post_import_events(
+            request, UploadFile(io.BytesIO(CSV_EVENTS)), 1234, session, EventFileFormat.CSV
+        )
+
+        assert session.query(MoobloomEvent.guild_id).scalar() == 1234
+    assert response == {"imported": 1, "refresh_requested": True}
+    request.app.state.on_events_imported.assert_called_once_with(1234)
+
+
+def test_post_import_events__separate_process__refresh_not_requested(
+    test_db_session: sessionmaker[Session],
+) -> None:
+    request = MagicMock()
+    request.app.state = object()
+    with test_db_session() as session:
+        response = post_import_events(
+            request, UploadFile(io.BytesIO(CSV_EVENTS)), 1234, session, EventFileFormat.CSV
+        )
+
+    assert response == {"imported": 1, "refresh_requested": False}
@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from moobot.db.crud.status import report_bot_status
+from moobot.fastapi.routers.health import check_readiness
+
+
+def test_check_readiness__healthy_bot__all_checks_ok(
+    test_db_session: sessionmaker[Session],
+) -> None:
+    with test_db_session() as session:
+        report_bot_status(
+            session,
+            "bot",
+            connected=True,
+            gateway_latency_seconds=0.1,
+            scheduler_lag_seconds=0.0,
+            last_reconciled_at=datetime.now(),
+            started_at=datetime.now() - timedelta(hours=1),
+        )
+
+        checks = check_readiness(session)
+
+    assert all(check.ok for check in checks.values()), checks
+
+
+def test_check_readiness__disconnected_bot_without_reconciliation__checks_fail(
+    test_db_session: sessionmaker[Session],
+) -> None:
+    with test_db_session() as session:
+        report_bot_status(
+            session,
+            "bot",
+            connected=False,
+            gateway_latency_seconds=None,
+            scheduler_lag_seconds=0.0,
+            last_reconciled_at=None,
+            started_at=datetime.now() - timedelta(hours=1),
+        )
+
+        checks = check_readiness(session)
+
+    assert not checks["gateway_latency_seconds"].ok
+    assert not checks["reconcile_age_seconds"].ok
+    assert checks["bot_status_age_seconds"].ok
+
+
+def test_check_readiness__no_bot_status__bot_checks_fail(
+    test_db_session: sessionmaker[Session],
+) -> None:
+    with test_db_session() as session:
+        checks = check_readiness(session)
+
+    assert checks["db_checkout_seconds"].ok
+    assert not checks["bot_status_age_seconds"].ok
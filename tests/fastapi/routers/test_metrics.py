@@ -0,0 +1,19 @@
+from sqlalchemy.orm import Session, sessionmaker
+
+from moobot.db.crud.status import save_metrics_snapshot
+from moobot.fastapi.routers.metrics import get_metrics
+from moobot.metrics import Registry
+
+
+def test_get_metrics__bot_snapshot__exported_with_process_label(
+    test_db_session: sessionmaker[Session],
+) -> None:
+    registry = Registry()
+    registry.counter("moobot_test_events", "Test events").inc(3)
+    with test_db_session() as session:
+        save_metrics_snapshot(session, "shards [0]", registry.collect())
+
+        response = get_metrics(session)
+
+    assert response.media_type is not None and response.media_type.startswith("text/plain")
+    assert 'moobot_test_events_total{process="shards [0]"} 3' in bytes(response.body).decode()
@@ -0,0 +1,67 @@
+import asyncio
+
+import aiohttp
+import pytest
+from discord.http import HTTPClient, Route
+
+from loadtest.fake_discord import API_PREFIX, FakeDiscord, RateLimit, serve
+
+TOKEN = "test-token"
+MESSAGES_ROUTE = "/channels/{channel_id}/messages"
+
+
+def test_create_message__discord_client__message_stored(monkeypatch: pytest.MonkeyPatch) -> None:
+    fake_discord = FakeDiscord(token=TOKEN, latency_seconds=0, latency_jitter_seconds=0)
+    channel_id = fake_discord.add_channel("general")
+
+    async def run() -> None:
+        runner = await serve(fake_discord)
+        monkeypatch.setattr(Route, "BASE", fake_discord.base_url + API_PREFIX)
+        http = HTTPClient(asyncio.get_running_loop())
+        try:
+            await http.static_login(TOKEN)
+            await http.request(
+                Route("POST", MESSAGES_ROUTE, channel_id=channel_id), json={"content": "hello"}
+            )
+        finally:
+            await http.close()
+            await runner.cleanup()
+
+    asyncio.run(run())
+
+    assert [message["content"] for message in fake_discord.find_messages(channel_id)] == ["hello"]
+    assert fake_discord.stats.calls[f"POST {MESSAGES_ROUTE}"] == 1
+
+
+def test_middleware__bucket_exhausted__rate_limited_response() -> None:
+    fake_discord = FakeDiscord(
+        token=TOKEN,
+        latency_seconds=0,
+        latency_jitter_seconds=0,
+        rate_limits={("POST", MESSAGES_ROUTE): RateLimit(1, 60.0)},
+    )
+    channel_id = fake_discord.add_channel("general")
+
+    async def run() -> list[tuple[int, str | None, dict]]:
+        runner = await serve(fake_discord)
+        url = f"{fake_discord.base_url}{API_PREFIX}/channels/{channel_id}/messages"
+        headers = {"Authorization": f"Bot {TOKEN}"}
+        responses = []
+        try:
+            async with aiohttp.ClientSession() as session:
+                for _ in range(2):
+                    async with session.post(url, json={"content": "hi"}, headers=headers) as r:
+                        responses.append((r.status, r.headers.get("Via"), await r.json()))
+        finally:
+            await runner.cleanup()
+        return responses
+
+    (first_status, _, _), (status, via, body) = asyncio.run(run())
+
+    assert first_status == 200
+    assert status == 429
+    # discord.py treats 429s without a Via header as Cloudflare bans
+    assert via is not None
+    assert 0 < body["retry_after"] <= 60
+    assert body["global"] is False
+    assert fake_discord.stats.rate_limited[f"POST {MESSAGES_ROUTE}"] == 1
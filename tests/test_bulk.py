@@ -0,0 +1,185 @@
+import io
+from datetime import date, datetime
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from moobot.bulk import (
+    export_events_csv,
+    export_events_ics,
+    export_rsvps_csv,
+    import_events,
+    parse_csv_events,
+    parse_ics_events,
+)
+from moobot.db.models import MoobloomEvent, MoobloomEventAttendanceType, MoobloomEventRSVP
+
+SOME_URL = "https://some-url"
+
+CSV_EVENTS = [
+    "name,channel_name,time,location,description\n",
+    f'Some event,some-channel,9/21 7PM to 10PM,Some place,"{SOME_URL}\nSome description"\n',
+    "Some other event,,,,\n",
+]
+
+ICS_EVENTS = [
+    "BEGIN:VCALENDAR\r\n",
+    "BEGIN:VEVENT\r\n",
+    "SUMMARY:Some event\\, with a comma\r\n",
+    "DTSTART;VALUE=DATE:20300921\r\n",
+    "DTEND;VALUE=DATE:20300923\r\n",
+    "DESCRIPTION:url:https://some-url\\nSome long description that is folded\r\n",
+    "  across two lines\r\n",
+    "END:VEVENT\r\n",
+    "BEGIN:VEVENT\r\n",
+    "SUMMARY:Some timed event\r\n",
+    "DTSTART;TZID=America/New_York:20300921T190000\r\n",
+    "DTEND;TZID=America/New_York:20300921T220000\r\n",
+    "END:VEVENT\r\n",
+    "END:VCALENDAR\r\n",
+]
+
+
+def test_parse_csv_events__free_form_time__parses_like_event_modal() -> None:
+    events = parse_csv_events(CSV_EVENTS[:2])
+
+    event = next(events)
+    assert event.name == "Some event"
+    assert event.channel_name == "some-channel"
+    assert event.create_channel
+    assert event.start_time is not None and event.start_time.hour == 19
+    assert event.end_time is not None and event.end_time.hour == 22
+    assert event.url == SOME_URL
+    assert event.description == "Some description"
+
+
+def test_parse_csv_events__missing_time__raises_error_with_line_number() -> None:
+    try:
+        list(parse_csv_events(io.StringIO("".join(CSV_EVENTS))))
+    except ValueError as e:
+        assert "line 4" in str(e)
+    else:
+        raise AssertionError("expected ValueError")
+
+
+def test_parse_ics_events__all_day_and_timed_events__parses_correctly() -> None:
+    all_day, timed = parse_ics_events(ICS_EVENTS)
+
+    assert all_day.name == "Some event, with a comma"
+    assert all_day.start_date == date(2030, 9, 21)
+    # iCalendar end dates are exclusive
+    assert all_day.end_date == date(2030, 9, 22)
+    assert all_day.url == SOME_URL
+    assert all_day.description == "Some long description that is folded across two lines"
+    assert timed.start_time == datetime(2030, 9, 21, 19)
+    assert timed.end_time == datetime(2030, 9, 21, 22)
+
+
+def test_export_events_csv__imported_events__round_trips(
+    test_db_session: sessionmaker[Session],
+) -> None:
+    with test_db_session() as session:
+        assert import_events(session, parse_ics_events(ICS_EVENTS), batch_size=1) == 2
+        exported = list(export_events_csv(session))
+
+        session.query(MoobloomEvent).delete()
+        import_events(session, parse_csv_events(exported))
+        events = session.query(MoobloomEvent).order_by(MoobloomEvent.id).all()
+
+        assert [(e.name, e.start_date, e.end_date, e.start_time, e.url) for e in events] == [
+            ("Some event, with a comma", date(2030, 9, 21), date(2030, 9, 22), None, SOME_URL),
+            (
+                "Some timed event",
+                date(2030, 9, 21),
+                date(2030, 9, 21),
+                datetime(2030, 9, 21, 19),
+                None,
+            ),
+        ]
+
+
+def test_export_events_ics__imported_events__round_trips(
+    test_db_session: sessionmaker[Session],
+) -> None:
+    with test_db_session() as session:
+        import_events(session, parse_ics_events(ICS_EVENTS))
+
+        reimported = list(parse_ics_events("".join(export_events_ics(session)).splitlines()))
+
+        assert [(e.name, e.end_date, e.end_time) for e in reimported] == [
+            ("Some event, with a comma", date(2030, 9, 22), None),
+            ("Some timed event", date(2030, 9, 21), datetime(2030, 9, 21, 22)),
+        ]
+
+
+def test_export_events_ics__timed_event__written_in_utc_without_tzid(
+    test_db_session: sessionmaker[Session],
+) -> None:
+    with test_db_session() as session:
+        import_events(session, parse_ics_events(ICS_EVENTS))
+
+        exported = "".join(export_events_ics(session))
+
+    # America/New_York is 4 hours behind UTC in September
+    assert "DTSTART:20300921T230000Z\r\n" in exported
+    assert "DTEND:20300922T020000Z\r\n" in exported
+    assert "TZID" not in exported
+
+
+def test_export_events_ics__multi_day_event_without_end_time__end_date_round_trips(
+    test_db_session: sessionmaker[Session],
+) -> None:
+    with test_db_session() as session:
+        session.add(
+            MoobloomEvent(
+                name="Some festival",
+                start_date=date(2030, 9, 21),
+                start_time=datetime(2030, 9, 21, 19),
+                end_date=date(2030, 9, 23),
+            )
+        )
+        session.commit()
+
+        (reimported,) = parse_ics_events("".join(export_events_ics(session)).splitlines())
+
+    assert reimported.start_time == datetime(2030, 9, 21, 19)
+    assert reimported.end_date == date(2030, 9, 23)
+    assert reimported.end_time is None
+
+
+def test_export_events__guild_id__only_guild_events_exported(
+    test_db_session: sessionmaker[Session],
+) -> None:
+    with test_db_session() as session:
+        import_events(session, parse_ics_events(ICS_EVENTS[:8] + ICS_EVENTS[-1:]), guild_id=1)
+        import_events(session, parse_ics_events(ICS_EVENTS[:1] + ICS_EVENTS[8:]), guild_id=2)
+        for event in session.query(MoobloomEvent):
+            session.add(
+                MoobloomEventRSVP(
+                    user_id=event.guild_id,
+                    event_id=event.id,
+                    attendance_type=MoobloomEventAttendanceType.YES,
+                )
+            )
+        session.commit()
+
+        csv_events = list(parse_csv_events(export_events_csv(session, guild_id=2)))
+        ics_events = list(parse_ics_events("".join(export_events_ics(session, 2)).splitlines()))
+        rsvp_rows = list(export_rsvps_csv(session, guild_id=2))
+
+    assert [e.name for e in csv_events] == ["Some timed event"]
+    assert [e.name for e in ics_events] == ["Some timed event"]
+    assert [row.split(",")[1:3] for row in rsvp_rows[1:]] == [["Some timed event", "2"]]
+
+
+def test_import_events__invalid_event_after_first_batch__nothing_imported(
+    test_db_session: sessionmaker[Session],
+) -> None:
+    with test_db_session() as session:
+        try:
+            import_events(session, parse_csv_events(CSV_EVENTS), batch_size=1)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("expected ValueError")
+
+        assert session.query(MoobloomEvent).count() == 0
@@ -0,0 +1,152 @@
+import asyncio
+from collections.abc import Generator
+from datetime import date
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pytest_mock import MockerFixture
+from sqlalchemy.orm import Session, sessionmaker
+
+from moobot.db.crud.guilds import CalendarMessage
+from moobot.db.models import Base, MoobloomEvent, MoobloomEventAttendanceType, MoobloomEventRSVP
+from moobot.db.session import WRITE_OPTION, create_db_engine
+from moobot.discord.discord_bot import ReactionAction
+from moobot.events import _hash_calendar_content, handle_rsvp, sync_calendar_pages
+
+SOME_USER_ID = 1
+SOME_CHANNEL_ID = 2
+
+
+@pytest.fixture
+def wal_db_session(
+    tmp_path: Path, mocker: MockerFixture
+) -> Generator[sessionmaker[Session], None, None]:
+    """
+    Sessions against a file-backed SQLite database, where each connection reads its own snapshot.
+    """
+    engine = create_db_engine(f"sqlite:///{tmp_path}/moobot.db")
+    Base.metadata.create_all(engine)
+    sm = sessionmaker(engine)
+    mocker.patch("moobot.events.Session", sm)
+    mocker.patch(
+        "moobot.events.WriteSession", sessionmaker(engine.execution_options(**{WRITE_OPTION: True}))
+    )
+    yield sm
+    engine.dispose()
+
+
+def _add_event_with_rsvps(
+    session_maker: sessionmaker[Session], *attendance_types: MoobloomEventAttendanceType
+) -> int:
+    with session_maker() as session:
+        event = MoobloomEvent(
+            name="Some event",
+            start_date=date.today(),
+            end_date=date.today(),
+            channel_id=SOME_CHANNEL_ID,
+            announcement_message_id=3,
+        )
+        session.add(event)
+        session.flush()
+        session.add_all(
+            MoobloomEventRSVP(user_id=SOME_USER_ID, event_id=event.id, attendance_type=t)
+            for t in attendance_types
+        )
+        session.commit()
+        return event.id
+
+
+def _remove_rsvp(
+    mocker: MockerFixture, event_id: int, rsvp_type: MoobloomEventAttendanceType
+) -> tuple[MagicMock, MagicMock]:
+    calendar_sync = mocker.patch("moobot.events.handle_google_calendar_sync_on_rsvp")
+    channel = MagicMock(set_permissions=AsyncMock())
+    announcement_channel = MagicMock()
+    announcement_channel.guild.get_channel.return_value = channel
+    user = MagicMock(id=SOME_USER_ID)
+
+    asyncio.run(
+        handle_rsvp(
+            MagicMock(),
+            announcement_channel,
+            event_id,
+            ReactionAction.REMOVED,
+            rsvp_type,
+            user,
+            update_introduction=False,
+        )
+    )
+    return channel, calendar_sync
+
+
+def test_handle_rsvp__last_rsvp_removed__removes_channel_access(
+    wal_db_session: sessionmaker[Session], mocker: MockerFixture
+) -> None:
+    event_id = _add_event_with_rsvps(wal_db_session, MoobloomEventAttendanceType.YES)
+
+    channel, calendar_sync = _remove_rsvp(mocker, event_id, MoobloomEventAttendanceType.YES)
+
+    channel.set_permissions.assert_awaited_once_with(mocker.ANY, overwrite=None)
+    assert calendar_sync.call_args.args[3] == MoobloomEventAttendanceType.NO
+    with wal_db_session() as session:
+        assert session.query(MoobloomEventRSVP).count() == 0
+
+
+def test_handle_rsvp__other_rsvp_remains__keeps_channel_access(
+    wal_db_session: sessionmaker[Session], mocker: MockerFixture
+) -> None:
+    event_id = _add_event_with_rsvps(
+        wal_db_session, MoobloomEventAttendanceType.YES, MoobloomEventAttendanceType.MAYBE
+    )
+
+    channel, calendar_sync = _remove_rsvp(mocker, event_id, MoobloomEventAttendanceType.YES)
+
+    channel.set_permissions.assert_not_awaited()
+    calendar_sync.assert_not_called()
+
+
+def _calendar_channel() -> MagicMock:
+    calendar_channel = MagicMock(send=AsyncMock(return_value=MagicMock(id=100)))
+    calendar_channel.get_partial_message.side_effect = lambda message_id: MagicMock(
+        id=message_id, edit=AsyncMock(), delete=AsyncMock()
+    )
+    return calendar_channel
+
+
+def _calendar_pages(pages: dict[str, str], first_message_id: int = 1) -> list[CalendarMessage]:
+    return [
+        CalendarMessage(key, message_id, _hash_calendar_content(content))
+        for message_id, (key, content) in enumerate(pages.items(), start=first_message_id)
+    ]
+
+
+def test_sync_calendar_pages__month_rolled_off__only_its_page_deleted() -> None:
+    calendar_channel = _calendar_channel()
+    old_pages = _calendar_pages({"2030-09": "September", "2030-10": "October"})
+
+    pages, requests = asyncio.run(
+        sync_calendar_pages(calendar_channel, old_pages, {"2030-10": "October"})
+    )
+
+    assert pages == old_pages[1:]
+    assert requests == 1
+    calendar_channel.get_partial_message.assert_called_once_with(1)
+    calendar_channel.send.assert_not_awaited()
+
+
+def test_sync_calendar_pages__month_inserted__following_pages_moved_down() -> None:
+    calendar_channel = _calendar_channel()
+    old_pages = _calendar_pages({"2030-09": "September", "2030-11": "November"})
+    new_pages = {"2030-09": "September", "2030-10": "October", "2030-11": "November"}
+
+    pages, requests = asyncio.run(sync_calendar_pages(calendar_channel, old_pages, new_pages))
+
+    # October takes over November's message, which is sent anew
+    assert pages == [
+        old_pages[0],
+        CalendarMessage("2030-10", 2, _hash_calendar_content("October")),
+        CalendarMessage("2030-11", 100, _hash_calendar_content("November")),
+    ]
+    assert requests == 2
+    calendar_channel.send.assert_awaited_once_with(content="November")
@@ -0,0 +1,47 @@
+import subprocess
+import sys
+
+import pytest
+
+# cumulative import time budgets of the entry points, measured with `python -X importtime`
+IMPORT_TIME_BUDGET_SECONDS = {
+    "moobot.main": 1.5,
+    "moobot.fastapi.app": 2.0,
+}
+# only needed once a user enables Google Calendar sync
+LAZY_MODULES = ("googleapiclient", "google_auth_oauthlib", "google.oauth2")
+
+
+def _import_time_seconds(module: str) -> float:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # the last line is the module itself: "import time: self [us] | cumulative | name"
+    cumulative_us = result.stderr.strip().splitlines()[-1].split("|")[1]
+    return int(cumulative_us) / 1_000_000
+
+
+@pytest.mark.parametrize("module", IMPORT_TIME_BUDGET_SECONDS)
+def test_import__entry_point__heavy_dependencies_not_imported(module: str) -> None:
+    result = subprocess.run(
+        [sys.executable, "-c", f"import sys, {module}; print('\\n'.join(sys.modules))"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    imported = set(result.stdout.splitlines())
+    assert not {m for m in imported if m.startswith(LAZY_MODULES)}
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("module,budget_seconds", IMPORT_TIME_BUDGET_SECONDS.items())
+def test_import__entry_point__within_import_time_budget(module: str, budget_seconds: float) -> None:
+    # the best of a few runs, since the first one may include writing bytecode caches
+    seconds = min(_import_time_seconds(module) for _ in range(3))
+
+    print(f"{module}: {seconds * 1000:.0f}ms (budget {budget_seconds * 1000:.0f}ms)")
+    assert seconds < budget_seconds
@@ -0,0 +1,49 @@
+import pytest
+
+from moobot.metrics import Registry, merge_families, render
+
+
+def test_render__counter_and_histogram__prometheus_text_format() -> None:
+    registry = Registry()
+    requests = registry.counter("requests", "Requests by route", ["route"])
+    seconds = registry.histogram("request_seconds", "Request duration", buckets=(0.1, 1.0))
+    requests.inc(route="GET /users")
+    requests.inc(2, route="GET /users")
+    seconds.observe(0.05)
+    seconds.observe(0.5)
+
+    text = render(merge_families({"bot": registry.collect()}))
+
+    assert text == (
+        "# HELP requests Requests by route\n"
+        "# TYPE requests counter\n"
+        'requests_total{route="GET /users",process="bot"} 3\n'
+        "# HELP request_seconds Request duration\n"
+        "# TYPE request_seconds histogram\n"
+        'request_seconds_bucket{le="0.1",process="bot"} 1\n'
+        'request_seconds_bucket{le="1.0",process="bot"} 2\n'
+        'request_seconds_bucket{le="+Inf",process="bot"} 2\n'
+        'request_seconds_sum{process="bot"} 0.55\n'
+        'request_seconds_count{process="bot"} 2\n'
+    )
+
+
+def test_merge_families__several_processes__samples_labelled_by_process() -> None:
+    api, bot = Registry(), Registry()
+    api.counter("requests", "Requests").inc()
+    bot_requests = bot.counter("requests", "Requests")
+    bot_requests.inc()
+    bot_requests.inc()
+
+    (family,) = merge_families({"api": api.collect(), "bot": bot.collect()})
+
+    assert [(s["labels"], s["value"]) for s in family["samples"]] == [
+        ({"process": "api"}, 1.0),
+        ({"process": "bot"}, 2.0),
+    ]
+
+
+def test_inc__wrong_labels__raises() -> None:
+    counter = Registry().counter("requests", "Requests", ["route"])
+    with pytest.raises(ValueError):
+        counter.inc(method="GET")
@@ -0,0 +1,24 @@
+from datetime import UTC, datetime, timedelta
+
+from apscheduler.events import (
+    EVENT_JOB_EXECUTED,
+    EVENT_JOB_MAX_INSTANCES,
+    EVENT_JOB_SUBMITTED,
+    JobEvent,
+    JobSubmissionEvent,
+)
+
+from moobot.scheduler import _track_job_event, job_stats
+
+
+def test__track_job_event__late_run_and_skipped_run__recorded() -> None:
+    scheduled_at = datetime.now(UTC) - timedelta(seconds=10)
+    _track_job_event(JobSubmissionEvent(EVENT_JOB_SUBMITTED, "some_job", "default", [scheduled_at]))
+    _track_job_event(JobEvent(EVENT_JOB_MAX_INSTANCES, "some_job", "default"))
+    _track_job_event(JobEvent(EVENT_JOB_EXECUTED, "some_job", "default"))
+
+    stats = job_stats.pop("some_job")
+    assert stats.runs == 1
+    assert stats.skipped == 1
+    assert stats.errors == 0
+    assert 10 <= stats.lag_seconds < 20
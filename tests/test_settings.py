@@ -0,0 +1,60 @@
+from collections.abc import Generator
+
+import pytest
+
+from moobot import settings as settings_module
+from moobot.settings import Settings, get_settings, reload_settings, subscribe_to_settings
+
+
+@pytest.fixture
+def restore_settings(monkeypatch: pytest.MonkeyPatch) -> Generator[None, None, None]:
+    subscribers = list(settings_module._subscribers)
+    yield
+    monkeypatch.undo()
+    reload_settings()
+    settings_module._subscribers[:] = subscribers
+
+
+def test_get_settings__called_twice__same_instance() -> None:
+    assert get_settings() is get_settings()
+
+
+def test_reload_settings__changed_field__updated_in_place_and_subscriber_notified(
+    monkeypatch: pytest.MonkeyPatch, restore_settings: None
+) -> None:
+    settings = get_settings()
+    notified: list[set[str]] = []
+
+    def on_change(_settings: Settings, changed: set[str]) -> None:
+        notified.append(changed)
+
+    subscribe_to_settings(["rsvp_debounce_seconds"], on_change)
+    subscribe_to_settings(["rsvp_queue_size"], lambda *_: pytest.fail("not changed"))
+    monkeypatch.setenv("RSVP_DEBOUNCE_SECONDS", "3")
+
+    assert reload_settings() == {"rsvp_debounce_seconds"}
+    assert settings.rsvp_debounce_seconds == 3
+    assert notified == [{"rsvp_debounce_seconds"}]
+
+
+def test_reload_settings__invalid_value__raises_and_keeps_settings(
+    monkeypatch: pytest.MonkeyPatch, restore_settings: None
+) -> None:
+    debounce_seconds = get_settings().rsvp_debounce_seconds
+    monkeypatch.setenv("RSVP_DEBOUNCE_SECONDS", "soon")
+
+    with pytest.raises(ValueError):
+        reload_settings()
+    assert get_settings().rsvp_debounce_seconds == debounce_seconds
+
+
+def test_reload_settings__shard_ids_without_shard_count__raises_value_error(
+    monkeypatch: pytest.MonkeyPatch, restore_settings: None
+) -> None:
+    monkeypatch.setenv("DISCORD_SHARD_IDS", "[0, 1]")
+
+    with pytest.raises(ValueError, match="DISCORD_SHARD_COUNT"):
+        reload_settings()
+
+    monkeypatch.setenv("DISCORD_SHARD_COUNT", "4")
+    assert reload_settings() == {"discord_shard_ids", "discord_shard_count"}
@@ -0,0 +1,96 @@
+from dataclasses import replace
+from datetime import date, datetime
+
+from pytest_mock import MockerFixture
+
+from moobot.db.snapshots import EventSnapshot
+from moobot.util import calendar_renderer
+from moobot.util.calendar_renderer import NO_EVENTS, NO_EVENTS_PAGE_KEY, CalendarRenderer
+
+TODAY = date(2030, 9, 21)
+
+
+def _event(id: int, name: str, start_date: date) -> EventSnapshot:
+    return EventSnapshot(
+        id=id,
+        guild_id=1234,
+        name=name,
+        create_channel=False,
+        channel_name=None,
+        start_date=start_date,
+        start_time=None,
+        end_date=start_date,
+        end_time=None,
+        location=None,
+        description=None,
+        url=None,
+        image_url=None,
+        thumbnail_url=None,
+        announcement_message_id=None,
+        channel_id=None,
+        channel_introduction_message_id=None,
+        deleted=False,
+        updated_at=datetime(2030, 1, 1),
+    )
+
+
+def test_render_pages__events_in_two_months__one_page_per_month() -> None:
+    events = [
+        _event(1, "Party", date(2030, 9, 21)),
+        _event(2, "Picnic", date(2030, 9, 28)),
+        _event(3, "Hike", date(2030, 10, 5)),
+    ]
+
+    assert CalendarRenderer().render_pages(events, today=TODAY) == {
+        "2030-09": (
+            "**September 2030:**\n**📢  (Today!) Sat. September 21: Party**"
+            "\nSat. September 28: Picnic"
+        ),
+        "2030-10": "**October 2030:**\nSat. October 5: Hike",
+    }
+    assert CalendarRenderer().render_pages([], today=TODAY) == {NO_EVENTS_PAGE_KEY: NO_EVENTS}
+
+
+def test_render_pages__month_too_long__split_into_continued_pages() -> None:
+    events = [_event(i, f"Event {i}", date(2030, 10, 5)) for i in range(3)]
+
+    pages = CalendarRenderer(max_page_length=70).render_pages(events, today=TODAY)
+
+    assert pages == {
+        "2030-10": "**October 2030:**\nSat. October 5: Event 0\nSat. October 5: Event 1",
+        "2030-10/2": "**October 2030 (continued):**\nSat. October 5: Event 2",
+    }
+
+
+def test_render_pages__one_event_updated__only_updated_event_rerendered(
+    mocker: MockerFixture,
+) -> None:
+    events = [_event(1, "Party", date(2030, 9, 21)), _event(2, "Hike", date(2030, 10, 5))]
+    renderer = CalendarRenderer()
+    pages = renderer.render_pages(events, today=TODAY)
+    format_event = mocker.spy(calendar_renderer, "format_single_event_for_calendar")
+
+    assert renderer.render_pages(events, today=TODAY) == pages
+    assert format_event.call_count == 0
+
+    events[1] = replace(events[1], name="Long Hike", updated_at=datetime(2030, 1, 2))
+    updated_pages = renderer.render_pages(events, today=TODAY)
+    # the unchanged month's page is reused as is
+    assert updated_pages["2030-09"] is pages["2030-09"]
+    assert updated_pages["2030-10"] == "**October 2030:**\nSat. October 5: Long Hike"
+    assert format_event.call_count == 1
+
+    # the next day, every event's markers may have changed
+    renderer.render_pages(events, today=date(2030, 9, 22))
+    assert format_event.call_count == 3
+
+
+def test_render_pages__updated_within_same_second__rerendered() -> None:
+    events = [_event(1, "Party", date(2030, 9, 21))]
+    renderer = CalendarRenderer()
+    renderer.render_pages(events, today=TODAY)
+
+    # SQLite's CURRENT_TIMESTAMP has a resolution of seconds, so updated_at may not change
+    events[0] = replace(events[0], name="Pool Party")
+
+    assert "Pool Party" in renderer.render_pages(events, today=TODAY)["2030-09"]
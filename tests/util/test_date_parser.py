@@ -0,0 +1,79 @@
+import calendar
+import random
+import time
+from datetime import datetime
+
+import pytest
+
+from moobot.util.date_parser import _parse_fast_path, parse_time_aware, time_aware_parser
+
+DEFAULT = datetime(2030, 1, 1)
+# the time strings of the event modal tests
+EVENT_MODAL_CORPUS = ["9/21", "9/21 7PM", "Sept 21 7PM", "9/21", "10PM", "9/28", "9/28 10PM"]
+
+
+def _fuzz_corpus(size: int = 500) -> list[str]:
+    rng = random.Random(0)
+    months = [*calendar.month_name[1:], *calendar.month_abbr[1:], "Sept"]
+
+    def date_part() -> str:
+        month, day = rng.randint(1, 13), rng.randint(1, 32)
+        return rng.choice(
+            [
+                f"{month}/{day}",
+                f"{month}/{day}/{rng.choice(['31', '2031'])}",
+                f"{rng.choice(months)}{rng.choice(['', '.'])} {day}{rng.choice(['', 'th'])}",
+                f"{rng.choice(months)} {day}, 2031",
+                str(day),
+            ]
+        )
+
+    def time_part() -> str:
+        hour, minute = rng.randint(0, 13), rng.choice(["", ":00", ":30", ":75"])
+        return f"{hour}{minute}{rng.choice(['', ' '])}{rng.choice(['am', 'PM', 'p.m.'])}"
+
+    return [
+        rng.choice(
+            [date_part(), time_part(), f"{date_part()}{rng.choice([' ', ', '])}{time_part()}"]
+        )
+        for _ in range(size)
+    ]
+
+
+@pytest.mark.parametrize("text", [*EVENT_MODAL_CORPUS, *_fuzz_corpus()])
+def test__parse_fast_path__corpus__matches_dateutil_or_falls_back(text: str) -> None:
+    result = _parse_fast_path(text, DEFAULT)
+    if result is None:
+        return
+
+    assert result == time_aware_parser.parse(text, default=DEFAULT)
+
+
+def test_parse_time_aware__unsupported_format__falls_back_to_dateutil() -> None:
+    result = parse_time_aware("19:30", default=DEFAULT)
+
+    assert result.dt == DEFAULT.replace(hour=19, minute=30)
+    assert result.has_time
+    assert not result.has_date
+
+
+@pytest.mark.benchmark
+def test__parse_fast_path__corpus__faster_than_dateutil() -> None:
+    corpus = [*EVENT_MODAL_CORPUS, *_fuzz_corpus()]
+    corpus = [text for text in corpus if _parse_fast_path(text, DEFAULT) is not None]
+
+    start = time.perf_counter()
+    for text in corpus:
+        _parse_fast_path(text, DEFAULT)
+    fast_path_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for text in corpus:
+        time_aware_parser.parse(text, default=DEFAULT)
+    dateutil_seconds = time.perf_counter() - start
+
+    print(
+        f"{len(corpus)} strings: fast path {fast_path_seconds * 1000:.1f}ms,"
+        f" dateutil {dateutil_seconds * 1000:.1f}ms"
+    )
+    assert fast_path_seconds < dateutil_seconds
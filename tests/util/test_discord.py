@@ -0,0 +1,77 @@
+import asyncio
+from collections.abc import AsyncIterator
+from unittest.mock import AsyncMock, MagicMock
+
+from discord import PermissionOverwrite, TextChannel
+
+from moobot.util.discord import get_members, grant_channel_access, has_reacted
+
+
+def test_get_members__uncached_members__queried_in_chunks() -> None:
+    cached_member = MagicMock(id=0)
+    guild = MagicMock()
+    guild.get_member.side_effect = lambda user_id: cached_member if user_id == 0 else None
+    guild.query_members = AsyncMock(
+        side_effect=lambda user_ids, limit: [MagicMock(id=user_id) for user_id in user_ids]
+    )
+
+    members = asyncio.run(get_members(guild, range(151)))
+
+    assert [member.id for member in members] == list(range(151))
+    assert guild.query_members.await_count == 2
+    assert guild.query_members.await_args_list[0].kwargs["limit"] == 100
+    assert guild.query_members.await_args_list[1].kwargs["user_ids"] == list(range(101, 151))
+
+
+def _reaction(count: int, me: bool, user_ids: list[int]) -> MagicMock:
+    async def users(limit: int, after: MagicMock) -> AsyncIterator[MagicMock]:
+        for user_id in sorted(u for u in user_ids if u > after.id)[:limit]:
+            yield MagicMock(id=user_id)
+
+    reaction = MagicMock(count=count, me=me)
+    reaction.users.side_effect = users
+    return reaction
+
+
+def test_has_reacted__other_users_reacted__false() -> None:
+    reaction = _reaction(count=3, me=True, user_ids=[10, 30])
+
+    assert asyncio.run(has_reacted(reaction, MagicMock(id=20))) is False
+    assert asyncio.run(has_reacted(reaction, MagicMock(id=30))) is True
+
+
+def test_has_reacted__only_bot_reacted__no_request() -> None:
+    reaction = _reaction(count=1, me=True, user_ids=[])
+
+    assert asyncio.run(has_reacted(reaction, MagicMock(id=20))) is False
+    reaction.users.assert_not_called()
+
+
+def test_grant_channel_access__one_member__overwrite_set() -> None:
+    channel = MagicMock(set_permissions=AsyncMock(), edit=AsyncMock())
+    member = MagicMock(id=1)
+
+    asyncio.run(grant_channel_access(channel, [member]))
+
+    channel.set_permissions.assert_awaited_once_with(
+        member, overwrite=PermissionOverwrite(read_messages=True)
+    )
+    channel.edit.assert_not_awaited()
+
+
+def test_grant_channel_access__several_members__fetched_overwrites_edited_at_once() -> None:
+    existing_member = MagicMock(id=1)
+    existing_overwrite = PermissionOverwrite(read_messages=True)
+    channel = MagicMock(set_permissions=AsyncMock(), edit=AsyncMock())
+    channel.guild.fetch_channel = AsyncMock(
+        return_value=MagicMock(spec=TextChannel, overwrites={existing_member: existing_overwrite})
+    )
+    members = [MagicMock(id=2), MagicMock(id=3)]
+
+    asyncio.run(grant_channel_access(channel, members))
+
+    channel.set_permissions.assert_not_awaited()
+    channel.edit.assert_awaited_once()
+    overwrites = channel.edit.await_args.kwargs["overwrites"]
+    assert overwrites.keys() == {existing_member, *members}
+    assert all(overwrite.read_messages for overwrite in overwrites.values())
@@ -0,0 +1,5 @@
+from moobot.util.memory import get_rss_bytes
+
+
+def test_get_rss_bytes__current_process__positive() -> None:
+    assert get_rss_bytes() > 0